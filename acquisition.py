@@ -0,0 +1,430 @@
+import math
+import threading
+import time
+from typing import NamedTuple
+
+from derived import derive
+
+
+# =========================================================
+# Sample record (one per acquisition, used end to end)
+# =========================================================
+METRICS = ("co", "co2", "pm25", "voc", "temp", "humidity")
+METRIC_INDEX = {m: i for i, m in enumerate(METRICS)}
+
+
+class Sample(NamedTuple):
+    """
+    Immutable, tuple-backed reading (no per-tick dict, no key lookups).
+    states holds the sensor state per metric, aligned with METRICS.
+    """
+    seq: int = 0        # assigned by the engine when published
+    mono: float = 0.0   # time.monotonic() when the read started
+    ts: float = 0.0     # wall clock (time.time()) for storage
+    co: float = None
+    co2: int = None
+    pm25: float = None
+    voc: float = None
+    temp: float = None
+    humidity: float = None
+    states: tuple = ()
+    # Filled by derived.derive() when the sample is published
+    dew_point: float = None      # °F
+    abs_humidity: float = None   # g/m³
+    heat_index: float = None     # °F
+    mold_risk: int = None        # 0 low / 1 moderate / 2 high
+
+    def value(self, metric):
+        return getattr(self, metric)
+
+    def state(self, metric):
+        return self.states[METRIC_INDEX[metric]] if self.states else None
+
+
+# =========================================================
+# Acquisition engine (sensor I/O off the GUI thread)
+# =========================================================
+class AcquisitionEngine:
+    """
+    Runs sensor reads on a worker thread and publishes Samples.
+    - read_fn() does the blocking I2C/UART work and returns a Sample
+    - wake_fn() (optional) returns the monotonic time the next read is wanted
+      (e.g. SampleScheduler.next_due) so per-sensor cadences are honored
+    - the UI only calls latest(), which never touches the bus
+    """
+
+    def __init__(self, read_fn, interval_s: float = 1.0, wake_fn=None):
+        self.read_fn = read_fn
+        self.interval_s = interval_s
+        self.wake_fn = wake_fn
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Simple health counters (read from the UI / diagnostics)
+        self.last_read_s = 0.0
+        self.max_read_s = 0.0
+        self.errors = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="acquisition", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """Newest Sample, or None before the first read completes."""
+        with self._lock:
+            return self._latest
+
+    # ---------------------------
+    # Worker loop
+    # ---------------------------
+    def _run(self):
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            self._tick()
+
+            # Fixed cadence; after an overrun start fresh instead of bursting
+            now = time.monotonic()
+            if next_t <= now:
+                next_t += self.interval_s
+                if next_t < now:
+                    next_t = now + self.interval_s
+
+            wake = next_t
+            if self.wake_fn is not None:
+                try:
+                    wake = min(wake, self.wake_fn())
+                except Exception as e:
+                    print("Acquisition wake_fn failed:", repr(e))
+            self._stop.wait(max(0.0, wake - now))
+
+    def _tick(self):
+        t0 = time.monotonic()
+        try:
+            sample = self.read_fn()
+        except Exception as e:
+            print("Acquisition read failed:", repr(e))
+            self.errors += 1
+            return
+
+        elapsed = time.monotonic() - t0
+        self.last_read_s = elapsed
+        self.max_read_s = max(self.max_read_s, elapsed)
+
+        if sample is not None:
+            self.publish(sample)
+
+    def publish(self, sample):
+        """Derive comfort metrics, stamp the next seq and make it the latest."""
+        sample = derive(sample)
+        with self._lock:
+            self._seq += 1
+            self._latest = sample._replace(seq=self._seq)
+
+
+# =========================================================
+# Per-sensor sampling scheduler
+# =========================================================
+class _Task:
+    __slots__ = (
+        "name", "fn", "period_s", "retry_s", "next_due", "retrying",
+        "runs", "misses", "errors", "last_run_s",
+        "jitter_last", "jitter_avg", "jitter_max",
+    )
+
+    def __init__(self, name, fn, period_s, retry_s):
+        self.name = name
+        self.fn = fn
+        self.period_s = period_s
+        self.retry_s = retry_s
+        self.next_due = time.monotonic()
+        self.retrying = False
+        self.runs = 0
+        self.misses = 0
+        self.errors = 0
+        self.last_run_s = 0.0
+        self.jitter_last = 0.0
+        self.jitter_avg = 0.0
+        self.jitter_max = 0.0
+
+
+class _PassStats:
+    """Latency of scheduler passes: wall time vs summed per-task time."""
+    __slots__ = ("n", "wall_last", "wall_avg", "wall_max", "work_avg")
+
+    ALPHA = 0.1
+
+    def __init__(self):
+        self.n = 0
+        self.wall_last = 0.0
+        self.wall_avg = 0.0
+        self.wall_max = 0.0
+        self.work_avg = 0.0
+
+    def add(self, wall, work):
+        if not self.n:
+            self.wall_avg, self.work_avg = wall, work
+        else:
+            self.wall_avg += self.ALPHA * (wall - self.wall_avg)
+            self.work_avg += self.ALPHA * (work - self.work_avg)
+        self.n += 1
+        self.wall_last = wall
+        self.wall_max = max(self.wall_max, wall)
+
+    def summary(self):
+        return {
+            "passes": self.n,
+            "wall_last_ms": round(self.wall_last * 1000, 1),
+            "wall_avg_ms": round(self.wall_avg * 1000, 1),
+            "wall_max_ms": round(self.wall_max * 1000, 1),
+            # sum of the tasks' own durations = what a serial pass would cost
+            "work_avg_ms": round(self.work_avg * 1000, 1),
+            "overlap": round(self.work_avg / self.wall_avg, 2) if self.wall_avg else None,
+        }
+
+
+class SampleScheduler:
+    """
+    Runs each sensor task on its own period instead of the UI tick rate.
+    - fn() returns False for "no new data yet"; it is retried after retry_s
+      and then re-phased to when data actually arrived (SCD41 data_ready)
+    - otherwise the task stays phase-locked to its schedule (SGP40 at 1 Hz)
+    - jitter = actual start - scheduled start (retries are not counted)
+    - with an executor, tasks due together run concurrently so their
+      conversion waits overlap (pass latency ~ max, not sum, of the reads)
+    """
+
+    JITTER_ALPHA = 0.1  # EWMA weight for jitter_avg
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._tasks = {}
+        self._lock = threading.Lock()
+        # {mode: {tasks in the pass: _PassStats}}; mode is how the pass actually ran
+        self._latency = {"serial": {}, "pipelined": {}}
+
+    def add(self, name, fn, period_s: float, retry_s: float = None):
+        """Register a task; tasks due in the same pass run in insertion order."""
+        with self._lock:
+            self._tasks[name] = _Task(name, fn, period_s, retry_s)
+
+    def set_period(self, name, period_s: float):
+        with self._lock:
+            task = self._tasks[name]
+            task.period_s = period_s
+            task.next_due = min(task.next_due, time.monotonic() + period_s)
+
+    def next_due(self) -> float:
+        with self._lock:
+            if not self._tasks:
+                return math.inf
+            return min(t.next_due for t in self._tasks.values())
+
+    def run_due(self, now: float = None):
+        """Run every task whose deadline has passed. Returns names that ran."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            due = [t for t in self._tasks.values() if t.next_due <= now]
+        if not due:
+            return []
+
+        t0 = time.monotonic()
+        pipelined = self.executor is not None and len(due) > 1
+        if pipelined:
+            # Start every due read first, then collect; the bus arbiter
+            # serializes the actual transactions, the waits overlap
+            futures = [self.executor.submit(self._run_task, task) for task in due]
+            for f in futures:
+                f.result()
+        else:
+            for task in due:
+                self._run_task(task)
+        wall = time.monotonic() - t0
+
+        # A lone due task runs inline even with an executor: that is a serial pass
+        mode = "pipelined" if pipelined else "serial"
+        with self._lock:
+            stats = self._latency[mode].setdefault(len(due), _PassStats())
+            stats.add(wall, sum(t.last_run_s for t in due))
+        return [t.name for t in due]
+
+    def _run_task(self, task):
+        start = time.monotonic()
+        if not task.retrying:
+            jitter = start - task.next_due
+            task.jitter_last = jitter
+            task.jitter_avg += self.JITTER_ALPHA * (jitter - task.jitter_avg)
+            task.jitter_max = max(task.jitter_max, jitter)
+
+        try:
+            ok = task.fn() is not False
+        except Exception as e:
+            print(f"Sampler task {task.name} failed:", repr(e))
+            task.errors += 1
+            ok = True  # don't hammer a failing device; wait a full period
+
+        end = time.monotonic()
+        task.runs += 1
+        task.last_run_s = end - start
+
+        if not ok and task.retry_s:
+            task.misses += 1
+            task.retrying = True
+            task.next_due = end + task.retry_s
+        elif task.retrying:
+            task.retrying = False
+            task.next_due = start + task.period_s
+        else:
+            task.next_due += task.period_s
+            if task.next_due < end:
+                # Fell more than a period behind; skip ahead rather than burst
+                task.next_due = end + task.period_s
+
+    def latency_stats(self):
+        """
+        Per-pass acquisition latency by how the pass ran ("serial" /
+        "pipelined") and by how many tasks it held, so equal-sized passes
+        can be compared: {mode: {tasks: summary}}.
+        """
+        with self._lock:
+            return {
+                mode: {n: st.summary() for n, st in sorted(by_n.items())}
+                for mode, by_n in self._latency.items() if by_n
+            }
+
+    def stats(self):
+        """Per-task cadence/jitter summary (times in ms)."""
+        with self._lock:
+            return {
+                t.name: {
+                    "period_s": t.period_s,
+                    "runs": t.runs,
+                    "misses": t.misses,
+                    "errors": t.errors,
+                    "last_run_ms": round(t.last_run_s * 1000, 1),
+                    "jitter_last_ms": round(t.jitter_last * 1000, 1),
+                    "jitter_avg_ms": round(t.jitter_avg * 1000, 1),
+                    "jitter_max_ms": round(t.jitter_max * 1000, 1),
+                }
+                for t in self._tasks.values()
+            }
+
+
+# =========================================================
+# Sensor reconnection supervisor
+# =========================================================
+class _Backoff:
+    __slots__ = ("next_try", "delay", "attempts", "failures", "was_down")
+
+    def __init__(self):
+        self.next_try = 0.0
+        self.delay = 0.0
+        self.attempts = 0
+        self.failures = 0
+        self.was_down = False
+
+
+class SensorSupervisor:
+    """
+    Owns sensor (re)connection on its own thread.
+    - probes: {name: fn() -> bool} that (re)creates one sensor's driver
+    - is_down(name) decides who needs a probe (MISSING/ERROR); healthy
+      sensors are never touched
+    - per-sensor exponential backoff: base_s after a drop-out, doubling on
+      each failed probe up to max_s; reset once the sensor is back
+    - sensors that are down at start() are probed immediately
+    """
+
+    def __init__(self, probes, is_down, base_s: float = 5.0, max_s: float = 300.0, poll_s: float = 1.0):
+        self.probes = dict(probes)
+        self.is_down = is_down
+        self.base_s = base_s
+        self.max_s = max_s
+        self.poll_s = poll_s
+
+        self._state = {name: _Backoff() for name in self.probes}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        first = True
+        while not self._stop.is_set():
+            self.check(immediate=first)
+            first = False
+            self._stop.wait(self.poll_s)
+
+    def check(self, immediate: bool = False):
+        """One supervision pass (also callable directly, e.g. at boot)."""
+        now = time.monotonic()
+        for name, probe in self.probes.items():
+            st = self._state[name]
+
+            if not self.is_down(name):
+                if st.was_down:
+                    st.was_down = False
+                    st.delay = 0.0
+                continue
+
+            if not st.was_down:
+                # Newly down: give transient read errors a grace period
+                st.was_down = True
+                st.delay = self.base_s
+                st.next_try = now if immediate else now + st.delay
+            if now < st.next_try:
+                continue
+
+            st.attempts += 1
+            try:
+                ok = bool(probe())
+            except Exception as e:
+                print(f"Sensor probe {name} failed:", repr(e))
+                ok = False
+
+            now = time.monotonic()
+            if ok:
+                st.was_down = False
+                st.delay = 0.0
+            else:
+                st.failures += 1
+                st.next_try = now + st.delay
+                st.delay = min(st.delay * 2, self.max_s)
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            name: {
+                "down": st.was_down,
+                "attempts": st.attempts,
+                "failures": st.failures,
+                "retry_in_s": round(max(0.0, st.next_try - now), 1) if st.was_down else None,
+            }
+            for name, st in self._state.items()
+        }
@@ -0,0 +1,678 @@
+import math
+from collections import deque
+from typing import NamedTuple
+
+
+# =========================================================
+# Rolling window with incremental aggregates
+# =========================================================
+class RollingWindow:
+    """
+    Fixed-length sample window whose aggregates update on append/evict.
+    - sum / mean                       O(1)
+    - count of values >= threshold     O(1) for registered thresholds
+    - "any of the last n > threshold"  O(1) for registered thresholds
+    - min / max                        amortized O(1) (monotonic deques)
+    Unregistered thresholds still work, they just fall back to a scan.
+    version increments on every append (cache key for analysis results).
+    """
+
+    def __init__(self, maxlen: int = 40, thresholds=()):
+        self.maxlen = maxlen
+        self.version = 0
+
+        self._values = deque()
+        self._sum = 0.0
+        self._idx = 0  # index the next appended value gets
+
+        self._at_least = {t: 0 for t in thresholds}
+        self._last_above = {t: -math.inf for t in thresholds}
+
+        self._mins = deque()  # (idx, v), values increasing
+        self._maxs = deque()  # (idx, v), values decreasing
+
+    @classmethod
+    def from_values(cls, values, maxlen=None, thresholds=()):
+        values = list(values)
+        w = cls(maxlen or max(len(values), 1), thresholds)
+        for v in values:
+            w.append(v)
+        return w
+
+    # ---------------------------
+    # Mutation
+    # ---------------------------
+    def append(self, v):
+        if len(self._values) >= self.maxlen:
+            self._evict()
+
+        i = self._idx
+        self._idx += 1
+        self._values.append(v)
+        self._sum += v
+
+        for t in self._at_least:
+            if v >= t:
+                self._at_least[t] += 1
+            if v > t:
+                self._last_above[t] = i
+
+        while self._mins and self._mins[-1][1] >= v:
+            self._mins.pop()
+        self._mins.append((i, v))
+        while self._maxs and self._maxs[-1][1] <= v:
+            self._maxs.pop()
+        self._maxs.append((i, v))
+
+        # Re-anchor the running sum once per window to stop float drift
+        if self._idx % self.maxlen == 0:
+            self._sum = math.fsum(self._values)
+
+        self.version += 1
+
+    def _evict(self):
+        old = self._values.popleft()
+        first = self._idx - len(self._values) - 1  # index of the evicted value
+        self._sum -= old
+        for t in self._at_least:
+            if old >= t:
+                self._at_least[t] -= 1
+        if self._mins and self._mins[0][0] <= first:
+            self._mins.popleft()
+        if self._maxs and self._maxs[0][0] <= first:
+            self._maxs.popleft()
+
+    def clear(self):
+        self._values.clear()
+        self._sum = 0.0
+        for t in self._at_least:
+            self._at_least[t] = 0
+            self._last_above[t] = -math.inf
+        self._mins.clear()
+        self._maxs.clear()
+        self.version += 1
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    @property
+    def mean(self):
+        return self._sum / len(self._values) if self._values else 0
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self):
+        return self._maxs[0][1] if self._maxs else None
+
+    @property
+    def last(self):
+        return self._values[-1] if self._values else None
+
+    def count_at_least(self, threshold):
+        n = self._at_least.get(threshold)
+        if n is None:
+            return sum(1 for v in self._values if v >= threshold)
+        return n
+
+    def fraction_at_least(self, threshold):
+        return self.count_at_least(threshold) / len(self._values) if self._values else 0.0
+
+    def any_above_recent(self, threshold, n: int = 5):
+        """True if any of the newest n values is > threshold."""
+        last = self._last_above.get(threshold)
+        if last is None:
+            k = min(n, len(self._values))
+            return any(self._values[-j] > threshold for j in range(1, k + 1))
+        return last >= self._idx - min(n, len(self._values))
+
+
+# =========================================================
+# Per-sample analysis memoization
+# =========================================================
+class AnalysisCache:
+    """
+    Keeps the newest analysis result per metric.
+    - key: anything that changes when the inputs do (history versions,
+      confidence, current value); a new sample bumps the version, so each
+      analysis runs at most once per distinct input
+    - results are shared between callers and must be treated as read-only
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, metric, key, compute):
+        entry = self._entries.get(metric)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        result = compute()
+        self._entries[metric] = (key, result)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+# =========================================================
+# Streaming spike / change-point detector
+# =========================================================
+class SpikeEvent(NamedTuple):
+    metric: str
+    start_ts: float
+    peak_ts: float
+    end_ts: float
+    baseline: float   # level before the event
+    peak: float
+    plateau: bool     # never came back down; baseline was moved instead
+
+    @property
+    def magnitude(self):
+        return self.peak - self.baseline
+
+    @property
+    def duration_s(self):
+        return self.end_ts - self.start_ts
+
+
+class SpikeDetector:
+    """
+    EWMA baseline + one-sided CUSUM, O(1) per sample.
+    - baseline / noise scale are EWMAs, frozen while an event is open
+    - an event opens when the CUSUM of (x - baseline - k*scale) passes
+      h*scale and the rise is at least min_rise
+    - it closes once the signal is back within end_frac of the rise for
+      `hold` samples; a rise that lasts max_event_s is closed as a plateau
+      and becomes the new baseline (counted once, not per sample)
+    - closed events go to `events` (bounded, oldest first)
+    """
+
+    def __init__(
+        self, metric, min_rise, min_scale,
+        alpha=0.02, k=0.5, h=4.0, end_frac=0.25, hold=3,
+        max_event_s=15 * 60, maxlen=256,
+    ):
+        self.metric = metric
+        self.min_rise = min_rise
+        self.min_scale = min_scale
+        self.alpha = alpha
+        self.k = k
+        self.h = h
+        self.end_frac = end_frac
+        self.hold = hold
+        self.max_event_s = max_event_s
+
+        self.events = deque(maxlen=maxlen)
+        self.version = 0
+        self.last_ts = None
+
+        self._base = None
+        self._dev = 0.0
+        self._cusum = 0.0
+        self._cusum_ts = None   # when the current CUSUM run started
+        self._active = None     # [start_ts, peak_ts, baseline, peak]
+        self._below = 0
+
+    @property
+    def active(self):
+        """The open event as a SpikeEvent (end_ts = now), or None."""
+        if self._active is None:
+            return None
+        start, peak_ts, base, peak = self._active
+        return SpikeEvent(self.metric, start, peak_ts, peak_ts, base, peak, False)
+
+    def update(self, ts, x):
+        """Feed one sample; returns the SpikeEvent closed by it, if any."""
+        if x is None:
+            return None
+        self.version += 1
+        self.last_ts = ts
+        if self._base is None:
+            self._base = float(x)
+            return None
+
+        if self._active is not None:
+            return self._track(ts, x)
+
+        r = x - self._base
+        scale = max(self._dev, self.min_scale)
+        if self._cusum == 0.0:
+            self._cusum_ts = ts
+        self._cusum = max(0.0, self._cusum + r - self.k * scale)
+
+        if self._cusum > self.h * scale and r >= self.min_rise:
+            self._active = [self._cusum_ts, ts, self._base, x]
+            self._below = 0
+            return None
+
+        self._base += self.alpha * r
+        self._dev += self.alpha * (abs(r) - self._dev)
+        return None
+
+    def _track(self, ts, x):
+        ev = self._active
+        if x > ev[3]:
+            ev[1], ev[3] = ts, x
+
+        base, peak = ev[2], ev[3]
+        settle = max(self.end_frac * (peak - base), self.k * max(self._dev, self.min_scale))
+        self._below = self._below + 1 if x - base <= settle else 0
+
+        if self._below >= self.hold:
+            return self._close(ts, plateau=False)
+        if ts - ev[0] >= self.max_event_s:
+            closed = self._close(ts, plateau=True)
+            self._base = float(x)  # level shift: this is the new normal
+            return closed
+        return None
+
+    def _close(self, ts, plateau):
+        start, peak_ts, base, peak = self._active
+        event = SpikeEvent(self.metric, start, peak_ts, ts, base, peak, plateau)
+        self.events.append(event)
+        self._active = None
+        self._cusum = 0.0
+        self._below = 0
+        return event
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def since(self, ts, include_active=True):
+        """Events that ended (or, if open, started) at/after ts, oldest first."""
+        out = []
+        for ev in reversed(self.events):
+            if ev.end_ts < ts:
+                break
+            out.append(ev)
+        out.reverse()
+        if include_active and self._active is not None and self._active[0] >= ts:
+            out.append(self.active)
+        return out
+
+    def count_since(self, ts, include_active=True):
+        n = 0
+        for ev in reversed(self.events):
+            if ev.end_ts < ts:
+                break
+            n += 1
+        if include_active and self._active is not None and self._active[0] >= ts:
+            n += 1
+        return n
+
+
+# =========================================================
+# Online CO2 decay fit (air changes per hour)
+# =========================================================
+class DecayFit(NamedTuple):
+    start_ts: float
+    end_ts: float
+    ach: float         # air changes per hour
+    r2: float
+    n: int
+    c_start: float     # ppm at the start / end of the fitted segment
+    c_end: float
+    confidence: float  # 0..1 (fit quality x segment length)
+
+    @property
+    def duration_s(self):
+        return self.end_ts - self.start_ts
+
+    @property
+    def label(self):
+        if self.confidence >= 0.8:
+            return "High"
+        if self.confidence >= 0.5:
+            return "Medium"
+        return "Low"
+
+
+class DecayFitter:
+    """
+    Tracer-gas decay on the CO2 stream: ln(C - C_out) = a - ACH * t / 3600.
+    - a segment opens when CO2 has fallen start_drop below a peak that was
+      at least min_excess above outdoor; it closes when CO2 rises again by
+      rise_tol (occupancy back), the excess falls under end_excess (noise
+      dominates) or samples stop for max_gap_s
+    - a reading equal to the last accepted one is the SCD41 re-publishing a
+      held value and is not refitted (it still counts as a live sample)
+    - least squares runs on running sums (n, Σt, Σy, Σt², Σty, Σy²), so each
+      sample is O(1) and history is never refit
+    - segments shorter than min_duration_s or with R² < min_r2 are dropped
+    """
+
+    def __init__(
+        self, outdoor_ppm=420.0, min_excess=200.0, end_excess=75.0,
+        start_drop=25.0, rise_tol=30.0, min_duration_s=15 * 60,
+        full_confidence_s=45 * 60, min_r2=0.8, max_gap_s=60.0, maxlen=32,
+    ):
+        self.outdoor_ppm = outdoor_ppm
+        self.min_excess = min_excess
+        self.end_excess = end_excess
+        self.start_drop = start_drop
+        self.rise_tol = rise_tol
+        self.min_duration_s = min_duration_s
+        self.full_confidence_s = full_confidence_s
+        self.min_r2 = min_r2
+        self.max_gap_s = max_gap_s
+
+        self.estimates = deque(maxlen=maxlen)
+        self.version = 0
+
+        self._last = None    # (ts, c) of the last accepted sample
+        self._seen_ts = None  # ts of the last reading, held values included
+        self._peak = None    # (ts, c) candidate segment start
+        self._seg = None     # open segment state
+
+    # ---------------------------
+    # Input
+    # ---------------------------
+    def update(self, ts, c):
+        """Feed one CO2 reading; returns a DecayFit when a segment closes, else None."""
+        if c is None:
+            return None
+        c = float(c)
+        seen, self._seen_ts = self._seen_ts, ts
+        gap = seen is not None and ts - seen > self.max_gap_s
+        if not gap and self._last is not None and c == self._last[1]:
+            # Same reading re-published between SCD41 updates; on a flat
+            # peak the decay still starts from its latest reading
+            if self._seg is None and self._peak is not None and c == self._peak[1]:
+                self._peak = (ts, c)
+            return None
+        self._last = (ts, c)
+        self.version += 1
+
+        closed = None
+        if self._seg is not None:
+            seg = self._seg
+            if gap or c > seg["c_min"] + self.rise_tol or c - self.outdoor_ppm < self.end_excess:
+                closed = self._close()
+            else:
+                self._add(ts, c)
+                return None
+
+        # Looking for a peak to decay from
+        if gap or self._peak is None or c >= self._peak[1]:
+            self._peak = (ts, c)
+        elif (
+            self._peak[1] - self.outdoor_ppm >= self.min_excess
+            and c <= self._peak[1] - self.start_drop
+        ):
+            self._open(*self._peak)
+            self._add(ts, c)
+            self._peak = None
+        return closed
+
+    def _open(self, ts, c):
+        self._seg = {
+            "t0": ts, "c_start": c, "c_end": c, "c_min": c, "end_ts": ts,
+            "n": 0, "st": 0.0, "sy": 0.0, "stt": 0.0, "sty": 0.0, "syy": 0.0,
+        }
+        self._add(ts, c)
+
+    def _add(self, ts, c):
+        seg = self._seg
+        t = ts - seg["t0"]
+        y = math.log(c - self.outdoor_ppm)
+        seg["n"] += 1
+        seg["st"] += t
+        seg["sy"] += y
+        seg["stt"] += t * t
+        seg["sty"] += t * y
+        seg["syy"] += y * y
+        seg["c_end"] = c
+        seg["c_min"] = min(seg["c_min"], c)
+        seg["end_ts"] = ts
+
+    def _fit(self):
+        seg = self._seg
+        n = seg["n"]
+        if n < 3:
+            return None
+        sxx = seg["stt"] - seg["st"] * seg["st"] / n
+        syy = seg["syy"] - seg["sy"] * seg["sy"] / n
+        sxy = seg["sty"] - seg["st"] * seg["sy"] / n
+        if sxx <= 0:
+            return None
+        slope = sxy / sxx
+        r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 0.0
+        duration = seg["end_ts"] - seg["t0"]
+        conf = max(0.0, min(1.0, r2 * min(1.0, duration / self.full_confidence_s)))
+        return DecayFit(
+            seg["t0"], seg["end_ts"], round(-slope * 3600.0, 2), round(r2, 3), n,
+            seg["c_start"], seg["c_end"], round(conf, 2),
+        )
+
+    def _close(self):
+        fit = self._fit()
+        self._seg = None
+        if (
+            fit is None or fit.ach <= 0 or fit.r2 < self.min_r2
+            or fit.duration_s < self.min_duration_s
+        ):
+            return None
+        self.estimates.append(fit)
+        return fit
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    @property
+    def current(self):
+        """Live fit of the open segment once it is long enough, else None."""
+        if self._seg is None:
+            return None
+        fit = self._fit()
+        if fit is None or fit.ach <= 0 or fit.duration_s < self.min_duration_s:
+            return None
+        return fit
+
+    @property
+    def latest(self):
+        """Open segment's fit if usable, otherwise the newest accepted one."""
+        live = self.current
+        if live is not None and live.r2 >= self.min_r2:
+            return live
+        return self.estimates[-1] if self.estimates else None
+
+    def since(self, ts):
+        """Accepted fits that started at/after ts (plus a usable open one)."""
+        out = [f for f in self.estimates if f.start_ts >= ts]
+        live = self.current
+        if live is not None and live.r2 >= self.min_r2 and live.start_ts >= ts:
+            out.append(live)
+        return out
+
+
+# =========================================================
+# Streaming quantile sketch (DDSketch-style, mergeable)
+# =========================================================
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch: value v > 0 lands in bin ceil(log_gamma(v)),
+    gamma = (1 + alpha) / (1 - alpha).
+    - any quantile is returned within relative error alpha (1% default) of
+      the true sample value; bins collapsed by the max_bins cap (smallest
+      magnitudes first) lose that guarantee for the quantiles inside them
+    - memory is bounded by max_bins per sign, whatever the stream length;
+      0.01..100000 at alpha=0.01 needs ~800 bins, so the cap rarely hits
+    - zero and negative values are kept in their own counter / store
+    - sketches with the same alpha merge exactly (bin counts add), so
+      per-job sketches can be combined into site or fleet percentiles
+    """
+
+    def __init__(self, alpha=0.01, max_bins=2048):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be in (0, 1)")
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+
+        self._pos = {}   # bin key -> count
+        self._neg = {}   # bin key of -v -> count
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    # ---------------------------
+    # Input
+    # ---------------------------
+    def _key(self, v):
+        return math.ceil(math.log(v) / self._log_gamma)
+
+    def _value(self, key):
+        # Midpoint (in relative terms) of (gamma^(k-1), gamma^k]
+        return 2.0 * self._gamma ** key / (self._gamma + 1.0)
+
+    def add(self, v, n=1):
+        if v is None:
+            return
+        v = float(v)
+        if math.isnan(v):
+            return
+        if v > 0:
+            store = self._pos
+            k = self._key(v)
+        elif v < 0:
+            store = self._neg
+            k = self._key(-v)
+        else:
+            store = None
+        if store is None:
+            self.zero += n
+        else:
+            store[k] = store.get(k, 0) + n
+            if len(store) > self.max_bins:
+                self._collapse(store)
+
+        self.count += n
+        self.sum += v * n
+        if self.min is None or v < self.min:
+            self.min = v
+        if self.max is None or v > self.max:
+            self.max = v
+
+    def _collapse(self, store):
+        """Fold the smallest-magnitude bins into one to respect max_bins."""
+        keys = sorted(store)
+        extra = len(keys) - self.max_bins
+        folded = sum(store.pop(k) for k in keys[:extra])
+        keep = keys[extra]
+        store[keep] += folded
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        for src, dst in ((other._pos, self._pos), (other._neg, self._neg)):
+            for k, c in src.items():
+                dst[k] = dst.get(k, 0) + c
+            if len(dst) > self.max_bins:
+                self._collapse(dst)
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q):
+        """Value at quantile q (0..1), None when empty."""
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for k in sorted(self._neg, reverse=True):   # most negative first
+            seen += self._neg[k]
+            if seen > rank:
+                return self._clamp(-self._value(k))
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for k in sorted(self._pos):
+            seen += self._pos[k]
+            if seen > rank:
+                return self._clamp(self._value(k))
+        return self.max
+
+    def quantiles(self, qs):
+        return [self.quantile(q) for q in qs]
+
+    def _clamp(self, v):
+        return min(max(v, self.min), self.max)
+
+    def summary(self, qs=(0.5, 0.9, 0.95, 0.99), digits=1):
+        """{count, min, max, mean, p50, ...} for reports (values rounded)."""
+        def r(v):
+            return None if v is None else round(v, digits)
+
+        out = {"count": self.count, "min": r(self.min), "max": r(self.max), "mean": r(self.mean)}
+        for q in qs:
+            out[f"p{q * 100:g}"] = r(self.quantile(q))
+        return out
+
+    # ---------------------------
+    # Persistence (JSON-friendly)
+    # ---------------------------
+    def to_state(self):
+        return {
+            "alpha": self.alpha,
+            "max_bins": self.max_bins,
+            "count": self.count,
+            "zero": self.zero,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "pos": sorted(self._pos.items()),
+            "neg": sorted(self._neg.items()),
+        }
+
+    @classmethod
+    def from_state(cls, st):
+        sk = cls(st["alpha"], st.get("max_bins", 2048))
+        sk._pos = {int(k): int(c) for k, c in st.get("pos", ())}
+        sk._neg = {int(k): int(c) for k, c in st.get("neg", ())}
+        sk.zero = int(st.get("zero", 0))
+        sk.count = int(st.get("count", 0))
+        sk.sum = float(st.get("sum", 0.0))
+        sk.min = st.get("min")
+        sk.max = st.get("max")
+        return sk
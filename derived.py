@@ -0,0 +1,111 @@
+import math
+
+
+# =========================================================
+# Derived comfort / moisture metrics (computed once per sample)
+# =========================================================
+# Inputs are the Sample's temp (°F) and humidity (%RH); results are cached
+# on the Sample itself by derive(), so history, scoring, survey storage and
+# the UI all read the same numbers without redoing the exp/log math.
+DERIVED_METRICS = ("dew_point", "abs_humidity", "heat_index", "mold_risk")
+
+# Magnus coefficients (Sonntag 1990, -45..60 °C)
+MAGNUS_A = 17.62
+MAGNUS_B = 243.12  # °C
+
+# Mold risk (0 = low, 1 = moderate, 2 = high); growth needs sustained
+# damp air in roughly the 41–104 °F band, RH is what a survey can act on
+MOLD_RH_MODERATE = 60
+MOLD_RH_HIGH = 70
+MOLD_TEMP_MIN = 41   # °F
+MOLD_TEMP_MAX = 104
+MOLD_RISK_MODERATE = 1
+MOLD_RISK_HIGH = 2
+MOLD_RISK_LABELS = ("Low", "Moderate", "High")
+
+
+def f_to_c(f):
+    return (f - 32.0) * 5.0 / 9.0
+
+
+def c_to_f(c):
+    return c * 9.0 / 5.0 + 32.0
+
+
+def _vapor_pressure_hpa(temp_c, rh):
+    """Actual water vapour pressure (hPa) from temperature and %RH."""
+    return 6.112 * math.exp(MAGNUS_A * temp_c / (MAGNUS_B + temp_c)) * rh / 100.0
+
+
+def dew_point_f(temp_f, rh):
+    """Dew point (°F), Magnus approximation (±0.2 °C in the indoor range)."""
+    if rh <= 0:
+        return None
+    t = f_to_c(temp_f)
+    g = math.log(rh / 100.0) + MAGNUS_A * t / (MAGNUS_B + t)
+    return c_to_f(MAGNUS_B * g / (MAGNUS_A - g))
+
+
+def absolute_humidity(temp_f, rh):
+    """Water vapour density (g/m³)."""
+    t = f_to_c(temp_f)
+    return 216.7 * _vapor_pressure_hpa(t, rh) / (273.15 + t)
+
+
+def heat_index_f(temp_f, rh):
+    """
+    NWS heat index (°F): Steadman's simple form below ~80 °F, otherwise the
+    Rothfusz regression with the NWS low/high humidity adjustments.
+    """
+    t, r = temp_f, rh
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + r * 0.094)
+    if (simple + t) / 2.0 < 80.0:
+        return simple
+
+    hi = (
+        -42.379 + 2.04901523 * t + 10.14333127 * r
+        - 0.22475541 * t * r - 0.00683783 * t * t - 0.05481717 * r * r
+        + 0.00122874 * t * t * r + 0.00085282 * t * r * r
+        - 0.00000199 * t * t * r * r
+    )
+    if r < 13 and 80 <= t <= 112:
+        hi -= ((13 - r) / 4.0) * math.sqrt((17 - abs(t - 95.0)) / 17.0)
+    elif r > 85 and 80 <= t <= 87:
+        hi += ((r - 85) / 10.0) * ((87 - t) / 5.0)
+    return hi
+
+
+def mold_risk(temp_f, rh):
+    """0 low / 1 moderate / 2 high (see MOLD_RH_* and MOLD_TEMP_*)."""
+    if not MOLD_TEMP_MIN <= temp_f <= MOLD_TEMP_MAX:
+        return 0
+    if rh >= MOLD_RH_HIGH:
+        return MOLD_RISK_HIGH
+    if rh >= MOLD_RH_MODERATE:
+        return MOLD_RISK_MODERATE
+    return 0
+
+
+def mold_risk_label(level):
+    return MOLD_RISK_LABELS[level] if level is not None else None
+
+
+# ---------------------------
+# Pipeline stage
+# ---------------------------
+def derived_values(temp_f, rh):
+    """{metric: value} for DERIVED_METRICS; all None without temp/RH."""
+    if temp_f is None or rh is None:
+        return dict.fromkeys(DERIVED_METRICS)
+    dp = dew_point_f(temp_f, rh)
+    return {
+        "dew_point": None if dp is None else round(dp, 1),
+        "abs_humidity": round(absolute_humidity(temp_f, rh), 2),
+        "heat_index": round(heat_index_f(temp_f, rh), 1),
+        "mold_risk": mold_risk(temp_f, rh),
+    }
+
+
+def derive(sample):
+    """Sample with its derived fields filled in (one call per acquisition)."""
+    return sample._replace(**derived_values(sample.temp, sample.humidity))
@@ -0,0 +1,321 @@
+import json
+import math
+import os
+from array import array
+
+from scoring import CO2_ELEVATED_MAX
+
+
+# =========================================================
+# Exposure channels
+# =========================================================
+# name: (metric, trailing window s, threshold)
+#   threshold None -> time-weighted average / mean of the value
+#   threshold set  -> time spent above it (exceedance minutes)
+CO2_EXPOSURE_LIMIT = 1000  # ppm, common indoor guideline (below the 1200 alert)
+
+EXPOSURE_CHANNELS = {
+    "co_8h": ("co", 8 * 3600, None),
+    "pm25_24h": ("pm25", 24 * 3600, None),
+    "co2_over_1000_24h": ("co2", 24 * 3600, CO2_EXPOSURE_LIMIT),
+    "co2_over_1200_24h": ("co2", 24 * 3600, CO2_ELEVATED_MAX),
+}
+
+EXPOSURE_BUCKET_S = 60
+EXPOSURE_MAX_GAP_S = 90.0   # longer gaps between samples count as "no data"
+EXPOSURE_STATE_VERSION = 1
+
+
+# =========================================================
+# Trailing-window integral (array ring, O(1) per sample)
+# =========================================================
+class WindowIntegral:
+    """
+    Integral of a piecewise-constant signal over a trailing window.
+    - fixed buckets keyed by absolute bucket id (wall clock // bucket_s)
+    - running totals are updated on add/evict, never recomputed per read
+    - area = value-seconds, cov = seconds with data
+    """
+
+    def __init__(self, window_s, bucket_s=EXPOSURE_BUCKET_S):
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.n = max(1, int(window_s // bucket_s))
+        self.ids = array("q", [-1]) * self.n
+        self.area = array("d", [0.0]) * self.n
+        self.cov = array("d", [0.0]) * self.n
+        self.total_area = 0.0
+        self.total_cov = 0.0
+        self.head = -1           # newest bucket id in the window
+        self._since_resum = 0
+
+    def add(self, t0, t1, value):
+        """Accumulate `value` held constant over [t0, t1)."""
+        bs = self.bucket_s
+        while t0 < t1:
+            b = int(t0 // bs)
+            end = min(t1, (b + 1) * bs)
+            dt = end - t0
+            self._add_bucket(b, value * dt, dt)
+            t0 = end
+
+    def _add_bucket(self, b, area, cov):
+        if b <= self.head - self.n:
+            return  # older than the window
+        if b > self.head:
+            self.expire_to(b)
+        i = b % self.n
+        if self.ids[i] != b:
+            return  # slot was recycled; only possible for out-of-window ids
+        self.area[i] += area
+        self.cov[i] += cov
+        self.total_area += area
+        self.total_cov += cov
+
+    def expire_to(self, b):
+        """Advance the window head to bucket b, evicting what falls out."""
+        if b <= self.head:
+            return
+        for nb in range(max(self.head + 1, b - self.n + 1), b + 1):
+            i = nb % self.n
+            if self.ids[i] >= 0:
+                self.total_area -= self.area[i]
+                self.total_cov -= self.cov[i]
+            self.ids[i] = nb
+            self.area[i] = 0.0
+            self.cov[i] = 0.0
+        self.head = b
+
+        # Re-anchor the running totals once per ring to stop float drift
+        self._since_resum += 1
+        if self._since_resum >= self.n:
+            self._since_resum = 0
+            self.total_area = math.fsum(self.area)
+            self.total_cov = math.fsum(self.cov)
+
+    def expire(self, now):
+        self.expire_to(int(now // self.bucket_s))
+
+    # ---------------------------
+    # Results
+    # ---------------------------
+    @property
+    def mean(self):
+        """Average over the time that has data (None without data)."""
+        return self.total_area / self.total_cov if self.total_cov > 0 else None
+
+    @property
+    def twa(self):
+        """Time-weighted average over the full window (no data counts as 0)."""
+        return self.total_area / self.window_s
+
+    @property
+    def coverage(self):
+        return min(1.0, self.total_cov / self.window_s)
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def to_state(self):
+        return {
+            "head": self.head,
+            "buckets": [
+                [self.ids[i], round(self.area[i], 3), round(self.cov[i], 3)]
+                for i in range(self.n)
+                if self.ids[i] >= 0 and self.cov[i] > 0
+            ],
+        }
+
+    def load_state(self, st):
+        self.__init__(self.window_s, self.bucket_s)
+        self.head = int(st.get("head", -1))
+        for b, area, cov in st.get("buckets", ()):
+            if b <= self.head - self.n or b > self.head:
+                continue
+            i = b % self.n
+            self.ids[i] = b
+            self.area[i] = area
+            self.cov[i] = cov
+        # Slots in the window without saved data are empty, not stale
+        for nb in range(self.head - self.n + 1, self.head + 1):
+            if nb >= 0 and self.ids[nb % self.n] != nb:
+                self.ids[nb % self.n] = nb
+        self.total_area = math.fsum(self.area)
+        self.total_cov = math.fsum(self.cov)
+
+
+# =========================================================
+# Exposure engine
+# =========================================================
+class ExposureEngine:
+    """
+    Regulatory-window exposure, updated incrementally per sample.
+    - each value is held until the next sample of that metric (timestamps,
+      so irregular sampling is weighted correctly); gaps > max_gap_s and
+      missing values are not counted
+    - channels: 8 h CO TWA, 24 h PM2.5 mean, 24 h CO2 minutes above limits
+    - optional session totals (a survey) over the same channels
+    - state round-trips through JSON so restarts keep the windows
+    """
+
+    def __init__(self, channels=EXPOSURE_CHANNELS, bucket_s=EXPOSURE_BUCKET_S, max_gap_s=EXPOSURE_MAX_GAP_S):
+        self.channels = dict(channels)
+        self.bucket_s = bucket_s
+        self.max_gap_s = max_gap_s
+        self.windows = {
+            name: WindowIntegral(window_s, bucket_s)
+            for name, (_, window_s, _) in self.channels.items()
+        }
+        self._by_metric = {}
+        for name, (metric, _, threshold) in self.channels.items():
+            self._by_metric.setdefault(metric, []).append((name, threshold))
+
+        self._prev = {}        # metric -> (ts, value) held since ts
+        self.last_ts = None
+        self.session = None    # {"start_ts", "totals": {name: [area, cov]}, "max": {metric: v}}
+
+    # ---------------------------
+    # Input
+    # ---------------------------
+    def add(self, ts, values):
+        """values: {metric: value or None} for one sample at wall time ts."""
+        for metric, v in values.items():
+            chans = self._by_metric.get(metric)
+            if chans is None:
+                continue
+            prev = self._prev.get(metric)
+            if prev is not None and 0 < ts - prev[0] <= self.max_gap_s:
+                self._integrate(chans, prev[0], ts, prev[1])
+            if v is None:
+                self._prev[metric] = None
+            else:
+                v = float(v)
+                self._prev[metric] = (ts, v)
+                if self.session is not None:
+                    mx = self.session["max"]
+                    if metric not in mx or v > mx[metric]:
+                        mx[metric] = v
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def _integrate(self, chans, t0, t1, v):
+        dt = t1 - t0
+        for name, threshold in chans:
+            x = v if threshold is None else (1.0 if v > threshold else 0.0)
+            self.windows[name].add(t0, t1, x)
+            if self.session is not None:
+                tot = self.session["totals"][name]
+                tot[0] += x * dt
+                tot[1] += dt
+
+    # ---------------------------
+    # Output
+    # ---------------------------
+    def snapshot(self, now=None):
+        """Current value of every channel (mean/TWA or minutes above)."""
+        now = now if now is not None else self.last_ts
+        out = {}
+        for name, (metric, window_s, threshold) in self.channels.items():
+            w = self.windows[name]
+            if now is not None:
+                w.expire(now)
+            entry = {
+                "metric": metric,
+                "window_h": round(window_s / 3600, 1),
+                "coverage": round(w.coverage, 3),
+            }
+            if threshold is None:
+                entry["twa"] = round(w.twa, 2)
+                entry["mean"] = None if w.mean is None else round(w.mean, 2)
+            else:
+                entry["threshold"] = threshold
+                entry["minutes"] = round(w.total_area / 60.0, 1)
+            out[name] = entry
+        return out
+
+    # ---------------------------
+    # Session (survey) totals
+    # ---------------------------
+    def start_session(self, ts):
+        self.session = {
+            "start_ts": ts,
+            "totals": {name: [0.0, 0.0] for name in self.channels},
+            "max": {},
+        }
+
+    def session_summary(self, now=None):
+        if self.session is None:
+            return None
+        now = now if now is not None else self.last_ts
+        out = {
+            "start_ts": self.session["start_ts"],
+            "duration_min": round(max(0.0, (now or self.session["start_ts"]) - self.session["start_ts"]) / 60.0, 1),
+            "max": {m: round(v, 2) for m, v in self.session["max"].items()},
+        }
+        for name, (metric, _, threshold) in self.channels.items():
+            area, cov = self.session["totals"][name]
+            if threshold is None:
+                out[f"{metric}_mean"] = round(area / cov, 2) if cov > 0 else None
+            else:
+                out[f"{metric}_minutes_over_{threshold}"] = round(area / 60.0, 1)
+        return out
+
+    def stop_session(self, now=None):
+        summary = self.session_summary(now)
+        self.session = None
+        return summary
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def to_state(self):
+        return {
+            "version": EXPOSURE_STATE_VERSION,
+            "bucket_s": self.bucket_s,
+            "last_ts": self.last_ts,
+            "prev": {m: list(p) for m, p in self._prev.items() if p is not None},
+            "windows": {name: w.to_state() for name, w in self.windows.items()},
+        }
+
+    def load_state(self, st):
+        if st.get("version") != EXPOSURE_STATE_VERSION or st.get("bucket_s") != self.bucket_s:
+            return False
+        for name, ws in st.get("windows", {}).items():
+            if name in self.windows:
+                self.windows[name].load_state(ws)
+        self._prev = {m: (float(p[0]), float(p[1])) for m, p in st.get("prev", {}).items()}
+        self.last_ts = st.get("last_ts")
+        # Survey sessions do not survive a restart (the dashboard starts with
+        # survey mode off), so session totals are never persisted or restored
+        return True
+
+    def save(self, path):
+        """Atomic JSON checkpoint; returns False (and logs) on failure."""
+        return save_state(self.to_state(), path)
+
+    def load(self, path):
+        try:
+            return self.load_state(json.loads(path.read_text()))
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print("Exposure state load failed:", repr(e))
+            return False
+
+
+def save_state(state, path):
+    """
+    Write a to_state() dict atomically: temp file, fsync, rename.
+    Safe to call off the GUI thread (state is a fresh, unshared dict).
+    """
+    try:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(json.dumps(state, separators=(",", ":")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        print("Exposure state save failed:", repr(e))
+        return False
@@ -0,0 +1,263 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+
+# =========================================================
+# Priority classes (lower = served first)
+# =========================================================
+PRIORITY_SAFETY = 0    # CO / life-safety reads
+PRIORITY_MEASURE = 1   # regular sensor sampling
+PRIORITY_PROBE = 2     # driver init, bus scans
+PRIORITY_DIAG = 3      # diagnostics / technician tools
+
+PRIORITY_NAMES = {
+    PRIORITY_SAFETY: "safety",
+    PRIORITY_MEASURE: "measure",
+    PRIORITY_PROBE: "probe",
+    PRIORITY_DIAG: "diag",
+}
+
+# Max time a transaction may wait for the bus before TimeoutError
+DEFAULT_DEADLINES = {
+    PRIORITY_SAFETY: 0.25,
+    PRIORITY_MEASURE: 0.5,
+    PRIORITY_PROBE: 2.0,
+    PRIORITY_DIAG: 2.0,
+}
+
+
+# =========================================================
+# Fixed-bucket latency histogram
+# =========================================================
+class Histogram:
+    # Upper bucket edges in ms (last bucket is open-ended)
+    EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    __slots__ = ("counts", "n", "total_s", "max_s")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.n = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def add(self, seconds: float):
+        ms = seconds * 1000.0
+        i = 0
+        for edge in self.EDGES_MS:
+            if ms <= edge:
+                break
+            i += 1
+        self.counts[i] += 1
+        self.n += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+
+    def percentile_ms(self, p: float):
+        """Upper edge of the bucket holding the p-th percentile (None if empty)."""
+        if not self.n:
+            return None
+        target = p / 100.0 * self.n
+        run = 0
+        for i, c in enumerate(self.counts):
+            run += c
+            if run >= target:
+                return self.EDGES_MS[i] if i < len(self.EDGES_MS) else round(self.max_s * 1000.0, 1)
+        return round(self.max_s * 1000.0, 1)
+
+    def summary(self):
+        return {
+            "n": self.n,
+            "mean_ms": round(self.total_s / self.n * 1000.0, 2) if self.n else None,
+            "p50_ms": self.percentile_ms(50),
+            "p95_ms": self.percentile_ms(95),
+            "max_ms": round(self.max_s * 1000.0, 2),
+            "buckets": list(self.counts),
+        }
+
+
+class _DeviceStats:
+    __slots__ = ("wait", "hold", "timeouts", "overruns")
+
+    def __init__(self):
+        self.wait = Histogram()
+        self.hold = Histogram()
+        self.timeouts = 0
+        self.overruns = 0
+
+
+# =========================================================
+# Bus arbiter
+# =========================================================
+class BusArbiter:
+    """
+    Single owner of the I2C bus.
+    - every bus transaction acquires here (via ArbitratedI2C.try_lock)
+    - waiters are served by priority class, FIFO within a class
+    - a waiter past its deadline gets TimeoutError instead of spinning
+    - per-device histograms of lock wait and transaction (hold) time
+
+    Callers describe what they are doing with context():
+
+        with bus.context("scd41", PRIORITY_MEASURE):
+            co2 = scd41.CO2
+    """
+
+    def __init__(self, hold_budget_s: float = 0.1):
+        self.hold_budget_s = hold_budget_s  # holds longer than this count as overruns
+
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = []   # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._owner = None   # thread ident
+        self._depth = 0
+        self._held_since = 0.0
+        self._held_by = None
+
+        self._local = threading.local()
+        self._stats = {}
+
+    # ---------------------------
+    # Caller context (thread-local)
+    # ---------------------------
+    @contextmanager
+    def context(self, device: str, priority: int = PRIORITY_MEASURE, deadline_s: float = None):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if deadline_s is None:
+            deadline_s = DEFAULT_DEADLINES.get(priority, 1.0)
+        stack.append((device, priority, deadline_s))
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def _current(self):
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            return stack[-1]
+        return ("unknown", PRIORITY_MEASURE, DEFAULT_DEADLINES[PRIORITY_MEASURE])
+
+    def _dev(self, device):
+        st = self._stats.get(device)
+        if st is None:
+            st = self._stats[device] = _DeviceStats()
+        return st
+
+    # ---------------------------
+    # Acquire / release
+    # ---------------------------
+    def acquire(self):
+        """Block until granted (by priority) or raise TimeoutError at the deadline."""
+        device, priority, deadline_s = self._current()
+        me = threading.get_ident()
+        t0 = time.monotonic()
+
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1  # re-entrant from the same thread
+                return
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            deadline = t0 + deadline_s
+            while self._owner is not None or self._waiters[0] != entry:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._dev(device).timeouts += 1
+                    self._cond.notify_all()
+                    raise TimeoutError(
+                        f"I2C bus wait > {deadline_s:.2f}s ({device}, {PRIORITY_NAMES.get(priority, priority)})"
+                    )
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._waiters)
+            self._owner = me
+            self._depth = 1
+            now = time.monotonic()
+            self._held_since = now
+            self._held_by = device
+            self._dev(device).wait.add(now - t0)
+
+    def release(self):
+        with self._cond:
+            if self._owner != threading.get_ident():
+                return
+            self._depth -= 1
+            if self._depth:
+                return
+
+            held = time.monotonic() - self._held_since
+            st = self._dev(self._held_by)
+            st.hold.add(held)
+            if held > self.hold_budget_s:
+                st.overruns += 1
+
+            self._owner = None
+            self._held_by = None
+            self._cond.notify_all()
+
+    # ---------------------------
+    # Metrics
+    # ---------------------------
+    def stats(self):
+        with self._cond:
+            return {
+                device: {
+                    "wait": st.wait.summary(),
+                    "hold": st.hold.summary(),
+                    "timeouts": st.timeouts,
+                    "overruns": st.overruns,
+                }
+                for device, st in self._stats.items()
+            }
+
+    def busy_fraction(self, window_s: float):
+        """Total hold time across devices / window_s (rough bus utilisation)."""
+        with self._cond:
+            total = sum(st.hold.total_s for st in self._stats.values())
+        return total / window_s if window_s > 0 else 0.0
+
+
+# =========================================================
+# I2C proxy handed to the drivers
+# =========================================================
+class ArbitratedI2C:
+    """
+    Wraps a busio.I2C so every driver transaction goes through the arbiter.
+    Adafruit drivers spin on try_lock(); here try_lock() blocks on the
+    arbiter instead (by priority) and raises TimeoutError past the deadline.
+    Everything else (scan, readfrom_into, writeto, ...) is passed through.
+    """
+
+    def __init__(self, i2c, arbiter: BusArbiter):
+        self._i2c = i2c
+        self._arbiter = arbiter
+
+    def try_lock(self):
+        self._arbiter.acquire()
+        # Everyone goes through the arbiter, so this only spins if some
+        # code bypasses it with the raw bus
+        t0 = time.monotonic()
+        while not self._i2c.try_lock():
+            if time.monotonic() - t0 > 0.5:
+                self._arbiter.release()
+                raise TimeoutError("I2C lock held outside the arbiter")
+            time.sleep(0.001)
+        return True
+
+    def unlock(self):
+        try:
+            self._i2c.unlock()
+        finally:
+            self._arbiter.release()
+
+    def __getattr__(self, name):
+        return getattr(self._i2c, name)
@@ -18,11 +18,31 @@ import serial
 import random
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from enum import Enum
+from typing import NamedTuple
 
 from sensirion_gas_index_algorithm.voc_algorithm import VocAlgorithm
 from technician_mode import TechnicianMode
+from acquisition import AcquisitionEngine, SampleScheduler, SensorSupervisor, Sample, METRICS
+from replay import SampleRecorder, SampleReplayer
+from i2c_bus import BusArbiter, ArbitratedI2C, PRIORITY_SAFETY, PRIORITY_MEASURE, PRIORITY_PROBE
+from analytics import RollingWindow, AnalysisCache, SpikeDetector, DecayFitter, QuantileSketch
+from tiered_history import TieredHistory
+from exposure import ExposureEngine, save_state as save_exposure_state
+import survey_log
+from survey_catalog import SurveyCatalog
+from derived import MOLD_RISK_MODERATE, MOLD_RISK_HIGH, mold_risk_label
+from scoring import (
+    AlertState, CO_DANGER_THRESHOLD, MISSING_DEFAULTS,
+    PM25_GOOD_MAX, PM25_MODERATE_MAX, CO2_GOOD_MAX, CO2_ELEVATED_MAX,
+    VOC_GOOD_MAX, VOC_MODERATE_MAX, VOC_ELEVATED_MAX, CO_SAFE_MAX,
+    HUMIDITY_LOW, TEMP_COOL, TEMP_WARM, SEVERITY_TABLES,
+    alert_state, alert_level, final_score,
+    pm25_penalty, co2_penalty, voc_penalty, co_penalty,
+)
 
 
 from PyQt5 import QtWidgets, QtGui, QtCore
@@ -31,6 +51,7 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 # APP CONSTANTS
 # =========================================================
 WIDTH, HEIGHT = 800, 480
+DATA_DIR = Path.home() / ".howlx_scout"
 
 # =========================================================
 # SENSOR LIB IMPORTS (per-sensor, so one missing lib doesn't kill all)
@@ -59,10 +80,10 @@ if SENSORS_AVAILABLE:
         print("BME680 lib missing:", repr(e))
 
     try:
-        from adafruit_pm25.uart import PM25_UART
+        from pm25_uart import PlantowerReader
         HAS_PM25 = True
     except Exception as e:
-        print("PM25 lib missing:", repr(e))
+        print("PM25 reader unavailable:", repr(e))
 
     try:
         import adafruit_sgp40
@@ -91,10 +112,77 @@ def voc_confidence():
         return "High"
 
 
+# =========================================================
+# VOC ALGORITHM STATE (checkpoint / restore across reboots)
+# =========================================================
+VOC_STATE_FILE = DATA_DIR / "voc_state.json"
+VOC_STATE_SAVE_S = 120                           # checkpoint interval
+VOC_STATE_MAX_AGE_S = 10 * 60                    # Sensirion: don't resume after >10 min off
+VOC_STATE_MIN_LEARN_S = 3 * 3600                 # Sensirion: states valid after >=3 h running
+
+_voc_learn_start = None   # wall time the current baseline started learning
+_voc_state_saved = 0.0
+
+
+def save_voc_state(now=None):
+    """Checkpoint the learned VOC baseline (atomic replace)."""
+    global _voc_state_saved
+    if _voc_algo is None or _voc_learn_start is None or not hasattr(_voc_algo, "get_states"):
+        return False
+
+    now = now or time.time()
+    learned_s = now - _voc_learn_start
+    if learned_s < VOC_STATE_MIN_LEARN_S:
+        return False
+
+    try:
+        state0, state1 = _voc_algo.get_states()
+        VOC_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = VOC_STATE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "state0": state0,
+            "state1": state1,
+            "saved_at": now,
+            "learned_s": learned_s,
+        }))
+        os.replace(tmp, VOC_STATE_FILE)
+    except Exception as e:
+        print("VOC state save failed:", repr(e))
+        _voc_state_saved = now  # retry next interval, not every sample
+        return False
+
+    _voc_state_saved = now
+    return True
+
+
+def restore_voc_state(algo, now=None):
+    """
+    Load a recent checkpoint into a fresh VocAlgorithm.
+    Returns the restored learning time in seconds, or None.
+    """
+    now = now or time.time()
+    if not hasattr(algo, "set_states"):
+        return None
+    try:
+        st = json.loads(VOC_STATE_FILE.read_text())
+        age = now - float(st["saved_at"])
+        if not (0 <= age <= VOC_STATE_MAX_AGE_S):
+            print(f"VOC state too old to restore ({age:.0f}s)")
+            return None
+        algo.set_states(float(st["state0"]), float(st["state1"]))
+        return float(st["learned_s"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print("VOC state restore failed:", repr(e))
+        return None
+
+
 # =========================================================
 # GLOBAL SENSOR STATE (single source of truth)
 # =========================================================
-_i2c = None
+_i2c = None   # ArbitratedI2C; every transaction goes through _bus
+_bus = BusArbiter()
 _scd41 = None
 _scd41_last_co2 = None
 _bme688 = None
@@ -103,17 +191,11 @@ _sgp40 = None
 _voc_algo = None
 
 
-_pm25_latest = None
-_pm25_lock = threading.Lock()
-_pm25_thread_started = False
-
-
-_scd41_miss = 0
-_bme688_miss = 0
-_pm25_miss = 0
-_sgp40_miss = 0
+_pm25_seen_seq = 0  # last PM frame folded into a reading
+PM25_PORT = "/dev/ttyAMA0"
+PM25_STALE_AFTER_S = 10.0
+PM25_ERROR_AFTER_S = 60.0    # no frame for this long (or ever, since init) -> ERROR
 
-MISS_LIMIT = 5
 
 class SensorState(Enum):
     MISSING = 0
@@ -138,6 +220,48 @@ SENSOR_SINCE = {
 
 }
 
+# Guards STATUS + SINCE so lifecycle changes land together
+_sensor_lock = threading.Lock()
+_KEEP = object()
+
+
+def _set_sensor_state(key, state, since=_KEEP):
+    with _sensor_lock:
+        SENSOR_STATUS[key] = state
+        if since is not _KEEP:
+            SENSOR_SINCE[key] = since
+
+
+# Which sensor backs each metric (VOC may come from the BME688 gas proxy)
+METRIC_SENSOR = {
+    "co":       "co",
+    "co2":      "scd41",
+    "pm25":     "pm25",
+    "voc":      "sgp40",
+    "temp":     "bme688",
+    "humidity": "bme688",
+}
+
+
+def sensor_status_since():
+    """{sensor: (state, since)} in one consistent read (for recordings)."""
+    with _sensor_lock:
+        return {k: (v, SENSOR_SINCE.get(k)) for k, v in SENSOR_STATUS.items()}
+
+
+def apply_replayed_status(sensor, state, age_s):
+    """Status transition from a recording; SINCE is rebased onto the local clock."""
+    _set_sensor_state(sensor, state, since=None if age_s is None else time.time() - age_s)
+
+
+def _metric_states(voc_sensor="sgp40"):
+    """Sensor state per metric, aligned with METRICS (one consistent read)."""
+    with _sensor_lock:
+        return tuple(
+            SENSOR_STATUS.get(voc_sensor if m == "voc" else METRIC_SENSOR[m])
+            for m in METRICS
+        )
+
 # =========================================================
 # I2C scan helpers (safe + throttled)
 # =========================================================
@@ -147,7 +271,8 @@ _last_i2c_addrs = set()
 def _i2c_scan(i2c, interval_s: float = 5.0, lock_timeout_s: float = 0.75):
     """
     Safe, throttled I2C scan.
-    - Won't spin forever trying to lock.
+    - Goes through the bus arbiter at probe priority (sensor reads win).
+    - Won't wait longer than lock_timeout_s for the bus.
     - Reuses last scan results for interval_s seconds.
     """
     global _last_i2c_scan_ts, _last_i2c_addrs
@@ -156,215 +281,187 @@ def _i2c_scan(i2c, interval_s: float = 5.0, lock_timeout_s: float = 0.75):
     if _last_i2c_addrs and (now - _last_i2c_scan_ts) < interval_s:
         return set(_last_i2c_addrs)
 
-    t0 = now
-    while not i2c.try_lock():
-        if (time.time() - t0) > lock_timeout_s:
-            raise TimeoutError("I2C lock timeout")
-        time.sleep(0.01)
-
-    try:
-        addrs = set(i2c.scan())
-    finally:
+    with _bus.context("scan", PRIORITY_PROBE, deadline_s=lock_timeout_s):
+        i2c.try_lock()  # arbitrated: raises TimeoutError past the deadline
         try:
+            addrs = set(i2c.scan())
+        finally:
             i2c.unlock()
-        except Exception:
-            pass
 
     _last_i2c_addrs = set(addrs)
     _last_i2c_scan_ts = time.time()
     return set(addrs)
 
 
+def i2c_bus_stats():
+    """Per-device lock wait / transaction time histograms from the arbiter."""
+    return _bus.stats()
 
-def init_sensors():
-    global _i2c, _scd41, _bme688, _pm25, _sgp40
-    global _scd41_miss, _bme688_miss, _pm25_miss, _sgp40_miss
 
-    # If core libs missing, hard-disable everything
-    if not SENSORS_AVAILABLE:
-        SENSOR_STATUS["scd41"] = SensorState.MISSING
-        SENSOR_STATUS["bme688"] = SensorState.MISSING
-        SENSOR_STATUS["pm25"] = SensorState.MISSING
-        SENSOR_STATUS["co"] = SensorState.MISSING
-        SENSOR_SINCE["scd41"] = None
-        SENSOR_SINCE["bme688"] = None
-        SENSOR_SINCE["pm25"] = None
+
+# =========================================================
+# Sensor lifecycle (per-sensor init; used by the supervisor)
+# =========================================================
+SENSOR_RETRY_BASE_S = 5.0    # first retry after a sensor drops out
+SENSOR_RETRY_MAX_S = 300.0   # backoff cap
+_supervisor = None
+
+
+def _ensure_i2c():
+    global _i2c
+    if _i2c is None:
+        _i2c = ArbitratedI2C(busio.I2C(board.SCL, board.SDA), _bus)
+
+        # Scan ONLY for logging, once per bus bring-up (scan can miss devices)
+        try:
+            addrs = _i2c_scan(_i2c, interval_s=90.0)
+            print("I2C scan (log):", [hex(a) for a in sorted(addrs)])
+        except Exception as e:
+            print("I2C scan skipped:", repr(e))
+    return _i2c
+
+
+def _init_scd41():
+    global _scd41
+    try:
+        with _bus.context("scd41", PRIORITY_PROBE):
+            dev = adafruit_scd4x.SCD4X(_ensure_i2c())  # ctor stops any running measurement
+            dev.start_periodic_measurement()
+    except Exception as e:
+        print("SCD41 init error:", repr(e))
         _scd41 = None
+        _set_sensor_state("scd41", SensorState.ERROR, since=None)
+        return False
+
+    _scd41 = dev
+    _set_sensor_state("scd41", SensorState.WARMUP, since=time.time())
+    return True
+
+
+def _init_bme688():
+    global _bme688
+    try:
+        with _bus.context("bme688", PRIORITY_PROBE):
+            dev = adafruit_bme680.Adafruit_BME680_I2C(_ensure_i2c())
+            set_heater = getattr(dev, "set_gas_heater", None)  # newer drivers only
+            if set_heater is not None:
+                set_heater(BME688_HEATER_TEMP_C, BME688_HEATER_MS)
+        dev.sea_level_pressure = 1013.25
+    except Exception as e:
+        print("BME688 init error:", repr(e))
         _bme688 = None
-        _pm25 = None
+        _set_sensor_state("bme688", SensorState.ERROR, since=None)
         return False
 
-    # Ensure I2C exists BEFORE any scan/init
-    if _i2c is None:
-        _i2c = busio.I2C(board.SCL, board.SDA)
+    _bme688 = dev
+    _set_sensor_state("bme688", SensorState.WARMUP, since=time.time())
+    return True
+
 
-    # Optional: scan ONLY for logging, and do it rarely.
+def _init_sgp40():
+    global _sgp40, _voc_algo, _voc_learn_start
     try:
-        addrs = _i2c_scan(_i2c, interval_s=90.0)
-        print("I2C scan (log):", [hex(a) for a in sorted(addrs)])
+        with _bus.context("sgp40", PRIORITY_PROBE):
+            dev = adafruit_sgp40.SGP40(_ensure_i2c())
     except Exception as e:
-        print("I2C scan skipped:", repr(e))
-
-    # Gate ONLY by per-lib flags (scan can miss devices)
-    has_scd41 = HAS_SCD4X
-    has_bme   = HAS_BME680
-    has_pm25  = HAS_PM25
-
-    # ---- SCD41 ----
-    if has_scd41:
-        _scd41_miss = 0
-        if _scd41 is None:
-            try:
-                _scd41 = adafruit_scd4x.SCD4X(_i2c)
-                _scd41.start_periodic_measurement()
-                SENSOR_STATUS["scd41"] = SensorState.WARMUP
-                SENSOR_SINCE["scd41"] = time.time()
-            except Exception as e:
-                print("SCD41 init error:", repr(e))
-                _scd41 = None
-                SENSOR_STATUS["scd41"] = SensorState.ERROR
-                SENSOR_SINCE["scd41"] = None
-        else:
-            if SENSOR_STATUS["scd41"] in (SensorState.MISSING, SensorState.ERROR, SensorState.STALE):
-                SENSOR_STATUS["scd41"] = SensorState.WARMUP
-                if SENSOR_SINCE.get("scd41") is None:
-                    SENSOR_SINCE["scd41"] = time.time()
-    else:
-        _scd41_miss += 1
-        if _scd41_miss >= MISS_LIMIT:
-            _scd41 = None
-            SENSOR_STATUS["scd41"] = SensorState.STALE
-            SENSOR_SINCE["scd41"] = None
-        else:
-            if _scd41 is not None:
-                SENSOR_STATUS["scd41"] = SensorState.STALE
-
-    # ---- BME688 ----
-    if has_bme:
-        _bme688_miss = 0
-        if _bme688 is None:
-            try:
-                _bme688 = adafruit_bme680.Adafruit_BME680_I2C(_i2c)
-                _bme688.sea_level_pressure = 1013.25
-                SENSOR_STATUS["bme688"] = SensorState.WARMUP
-                SENSOR_SINCE["bme688"] = time.time()
-            except Exception as e:
-                print("BME688 init error:", repr(e))
-                _bme688 = None
-                SENSOR_STATUS["bme688"] = SensorState.ERROR
-                SENSOR_SINCE["bme688"] = None
-        else:
-            if SENSOR_STATUS["bme688"] in (SensorState.MISSING, SensorState.ERROR, SensorState.STALE):
-                SENSOR_STATUS["bme688"] = SensorState.WARMUP
-                if SENSOR_SINCE.get("bme688") is None:
-                    SENSOR_SINCE["bme688"] = time.time()
-    else:
-        _bme688_miss += 1
-        if _bme688_miss >= MISS_LIMIT:
-            _bme688 = None
-            SENSOR_STATUS["bme688"] = SensorState.MISSING
-            SENSOR_SINCE["bme688"] = None
-        else:
-            if _bme688 is not None:
-                SENSOR_STATUS["bme688"] = SensorState.STALE
+        print("SGP40 init error:", repr(e))
+        _sgp40 = None
+        _set_sensor_state("sgp40", SensorState.ERROR, since=None)
+        return False
 
-    # ---- SGP40 (VOC) ----
+    now = time.time()
+    since = now
+
+    # ✅ init VOC algorithm ONCE (resume a recent baseline if one was saved)
+    if _voc_algo is None:
+        _voc_algo = VocAlgorithm()
+        learned_s = restore_voc_state(_voc_algo, now)
+        if learned_s is not None:
+            print(f"VOC baseline restored ({learned_s / 60:.0f} min learned)")
+            since = now - learned_s  # voc_confidence() picks up where it left off
+        _voc_learn_start = since
+
+    _sgp40 = dev
+    _set_sensor_state("sgp40", SensorState.WARMUP, since=since)
+    return True
+
+
+def _init_pm25():
+    global _pm25, _pm25_seen_seq
+    if _pm25 is not None:
+        _pm25.stop()
+        _pm25 = None
+    try:
+        # Frame-synchronized reader thread: blocks on UART bytes,
+        # validates each frame and buffers all of them
+        reader = PlantowerReader(PM25_PORT, baudrate=9600)
+        reader.start()
+    except Exception as e:
+        print("PM2.5 UART init error:", repr(e))
+        _set_sensor_state("pm25", SensorState.ERROR, since=None)
+        return False
+
+    _pm25_seen_seq = 0  # a new reader numbers its frames from 1 again
+    _latest["pm25"] = None
+    _pm25 = reader
+    _set_sensor_state("pm25", SensorState.WARMUP, since=time.time())
+    return True
+
+
+def _sensor_probes():
+    """Init function per sensor whose driver lib is importable."""
+    probes = {}
+    if not SENSORS_AVAILABLE:
+        return probes
+    if HAS_SCD4X:
+        probes["scd41"] = _init_scd41
+    if HAS_BME680:
+        probes["bme688"] = _init_bme688
     if HAS_SGP40:
-        _sgp40_miss = 0
-        if _sgp40 is None:
-            try:
-                _sgp40 = adafruit_sgp40.SGP40(_i2c)
-
-                # ✅ init VOC algorithm ONCE
-                global _voc_algo
-                if _voc_algo is None:
-                    _voc_algo = VocAlgorithm()
-
-                SENSOR_STATUS["sgp40"] = SensorState.WARMUP
-                SENSOR_SINCE["sgp40"] = time.time()
-            except Exception as e:
-                print("SGP40 init error:", repr(e))
-                _sgp40 = None
-                SENSOR_STATUS["sgp40"] = SensorState.ERROR
-                SENSOR_SINCE["sgp40"] = None
-    else:
-        _sgp40_miss += 1
-        if _sgp40_miss >= MISS_LIMIT:
-            _sgp40 = None
-            SENSOR_STATUS["sgp40"] = SensorState.MISSING
-            SENSOR_SINCE["sgp40"] = None
-
-    # ---- PM2.5 (Plantower over UART) ----
-    # ---- PM2.5 (Plantower over UART via pyserial) ----
-    if has_pm25:
-        _pm25_miss = 0
-
-        if _pm25 is None:
-            try:
-                # Use pyserial against the actual UART device
-                # (timeout short keeps reads snappy)
-                ser = serial.Serial("/dev/ttyAMA0", baudrate=9600, timeout=0.1)
-
-                # PM25_UART expects a UART-like object; pyserial works
-                _pm25 = PM25_UART(ser, reset_pin=None)
-
-                SENSOR_STATUS["pm25"] = SensorState.WARMUP
-                SENSOR_SINCE["pm25"] = time.time()
-
-                # Start background reader thread once (keeps latest reading fresh)
-                global _pm25_thread_started, _pm25_latest
-
-                if not _pm25_thread_started:
-                    _pm25_thread_started = True
-
-                    def _pm25_reader():
-                        global _pm25_latest
-                        while True:
-                            try:
-                                d = _pm25.read()
-                                if d:
-                                    with _pm25_lock:
-                                        _pm25_latest = d
-                            except Exception:
-                                # ignore transient read errors; keep looping
-                                pass
-                            time.sleep(0.05)  # ~20Hz check; low CPU
-
-                    threading.Thread(target=_pm25_reader, daemon=True).start()
-
-            except Exception as e:
-                print("PM2.5 UART init error:", repr(e))
-                _pm25 = None
-                SENSOR_STATUS["pm25"] = SensorState.ERROR
-                SENSOR_SINCE["pm25"] = None
+        probes["sgp40"] = _init_sgp40
+    if HAS_PM25:
+        probes["pm25"] = _init_pm25
+    return probes
 
-        else:
-            # already initialized
-            if SENSOR_STATUS["pm25"] in (SensorState.MISSING, SensorState.ERROR, SensorState.STALE):
-                SENSOR_STATUS["pm25"] = SensorState.WARMUP
-                if SENSOR_SINCE.get("pm25") is None:
-                    SENSOR_SINCE["pm25"] = time.time()
 
-    else:
-        _pm25_miss += 1
-        if _pm25_miss >= MISS_LIMIT:
-            _pm25 = None
-            SENSOR_STATUS["pm25"] = SensorState.MISSING
-            SENSOR_SINCE["pm25"] = None
-        else:
-            if _pm25 is not None:
-                SENSOR_STATUS["pm25"] = SensorState.STALE
+def _sensor_down(key) -> bool:
+    return SENSOR_STATUS.get(key) in (SensorState.MISSING, SensorState.ERROR)
+
+
+def init_sensors():
+    """
+    Boot-time bring-up: probe every sensor once, synchronously, then hand
+    reconnection to the supervisor thread. Call before the acquisition
+    worker starts so its first Sample comes from the hardware that is up.
+    """
+    # If core libs missing, hard-disable everything
+    if not SENSORS_AVAILABLE:
+        for key in ("scd41", "bme688", "pm25", "sgp40", "co"):
+            _set_sensor_state(key, SensorState.MISSING, since=None)
+        return False
+
+    start_sensor_supervisor()
 
     # CO still not installed
-    SENSOR_STATUS["co"] = SensorState.MISSING
+    _set_sensor_state("co", SensorState.MISSING)
     return True
 
 
+def start_sensor_supervisor():
+    """Start background (re)connection after one synchronous pass; safe to call more than once."""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = SensorSupervisor(
+            _sensor_probes(),
+            _sensor_down,
+            base_s=SENSOR_RETRY_BASE_S,
+            max_s=SENSOR_RETRY_MAX_S,
+        )
+        # Sensors that fail here wait base_s before the thread retries them
+        _supervisor.check(immediate=True)
+        _supervisor.start()
+    return _supervisor
 
-# ---------------------------
-# CO danger threshold
-# ---------------------------
-CO_DANGER_THRESHOLD = 35  # ppm
 
 
 def add_watermark(parent, x, y, w=350, opacity=0.06):
@@ -389,145 +486,278 @@ def add_watermark(parent, x, y, w=350, opacity=0.06):
 # Mock data (replace later)
 # ---------------------------
 def mock_readings():
-    return {
-        "co2": random.randint(450, 2000),
-        "pm25": round(random.uniform(2, 500), 1),
-        "voc": round(random.uniform(0.2, 2.8), 2),
-        "temp": round(random.uniform(68, 78), 1),
-        "humidity": round(random.uniform(35, 55), 1),
-        "co": round(random.uniform(0, 30), 1),
-    }
+    return Sample(
+        mono=time.monotonic(),
+        ts=time.time(),
+        co2=random.randint(450, 2000),
+        pm25=round(random.uniform(2, 500), 1),
+        voc=round(random.uniform(0.2, 2.8), 2),
+        temp=round(random.uniform(68, 78), 1),
+        humidity=round(random.uniform(35, 55), 1),
+        co=round(random.uniform(0, 30), 1),
+        states=_metric_states(),
+    )
     
 # === SENSOR BACKEND ===
-def read_sensors():
-    global _scd41_last_co2
-    global _last_init_attempt
-    global _sgp40, _bme688, _pm25, _scd41
+# ---------------------------
+# Per-sensor sampling cadence (seconds)
+# ---------------------------
+SAMPLE_PERIODS = {
+    "pm25":   1.0,  # Plantower streams ~1 frame/s
+    "sgp40":  1.0,  # Sensirion VocAlgorithm assumes 1 Hz sampling
+    "scd41":  5.0,  # periodic mode only produces new data every 5 s
+    "bme688": 3.0,
+}
+SCD41_RETRY_S = 0.5          # data_ready was False -> poll again shortly
+PIPELINED_READS = True       # overlap conversions of sensors due in the same pass
+SCD41_STALE_AFTER_S = 15.0   # no fresh CO2 for this long -> STALE
+
+# BME688 gas heater profile (applied at init when the driver supports it)
+BME688_HEATER_TEMP_C = 320
+BME688_HEATER_MS = 150
+
+# Latest value per metric, written by the sample tasks below
+_latest = {
+    "co2": None,
+    "pm25": None,
+    "voc": None,
+    "bme": None,   # BMESample: one record, replaced (never edited) per read
+}
+_scd41_last_ts = None
 
-    # only (re)initialize occasionally; don't scan/init every tick
-    if "_last_init_attempt" not in globals():
-        _last_init_attempt = 0.0
 
-    INIT_RETRY_INTERVAL = 15.0  # seconds
+def pm25_frames(since_seq: int = 0):
+    """Every buffered PM frame newer than since_seq (per-second PM data)."""
+    reader = _pm25
+    if reader is None:
+        return []
+    return reader.since(since_seq)
 
-    if (time.time() - _last_init_attempt) > INIT_RETRY_INTERVAL:
-        _last_init_attempt = time.time()
-        init_sensors()
 
-    # If nothing came up at all, fall back (THIS MUST BE INSIDE THE FUNCTION)
-    if _scd41 is None and _bme688 is None and _pm25 is None:
-        return mock_readings()
+def _sample_pm25():
+    global _pm25_seen_seq
+    reader = _pm25  # the supervisor may swap or clear the global meanwhile
+    if reader is None:
+        return
+    try:
+        frames = reader.since(_pm25_seen_seq)
+
+        if frames:
+            if reader is not _pm25:
+                return  # replaced mid-read; its seq numbers no longer apply
+            # Fold every frame since the last sample in, not just the newest
+            _pm25_seen_seq = frames[-1].seq
+            _latest["pm25"] = sum(f.data["pm25 standard"] for f in frames) / len(frames)
+            _set_sensor_state("pm25", SensorState.READY)
+        else:
+            # Silent UART: STALE first, then ERROR so the supervisor re-probes
+            # (reopens the port) with its backoff
+            last = reader.latest()
+            if last is None:
+                since = SENSOR_SINCE.get("pm25")
+                silent_s = 0.0 if since is None else time.time() - since
+                state = SensorState.WARMUP
+            else:
+                silent_s = time.monotonic() - last.mono
+                state = SensorState.STALE if silent_s > PM25_STALE_AFTER_S else None
+            if silent_s > PM25_ERROR_AFTER_S:
+                state = SensorState.ERROR
+            if state is not None:
+                _set_sensor_state("pm25", state)
 
-    # --- PM2.5 ---
-    pm25_val = None
-    if _pm25 is not None:
-        try:
-            with _pm25_lock:
-                d = _pm25_latest
+    except Exception as e:
+        print("PM2.5 read error:", repr(e))
+        _set_sensor_state("pm25", SensorState.ERROR)
 
-            if d:
-                pm25_val = float(d["pm25 standard"])
-                SENSOR_STATUS["pm25"] = SensorState.READY
-            else:
-                SENSOR_STATUS["pm25"] = SensorState.WARMUP
 
-        except Exception as e:
-            print("PM2.5 read error:", repr(e))
-            SENSOR_STATUS["pm25"] = SensorState.ERROR
+def _sample_scd41():
+    """Returns False when no new measurement was ready (scheduler retries)."""
+    global _scd41_last_co2, _scd41_last_ts
+    if _scd41 is None:
+        return
+    try:
+        now = time.time()
+        warmup_s = 10
+        since = SENSOR_SINCE.get("scd41") or now
+        warmed = (now - since) >= warmup_s
+
+        if _scd41.data_ready:
+            co2 = int(_scd41.CO2)  # Adafruit uses .CO2 (caps)
+            _scd41_last_co2 = co2
+            _scd41_last_ts = now
+            _latest["co2"] = co2
+            _set_sensor_state("scd41", SensorState.READY)
+            return True
+
+        if _scd41_last_co2 is None:
+            _set_sensor_state("scd41", SensorState.WARMUP)
+        elif warmed and (now - (_scd41_last_ts or now)) > SCD41_STALE_AFTER_S:
+            _set_sensor_state("scd41", SensorState.STALE)
+        return False
 
-    # --- SCD41 CO2 ---
-    co2 = None
-    if _scd41 is not None:
-        try:
-            warmup_s = 10
-            since = SENSOR_SINCE.get("scd41") or time.time()
-            warmed = (time.time() - since) >= warmup_s
+    except Exception as e:
+        print("SCD41 read error:", repr(e))
+        _latest["co2"] = None
+        _set_sensor_state("scd41", SensorState.ERROR)
 
-            # Optional debug:
-            # print("SCD41 data_ready:", _scd41.data_ready, "last_co2:", _scd41_last_co2)
 
-            if _scd41.data_ready:
-                co2 = int(_scd41.CO2)  # Adafruit uses .CO2 (caps)
-                _scd41_last_co2 = co2
-                SENSOR_STATUS["scd41"] = SensorState.READY
-            else:
-                if _scd41_last_co2 is None:
-                    SENSOR_STATUS["scd41"] = SensorState.WARMUP
-                else:
-                    co2 = _scd41_last_co2
-                    SENSOR_STATUS["scd41"] = SensorState.STALE if warmed else SensorState.WARMUP
+class BMESample(NamedTuple):
+    temp_c: float
+    humidity: float
+    pressure_hpa: float
+    gas_ohms: float
 
-        except Exception as e:
-            print("SCD41 read error:", repr(e))
-            SENSOR_STATUS["scd41"] = SensorState.ERROR
 
-    # --- BME688 temp/humidity + gas ---
-    temp_f = None
-    humidity = None
-    gas = None
+def read_bme688_sample(dev):
+    """
+    One forced-mode measurement -> one coherent record.
+    The driver's properties each call _perform_reading(); trigger it once and
+    pin the refresh window so all four values come from the same raw data.
+    """
+    perform = getattr(dev, "_perform_reading", None)
+    if perform is None or not hasattr(dev, "_min_refresh_time"):
+        # Unknown driver version: plain property reads
+        return BMESample(dev.temperature, dev.relative_humidity, dev.pressure, getattr(dev, "gas", None))
+
+    perform()
+    hold = dev._min_refresh_time
+    dev._min_refresh_time = float("inf")
+    try:
+        return BMESample(dev.temperature, dev.relative_humidity, dev.pressure, dev.gas)
+    finally:
+        dev._min_refresh_time = hold
 
-    if _bme688 is not None:
-        try:
-            temp_f = (_bme688.temperature * 9/5) + 32
-            humidity = _bme688.relative_humidity
-            gas = getattr(_bme688, "gas", None)
 
-            warmup_s = 60
-            since = SENSOR_SINCE.get("bme688") or time.time()
-            SENSOR_STATUS["bme688"] = SensorState.WARMUP if (time.time() - since) < warmup_s else SensorState.READY
+def _sample_bme688():
+    if _bme688 is None:
+        return
+    try:
+        # One atomic store, so readers on other sampler threads never mix
+        # two instants
+        _latest["bme"] = read_bme688_sample(_bme688)
 
-        except Exception as e:
-            print("BME688 read error:", repr(e))
-            SENSOR_STATUS["bme688"] = SensorState.ERROR
+        warmup_s = 60
+        since = SENSOR_SINCE.get("bme688") or time.time()
+        _set_sensor_state("bme688", SensorState.WARMUP if (time.time() - since) < warmup_s else SensorState.READY)
 
-    voc = None
+    except Exception as e:
+        print("BME688 read error:", repr(e))
+        _latest["bme"] = None
+        _set_sensor_state("bme688", SensorState.ERROR)
 
-    # --- SGP40 VOC (preferred) ---
-    if _sgp40 is not None:
-        try:
-            rh = humidity if humidity is not None else 50.0
-            t = (temp_f - 32) * 5/9 if temp_f is not None else 25.0
 
-            raw = _sgp40.measure_raw(
-                temperature=t,
-                relative_humidity=rh
-            )
+def _sample_sgp40():
+    if _sgp40 is None:
+        return
+    try:
+        # Compensate with the most recent BME688 sample (one coherent record)
+        bme = _latest["bme"]
+        if bme is None or bme.temp_c is None or bme.humidity is None:
+            t, rh = 25.0, 50.0
+        else:
+            t, rh = bme.temp_c, bme.humidity
 
-            # ✅ Sensirion VOC Index (0–500 scale)
-            voc = int(_voc_algo.process(raw))
+        raw = _sgp40.measure_raw(
+            temperature=t,
+            relative_humidity=rh
+        )
 
-            SENSOR_STATUS["sgp40"] = SensorState.READY
+        # ✅ Sensirion VOC Index (0–500 scale)
+        _latest["voc"] = int(_voc_algo.process(raw))
 
-        except Exception as e:
-            print("SGP40 read error:", repr(e))
-            SENSOR_STATUS["sgp40"] = SensorState.ERROR
+        if (time.time() - _voc_state_saved) >= VOC_STATE_SAVE_S:
+            save_voc_state()
 
-    # --- fallback only if no SGP40 ---
-    elif gas is not None and SENSOR_STATUS["bme688"] == SensorState.READY:
-        voc = voc_proxy_from_gas_ohms(float(gas))
+        _set_sensor_state("sgp40", SensorState.READY)
 
+    except Exception as e:
+        print("SGP40 read error:", repr(e))
+        _latest["voc"] = None
+        _set_sensor_state("sgp40", SensorState.ERROR)
 
-    # Safe defaults for UI (keep these if you want temp/humidity always shown)
-    if temp_f is None:
-        temp_f = 72.0
-    if humidity is None:
-        humidity = 45.0
 
-    return {
-        "co2": None if co2 is None else int(co2),
-        "pm25": None if pm25_val is None else round(pm25_val, 1),
-        "voc": voc,
-        "temp": round(float(temp_f), 1),
-        "humidity": round(float(humidity), 1),
-        "co": None,  # not installed yet
-    }
+# Bus priority per I2C sensor (CO/safety reads jump the queue once installed)
+SENSOR_BUS_PRIORITY = {
+    "co":     PRIORITY_SAFETY,
+    "scd41":  PRIORITY_MEASURE,
+    "bme688": PRIORITY_MEASURE,
+    "sgp40":  PRIORITY_MEASURE,
+}
+
+
+def _on_bus(key, fn):
+    """Run a sample task with its I2C transactions tagged for the arbiter."""
+    priority = SENSOR_BUS_PRIORITY.get(key, PRIORITY_MEASURE)
+
+    def run():
+        with _bus.context(key, priority):
+            return fn()
+    return run
 
 
+_sampler = SampleScheduler(
+    executor=ThreadPoolExecutor(max_workers=4, thread_name_prefix="sampler") if PIPELINED_READS else None
+)
+_sampler.add("pm25", _sample_pm25, SAMPLE_PERIODS["pm25"])  # UART, not on the I2C bus
+_sampler.add("sgp40", _on_bus("sgp40", _sample_sgp40), SAMPLE_PERIODS["sgp40"])
+_sampler.add("scd41", _on_bus("scd41", _sample_scd41), SAMPLE_PERIODS["scd41"], retry_s=SCD41_RETRY_S)
+_sampler.add("bme688", _on_bus("bme688", _sample_bme688), SAMPLE_PERIODS["bme688"])
+
+
+def acquisition_latency_stats():
+    """Per-pass read latency (wall vs summed per-sensor time) by read mode and pass size."""
+    return _sampler.latency_stats()
+
+
+# Shown (and fed to the temp/humidity analysis) while the BME688 has no reading
+TEMP_PLACEHOLDER_F = 72.0
+HUMIDITY_PLACEHOLDER = 45.0
+
+
+def read_sensors():
+    # Sensor (re)connection is owned by the supervisor thread, not this path
+    mono, ts = time.monotonic(), time.time()
+
+    # Nothing up (yet): publish an empty reading, never mock data
+    if _scd41 is None and _bme688 is None and _pm25 is None:
+        return Sample(mono=mono, ts=ts, states=_metric_states())
+
+    # Only the sensors whose period has elapsed touch the bus this call
+    _sampler.run_due()
+
+    co2 = _latest["co2"] if _scd41 is not None else None
+    pm25_val = _latest["pm25"] if _pm25 is not None else None
+
+    bme = _latest["bme"] if _bme688 is not None else None
+    temp_f = None
+    humidity = None
+    if bme is not None and bme.temp_c is not None:
+        temp_f = (bme.temp_c * 9/5) + 32
+        humidity = bme.humidity
+
+    voc = None
+    if _sgp40 is not None:
+        voc = _latest["voc"]
+
+    # --- fallback only if no SGP40 ---
+    elif bme is not None and bme.gas_ohms is not None and SENSOR_STATUS["bme688"] == SensorState.READY:
+        voc = voc_proxy_from_gas_ohms(float(bme.gas_ohms))
+
+
+    # No BME688 reading -> None, so derived metrics, history and the survey
+    # log stay empty; the UI shows TEMP/HUMIDITY_PLACEHOLDER instead
+    return Sample(
+        mono=mono,
+        ts=ts,
+        co2=None if co2 is None else int(co2),
+        pm25=None if pm25_val is None else round(pm25_val, 1),
+        voc=voc,
+        temp=None if temp_f is None else round(float(temp_f), 1),
+        humidity=None if humidity is None else round(float(humidity), 1),
+        co=None,  # not installed yet
+        states=_metric_states("sgp40" if _sgp40 is not None else "bme688"),
+    )
 
-class AlertState(Enum):
-    NORMAL = 0
-    WARNING = 1
-    CRITICAL = 2
 
 
 def penalty_color(points):
@@ -539,7 +769,7 @@ def penalty_color(points):
     return "#ffeb3b"      # yellow
 
 
-def evaluate_readings(d, history):
+def evaluate_readings(d, history, long_history=None, spikes=None):
     """
     Returns:
       score (int),
@@ -550,10 +780,10 @@ def evaluate_readings(d, history):
     breakdown = []
     how = []
 
-    co  = nval(d.get("co"), 0.0)
-    pm  = nval(d.get("pm25"), 0.0)
-    co2 = nval(d.get("co2"), 450)
-    voc = nval(d.get("voc"), 0.0)
+    co  = nval(d.co, MISSING_DEFAULTS["co"])
+    pm  = nval(d.pm25, MISSING_DEFAULTS["pm25"])
+    co2 = nval(d.co2, MISSING_DEFAULTS["co2"])
+    voc = nval(d.voc, MISSING_DEFAULTS["voc"])
 
     has_co  = installed_state("co")
     has_pm  = installed_state("pm25")
@@ -561,19 +791,9 @@ def evaluate_readings(d, history):
     has_voc = installed_state("sgp40") or installed_state("bme688")  # proxy from BME688 gas when SGP40 unavaile
 
     # -------------------------
-    # Alert state (safety first)
+    # Alert state (safety first; rules live in scoring.py)
     # -------------------------
-    if has_co and co >= CO_DANGER_THRESHOLD:
-        state = AlertState.CRITICAL
-    elif (
-    (has_pm and pm > 35) or
-    (has_co2 and co2 > 1200) or
-    (has_voc and voc >= 150) or
-    (has_co and co >= 9)
-):
-        state = AlertState.WARNING
-    else:
-        state = AlertState.NORMAL
+    state = alert_state(co, pm, co2, voc, has_co, has_pm, has_co2, has_voc)
 
     score = 100
 
@@ -582,13 +802,11 @@ def evaluate_readings(d, history):
     # PM2.5 analysis & penalty
     # -------------------------
     if has_pm:
-        pm25_analysis = analyze_pm25(pm, history.get("pm25", []))
+        pm25_analysis = cached_analysis(
+            "pm25", pm, history.get("pm25", []), long_history, spikes=(spikes or {}).get("pm25")
+        )
 
-        pm_pen = 0
-        if pm > 35:
-            pm_pen = -25
-        elif pm > 12:
-            pm_pen = -10
+        pm_pen = pm25_penalty(pm)
 
         if pm_pen:
             score += pm_pen
@@ -607,12 +825,10 @@ def evaluate_readings(d, history):
     # CO2 penalty
     # -------------------------
     if has_co2:
-        co2_pen = 0
-        if co2 > 1200:
-            co2_pen = -20
+        co2_pen = co2_penalty(co2)
+        if co2_pen <= -20:
             how.append("Increase fresh air ventilation; consider checking HVAC outside air settings.")
-        elif co2 > 800:
-            co2_pen = -10
+        elif co2_pen:
             how.append("Ventilation could be improved (open door/window briefly or increase outside air).")
 
         if co2_pen:
@@ -629,12 +845,10 @@ def evaluate_readings(d, history):
     # VOC penalty (VOC can be None during warmup)
     # -------------------------
     if has_voc and voc_confidence() != "Low":
-        voc_pen = 0
-        if voc > 250:
-            voc_pen = -20
+        voc_pen = voc_penalty(voc)
+        if voc_pen <= -20:
             how.append("Reduce VOC sources (cleaners/solvents); increase ventilation; consider activated carbon filtration.")
-        elif voc > 150:
-            voc_pen = -10
+        elif voc_pen:
             how.append("Ventilate and reduce VOC sources (fragrances, sprays, harsh cleaners).")
 
         if voc_pen:
@@ -651,13 +865,11 @@ def evaluate_readings(d, history):
     # CO penalty (dominant safety factor)
     # -------------------------
     if has_co:
-        co_pen = 0
-        if co >= CO_DANGER_THRESHOLD:
-            co_pen = -60
+        co_pen = co_penalty(co)
+        if co_pen <= -60:
             how.insert(0, "CO is dangerous — ventilate immediately and shut off combustion sources.")
             how.insert(1, "Evacuate if levels remain high; verify with a calibrated meter.")
-        elif co >= 9:
-            co_pen = -20
+        elif co_pen:
             how.insert(0, "CO detected — investigate combustion sources and improve ventilation.")
 
         if co_pen:
@@ -670,11 +882,17 @@ def evaluate_readings(d, history):
             })
 
 
-    # Hard safety cap: if CRITICAL, cap the score so it never looks “okay”
-    if state == AlertState.CRITICAL:
-        score = min(score, 30)
+    # -------------------------
+    # Mold risk (advice only; never changes the score)
+    # -------------------------
+    if d.mold_risk == MOLD_RISK_HIGH:
+        how.append("Humidity is high enough to support mold growth; dehumidify and look for moisture sources.")
+    elif d.mold_risk == MOLD_RISK_MODERATE:
+        how.append("Keep relative humidity below 60% to limit mold risk.")
 
-    score = max(min(int(score), 100), 0)
+
+    # Hard safety cap: if CRITICAL, cap the score so it never looks “okay”
+    score = final_score(score, state)
 
     # Keep how-to clean (no duplicates)
     seen = set()
@@ -702,68 +920,144 @@ def installed_state(sensor_key: str) -> bool:
 # ---------------------------
 # Severity helpers
 # ---------------------------
+# Bands live in scoring.SEVERITY_TABLES (bisect lookup; index_array() for series)
 def pm25_severity(v):
-    if v <= 12:
-        return ("Good", "#4caf50", "Air quality is healthy.")
-    elif v <= 35:
-        return ("Moderate", "#ffeb3b", "Sensitive individuals may be affected.")
-    elif v <= 55:
-        return ("Poor", "#ff9800", "Unhealthy for sensitive groups.")
-    else:
-        return ("Unhealthy", "#f44336", "Unhealthy for everyone.")
+    return SEVERITY_TABLES["pm25"].lookup(v)
 
 def co2_severity(v):
-    if v <= 800:
-        return ("Good", "#4caf50", "Ventilation is adequate.")
-    elif v <= 1200:
-        return ("Elevated", "#ff9800", "Ventilation could be improved.")
-    else:
-        return ("High", "#f44336", "Fresh air strongly recommended.")
+    return SEVERITY_TABLES["co2"].lookup(v)
 
 def humidity_severity(v):
-    if 30 <= v <= 50:
-        return ("Optimal", "#4caf50", "Comfortable humidity level.")
-    elif v < 30:
-        return ("Low", "#03a9f4", "May cause dry skin and irritation.")
-    else:
-        return ("High", "#ff9800", "May encourage mold growth.")
-        
+    return SEVERITY_TABLES["humidity"].lookup(v)
+
 def co_severity(v):
-    if v <= 9:
-        return ("Safe", "#4caf50", "Carbon monoxide levels are safe.")
-    elif v <= 35:
-        return ("Elevated", "#ff9800", "CO detected — investigate sources.")
-    else:
-        return ("Danger", "#f44336", "Dangerous CO levels — ventilate immediately.")
-        
+    return SEVERITY_TABLES["co"].lookup(v)
+
 def voc_severity(v):
     if v is None:
         return ("—", "#888888", "VOC sensor warming up.")
-    if v <= 100:
-        return ("Good", "#4caf50", "VOC levels are low.")
-    elif v <= 150:
-        return ("Moderate", "#ffeb3b", "VOC levels slightly elevated.")
-    elif v <= 250:
-        return ("Elevated", "#ff9800", "VOC levels elevated.")
-    else:
-        return ("High", "#f44336", "High VOC levels detected.")
-
+    return SEVERITY_TABLES["voc"].lookup(v)
 
 def temp_severity(v):
-    if v < 68:
-        return ("Cool", "#03a9f4", "Temperature is below comfort range.")
-    elif v <= 78:
-        return ("Comfortable", "#4caf50", "Temperature is within comfort range.")
-    else:
-        return ("Warm", "#ff9800", "Temperature is above comfort range.")
+    return SEVERITY_TABLES["temp"].lookup(v)
 
 # ---------------------------
 # Rolling analysis helpers
 # ---------------------------
+HISTORY_LEN = 40  # ~1 min rolling window
+
+# Thresholds each metric's window keeps running counts for
+HISTORY_THRESHOLDS = {
+    "pm25": (PM25_MODERATE_MAX,),
+    "co2": (CO2_ELEVATED_MAX,),
+    "voc": (VOC_MODERATE_MAX, VOC_ELEVATED_MAX),
+    "co": (CO_SAFE_MAX,),
+    "humidity": (),
+    "temp": (),
+    # Derived once per sample (derived.derive) and stored like the rest
+    "dew_point": (),
+    "abs_humidity": (),
+    "heat_index": (),
+    "mold_risk": (MOLD_RISK_MODERATE, MOLD_RISK_HIGH),
+}
+
+def make_history():
+    return {
+        k: RollingWindow(HISTORY_LEN, thresholds)
+        for k, thresholds in HISTORY_THRESHOLDS.items()
+    }
+
+# Long-horizon history (1 min / 15 min / 1 h buckets, >= 7 days per metric)
+LONG_HISTORY_METRICS = tuple(HISTORY_THRESHOLDS) + ("score",)
+SUSTAINED_WINDOW_S = 30 * 60        # "sustained" / "repeated" look this far back
+SUSTAINED_MIN_COVERAGE_S = 10 * 60  # ...once this much data exists
+
+def make_long_history():
+    return TieredHistory(LONG_HISTORY_METRICS)
+
+# Survey percentiles (streaming quantile sketches, ±1% relative error)
+SURVEY_PERCENTILE_METRICS = tuple(m for m in LONG_HISTORY_METRICS if m != "mold_risk")
+
+def make_quantile_sketches():
+    return {m: QuantileSketch() for m in SURVEY_PERCENTILE_METRICS}
+
+# Exposure windows (8 h CO TWA, 24 h PM2.5, CO₂ minutes over limits)
+EXPOSURE_STATE_FILE = DATA_DIR / "exposure_state.json"
+EXPOSURE_SAVE_S = 60
+
+# Discrete spike events (EWMA/CUSUM), replacing per-sample peak counting
+SPIKE_PARAMS = {
+    "pm25": {"min_rise": 10.0, "min_scale": 2.0},   # µg/m³
+    "voc": {"min_rise": 40.0, "min_scale": 10.0},   # VOC index points
+}
+SPIKE_WINDOW_S = SUSTAINED_WINDOW_S
+SPIKE_REPEAT_MIN = 3  # events within SPIKE_WINDOW_S that count as "repeated"
+
+def make_spike_detectors():
+    return {m: SpikeDetector(m, **params) for m, params in SPIKE_PARAMS.items()}
+
+def recent_spikes(detector, window_s=SPIKE_WINDOW_S):
+    """Spike events in the last window_s (open one included); None without a detector."""
+    if detector is None or detector.last_ts is None:
+        return None
+    return detector.since(detector.last_ts - window_s)
+
+def describe_spikes(events, unit):
+    biggest = max(events, key=lambda e: e.magnitude)
+    return f"{len(events)} events in ~{SPIKE_WINDOW_S // 60} min, largest +{biggest.magnitude:.0f} {unit}".strip()
+
+# CO2 decay -> air changes per hour (outdoor baseline assumed ~420 ppm)
+OUTDOOR_CO2_PPM = 420.0
+
+def make_decay_fitter():
+    return DecayFitter(outdoor_ppm=OUTDOOR_CO2_PPM)
+
+def describe_decay(fit):
+    return (
+        f"{fit.ach:.1f} air changes per hour "
+        f"({fit.label} confidence · R² {fit.r2:.2f} · "
+        f"{fit.duration_s / 60:.0f} min decay {fit.c_start:.0f}→{fit.c_end:.0f} ppm)"
+    )
+
+def decay_summary(fits):
+    """Survey summary entry for the fitted decay segments."""
+    if not fits:
+        return None
+    best = max(fits, key=lambda f: f.confidence)
+    return {
+        "ach": best.ach,
+        "confidence": best.confidence,
+        "confidence_label": best.label,
+        "outdoor_ppm": OUTDOOR_CO2_PPM,
+        "segments": [
+            {
+                "start_ts": f.start_ts, "end_ts": f.end_ts, "ach": f.ach,
+                "r2": f.r2, "confidence": f.confidence,
+                "c_start": f.c_start, "c_end": f.c_end,
+            }
+            for f in fits
+        ],
+    }
+
+def long_view(long_history, metric, seconds=SUSTAINED_WINDOW_S):
+    """Tiered view over the last `seconds`, or None until it has enough data."""
+    if long_history is None or metric not in long_history:
+        return None
+    view = long_history.view(metric, seconds)
+    if view.span_s < SUSTAINED_MIN_COVERAGE_S or not view:
+        return None
+    return view
+
+# The helpers below take a RollingWindow (O(1) running aggregates) or any
+# plain sequence (rescanned)
 def rolling_avg(values):
+    if isinstance(values, RollingWindow):
+        return values.mean
     return sum(values) / len(values) if values else 0
 
 def peak_count(values, threshold):
+    if isinstance(values, RollingWindow):
+        return values.count_at_least(threshold)
     return sum(1 for v in values if v >= threshold)
 
 def sustained(values, threshold, ratio=0.5):
@@ -771,7 +1065,17 @@ def sustained(values, threshold, ratio=0.5):
         return False
     return peak_count(values, threshold) / len(values) >= ratio
 
-def analyze_pm25(current, history):
+def recent_above(values, threshold, n=5):
+    if isinstance(values, RollingWindow):
+        return values.any_above_recent(threshold, n)
+    return any(v > threshold for v in list(values)[-n:])
+
+def window_swing(values):
+    if isinstance(values, RollingWindow):
+        return values.max - values.min
+    return max(values) - min(values)
+
+def analyze_pm25(current, history, long_history=None, spikes=None):
     """
     Returns structured PM2.5 analysis for detail view
     """
@@ -790,19 +1094,28 @@ def analyze_pm25(current, history):
         analysis["health"] = "Short-term exposure risk cannot yet be assessed."
         return analysis
 
-    # 🔧 IMPORTANT: normalize deque → list ONCE
-    values = list(history)
+    avg = rolling_avg(history)
+    peaks = peak_count(history, PM25_MODERATE_MAX)
+    sustained_high = sustained(history, PM25_MODERATE_MAX, ratio=0.75)
 
-    avg = rolling_avg(values)
-    peaks = peak_count(values, 35)
-    sustained_high = sustained(values, 35, ratio=0.75)
+    recent_high = recent_above(history, PM25_MODERATE_MAX)
 
-    recent = values[-5:]
-    recent_high = any(v > 35 for v in recent)
-
-    analysis["confidence"] = "High" if len(values) >= 20 else "Medium"
+    analysis["confidence"] = "High" if len(history) >= 20 else "Medium"
     analysis["window"] = "Rolling (~1 min)"
 
+    # Judge "sustained" / "repeated" on 1-min buckets over ~30 min once available
+    lv = long_view(long_history, "pm25")
+    if lv is not None:
+        sustained_high = lv.fraction_at_least(PM25_MODERATE_MAX) >= 0.75
+        peaks = max(peaks, lv.runs_reaching(PM25_MODERATE_MAX))
+        analysis["window"] = "Rolling (~30 min)"
+
+    repeated = peaks >= 5
+    events = recent_spikes(spikes)
+    if events is not None:
+        # Discrete events: catches sub-threshold spikes, a plateau counts once
+        repeated = len(events) >= SPIKE_REPEAT_MIN
+
     if sustained_high:
         analysis["status"] = "Sustained elevation"
         analysis["summary"] = "PM2.5 levels have remained consistently elevated over time."
@@ -813,9 +1126,11 @@ def analyze_pm25(current, history):
             "Continuous filtration with a HEPA purifier is strongly recommended."
         )
 
-    elif peaks >= 5:
+    elif repeated:
         analysis["status"] = "Repeated spikes"
         analysis["summary"] = "Multiple PM2.5 spikes detected, suggesting intermittent particle sources."
+        if events:
+            analysis["summary"] += f" ({describe_spikes(events, 'µg/m³')})"
         analysis["health"] = "Short-term spikes may aggravate asthma and sensitive individuals."
         analysis["recommendations"].append(
             "Identify intermittent sources such as cooking, candles, or dust disturbance."
@@ -829,7 +1144,7 @@ def analyze_pm25(current, history):
             "Continue ventilation or filtration to ensure levels remain low."
         )
 
-    elif avg <= 12:
+    elif avg <= PM25_GOOD_MAX:
         analysis["status"] = "Stable / Healthy"
         analysis["summary"] = "PM2.5 levels have remained consistently low."
         analysis["health"] = "Air quality is within healthy limits for extended exposure."
@@ -861,7 +1176,7 @@ def voc_proxy_from_gas_ohms(gas_ohms: float) -> float:
     return round(t * 3.0, 2)
 
 
-def analyze_co2(current, history):
+def analyze_co2(current, history, long_history=None, decay=None):
     """
     Returns structured CO₂ analysis for detail view
     """
@@ -881,18 +1196,19 @@ def analyze_co2(current, history):
         analysis["health"] = "Short-term CO₂ exposure at this level cannot yet be assessed."
         return analysis
 
-    # 🔧 Normalize deque → list ONCE
-    values = list(history)
-
-    avg = rolling_avg(values)
-    sustained_high = sustained(values, 1200, ratio=0.7)
+    avg = rolling_avg(history)
+    sustained_high = sustained(history, CO2_ELEVATED_MAX, ratio=0.7)
 
-    recent = values[-5:]
-    recent_high = any(v > 1200 for v in recent)
+    recent_high = recent_above(history, CO2_ELEVATED_MAX)
 
-    analysis["confidence"] = "High" if len(values) >= 20 else "Medium"
+    analysis["confidence"] = "High" if len(history) >= 20 else "Medium"
     analysis["window"] = "Rolling (~1 min)"
 
+    lv = long_view(long_history, "co2")
+    if lv is not None:
+        sustained_high = lv.fraction_at_least(CO2_ELEVATED_MAX) >= 0.7
+        analysis["window"] = "Rolling (~30 min)"
+
     if sustained_high:
         analysis["status"] = "Sustained elevation"
         analysis["summary"] = (
@@ -906,7 +1222,7 @@ def analyze_co2(current, history):
             "Inspect HVAC outside-air intake and damper operation."
         ])
 
-    elif current > 1200:
+    elif current > CO2_ELEVATED_MAX:
         analysis["status"] = "High"
         analysis["summary"] = "CO₂ is currently elevated, suggesting poor air exchange."
         analysis["health"] = "Short-term exposure may reduce concentration and cause drowsiness."
@@ -922,7 +1238,7 @@ def analyze_co2(current, history):
             "Continue ventilation to ensure levels remain stable."
         )
 
-    elif current > 800:
+    elif current > CO2_GOOD_MAX:
         analysis["status"] = "Moderate"
         analysis["summary"] = "CO₂ is moderately elevated and may increase with occupancy."
         analysis["health"] = "Sensitive individuals may notice mild fatigue."
@@ -932,10 +1248,15 @@ def analyze_co2(current, history):
         analysis["summary"] = "CO₂ levels indicate adequate ventilation."
         analysis["health"] = "Air quality supports comfort and cognitive performance."
 
+    # Measured air exchange from the most recent CO₂ decay, when there is one
+    fit = decay.latest if decay is not None else None
+    if fit is not None:
+        analysis["ventilation"] = describe_decay(fit)
+
     return analysis
 
     
-def analyze_voc(current, history):
+def analyze_voc(current, history, long_history=None, spikes=None):
     """
     Returns structured VOC analysis for detail view
     """
@@ -969,19 +1290,23 @@ def analyze_voc(current, history):
         analysis["health"] = "Short-term VOC exposure risk cannot yet be assessed."
         return analysis
 
-    # 🔧 Normalize deque → list ONCE
-    values = list(history)
+    avg = rolling_avg(history)
+    peaks = peak_count(history, VOC_ELEVATED_MAX)
+    sustained_high = sustained(history, VOC_ELEVATED_MAX, ratio=0.6)
 
-    avg = rolling_avg(values)
-    peaks = peak_count(values, 250)
-    sustained_high = sustained(values, 250, ratio=0.6)
-
-    recent = values[-5:]
-    recent_high = any(v > 250 for v in recent)
+    recent_high = recent_above(history, VOC_ELEVATED_MAX)
 
     analysis["confidence"] = conf
     analysis["window"] = "Rolling (~1 min)"
 
+    lv = long_view(long_history, "voc")
+    if lv is not None:
+        sustained_high = lv.fraction_at_least(VOC_ELEVATED_MAX) >= 0.6
+        analysis["window"] = "Rolling (~30 min)"
+
+    events = recent_spikes(spikes)
+    repeated = events is not None and len(events) >= SPIKE_REPEAT_MIN
+
     if sustained_high:
         analysis["status"] = "Sustained elevation"
         analysis["summary"] = (
@@ -996,7 +1321,7 @@ def analyze_voc(current, history):
             "Consider activated carbon or charcoal filtration."
         ])
 
-    elif current > 250:
+    elif current > VOC_ELEVATED_MAX:
         analysis["status"] = "High"
         analysis["summary"] = "VOC levels are currently high."
         analysis["health"] = "Short-term exposure may irritate eyes, throat, or sensitive individuals."
@@ -1004,6 +1329,17 @@ def analyze_voc(current, history):
             "Ventilate the space and reduce active VOC sources."
         )
 
+    elif repeated:
+        analysis["status"] = "Repeated spikes"
+        analysis["summary"] = (
+            f"Several VOC spikes detected ({describe_spikes(events, '')}), "
+            "suggesting intermittent chemical sources."
+        )
+        analysis["health"] = "Repeated short exposures may irritate eyes, throat, or sensitive individuals."
+        analysis["recommendations"].append(
+            "Look for intermittent sources such as cleaning sprays, cooking, or fragrances."
+        )
+
     elif recent_high:
         analysis["status"] = "Recently elevated"
         analysis["summary"] = "VOC levels were elevated recently but are now declining."
@@ -1012,7 +1348,7 @@ def analyze_voc(current, history):
             "Continue ventilation until VOC levels stabilize."
         )
 
-    elif avg <= 100:
+    elif avg <= VOC_GOOD_MAX:
         analysis["status"] = "Stable / Healthy"
         analysis["summary"] = "VOC levels have remained consistently low."
         analysis["health"] = "Air quality supports comfort with minimal chemical exposure."
@@ -1025,7 +1361,7 @@ def analyze_voc(current, history):
     return analysis
 
 
-def analyze_humidity(current, history):
+def analyze_humidity(current, history, long_history=None):
     analysis = {
         "status": "",
         "confidence": "Low",
@@ -1041,12 +1377,16 @@ def analyze_humidity(current, history):
         analysis["health"] = "Short-term comfort impact only."
         return analysis
 
-    values = list(history)
-    avg = rolling_avg(values)
+    avg = rolling_avg(history)
 
-    analysis["confidence"] = "High" if len(values) >= 20 else "Medium"
+    analysis["confidence"] = "High" if len(history) >= 20 else "Medium"
     analysis["window"] = "Rolling (~1 min)"
 
+    lv = long_view(long_history, "humidity")
+    if lv is not None:
+        avg = lv.mean
+        analysis["window"] = "Rolling (~30 min)"
+
     if avg > 55:
         analysis["status"] = "High"
         analysis["summary"] = "Humidity has remained elevated."
@@ -1056,7 +1396,7 @@ def analyze_humidity(current, history):
             "Check HVAC condensate drainage and airflow."
         ])
 
-    elif avg < 30:
+    elif avg < HUMIDITY_LOW:
         analysis["status"] = "Low"
         analysis["summary"] = "Humidity has remained low."
         analysis["health"] = "Low humidity may cause dry skin and respiratory irritation."
@@ -1071,7 +1411,7 @@ def analyze_humidity(current, history):
 
     return analysis
 
-def analyze_temp(current, history):
+def analyze_temp(current, history, long_history=None):
     analysis = {
         "status": "",
         "confidence": "Low",
@@ -1087,14 +1427,19 @@ def analyze_temp(current, history):
         analysis["health"] = "Comfort impact only."
         return analysis
 
-    values = list(history)
-    avg = rolling_avg(values)
-    swing = max(values) - min(values)
+    avg = rolling_avg(history)
+    swing = window_swing(history)
 
-    analysis["confidence"] = "High" if len(values) >= 20 else "Medium"
+    analysis["confidence"] = "High" if len(history) >= 20 else "Medium"
     analysis["window"] = "Rolling (~1 min)"
 
-    if avg > 78:
+    lv = long_view(long_history, "temp")
+    if lv is not None:
+        avg = lv.mean
+        swing = lv.max - lv.min
+        analysis["window"] = "Rolling (~30 min)"
+
+    if avg > TEMP_WARM:
         analysis["status"] = "Warm"
         analysis["summary"] = "Temperature is consistently above comfort range."
         analysis["health"] = "May reduce comfort and increase fatigue."
@@ -1102,7 +1447,7 @@ def analyze_temp(current, history):
             "Improve cooling or reduce internal heat loads."
         )
 
-    elif avg < 68:
+    elif avg < TEMP_COOL:
         analysis["status"] = "Cool"
         analysis["summary"] = "Temperature is consistently below comfort range."
         analysis["health"] = "May cause discomfort or cold stress."
@@ -1125,7 +1470,7 @@ def analyze_temp(current, history):
 
     return analysis
 
-def analyze_co(current, history):
+def analyze_co(current, history, long_history=None):
     """
     Returns structured Carbon Monoxide (CO) analysis for detail view
     """
@@ -1144,15 +1489,19 @@ def analyze_co(current, history):
         analysis["health"] = "Carbon monoxide exposure risk cannot yet be assessed."
         return analysis
 
-    values = list(history)
-    avg = rolling_avg(values)
-    peaks = peak_count(values, 9)
-    sustained_high = sustained(values, 9, ratio=0.3)
+    avg = rolling_avg(history)
+    peaks = peak_count(history, CO_SAFE_MAX)
+    sustained_high = sustained(history, CO_SAFE_MAX, ratio=0.3)
 
-    analysis["confidence"] = "High" if len(values) >= 20 else "Medium"
+    analysis["confidence"] = "High" if len(history) >= 20 else "Medium"
     analysis["window"] = "Rolling (~1 min)"
 
-    if current >= 35:
+    lv = long_view(long_history, "co")
+    if lv is not None:
+        sustained_high = lv.fraction_at_least(CO_SAFE_MAX) >= 0.3
+        analysis["window"] = "Rolling (~30 min)"
+
+    if current >= CO_DANGER_THRESHOLD:
         analysis["status"] = "Dangerous"
         analysis["summary"] = "Carbon monoxide is currently at a dangerous level."
         analysis["health"] = (
@@ -1175,7 +1524,7 @@ def analyze_co(current, history):
             "Ensure proper ventilation in the space."
         ])
 
-    elif current >= 9:
+    elif current >= CO_SAFE_MAX:
         analysis["status"] = "Elevated"
         analysis["summary"] = "Carbon monoxide is currently elevated."
         analysis["health"] = (
@@ -1195,6 +1544,51 @@ def analyze_co(current, history):
 
 
 
+# ---------------------------
+# Analysis memoization (score, left panel and detail share results)
+# ---------------------------
+ANALYZERS = {
+    "pm25": analyze_pm25,
+    "co2": analyze_co2,
+    "voc": analyze_voc,
+    "humidity": analyze_humidity,
+    "temp": analyze_temp,
+    "co": analyze_co,
+}
+
+_analysis_cache = AnalysisCache()
+
+def cached_analysis(metric, current, history, long_history=None, **streams):
+    """
+    analyze_<metric>() memoized on everything its result depends on.
+    streams are versioned per-metric detectors (spikes=, decay=) passed
+    through as keyword arguments; None entries are dropped.
+    The returned dict is shared; callers must not modify it.
+    """
+    streams = {k: v for k, v in streams.items() if v is not None}
+    analyze = ANALYZERS[metric]
+    if streams:
+        analyze = partial(analyze, **streams)
+    version = getattr(history, "version", None)
+    if version is None:
+        return analyze(current, history, long_history)  # plain sequence: no version to key on
+
+    long_key = None
+    if long_history is not None and metric in long_history:
+        long_key = (id(long_history), long_history[metric].version)
+    confidence = voc_confidence() if metric == "voc" else None
+
+    stream_key = tuple(sorted((k, id(v), v.version) for k, v in streams.items()))
+
+    key = (id(history), version, long_key, stream_key, confidence, current)
+    return _analysis_cache.get(
+        metric, key, lambda: analyze(current, history, long_history)
+    )
+
+def analysis_cache_stats():
+    return _analysis_cache.stats()
+
+
 # ---------------------------
 # Shared metric detail renderer
 # ---------------------------
@@ -1227,6 +1621,15 @@ def render_analysis_detail(analysis, accent="#ff9800"):
         "</div></div>"
     )
 
+    if analysis.get("ventilation"):
+        html += (
+            "<div style='margin-bottom:12px;'>"
+            "<div style='color:#aaaaaa; font-size:13px;'>MEASURED VENTILATION</div>"
+            f"<div style='font-size:15px; color:#dddddd;'>"
+            f"{analysis['ventilation']}"
+            "</div></div>"
+        )
+
     if analysis.get("recommendations"):
         html += (
             "<div style='margin-top:24px; padding-top:12px; border-top:1px solid #222;'>"
@@ -1247,15 +1650,95 @@ def render_analysis_detail(analysis, accent="#ff9800"):
     html += "</div>"
     return html
 # ---------------------------
+# Exposure section (score detail)
+# ---------------------------
+def render_exposure_section(exposure):
+    rows = []
+    for name, e in exposure.items():
+        if not e["coverage"]:
+            continue
+        window = f"{e['window_h']:g} h"
+        cover = f"{round(e['coverage'] * 100)}% of window measured"
+        if e["metric"] == "co":
+            rows.append((f"CO {window} TWA", f"{e['twa']} ppm", cover))
+        elif e["metric"] == "pm25":
+            rows.append((f"PM2.5 {window} mean", f"{e['mean']} µg/m³", cover))
+        elif "threshold" in e:
+            rows.append((f"CO₂ above {e['threshold']} ppm ({window})", f"{e['minutes']:g} min", cover))
+
+    if not rows:
+        return ""
+
+    html = ["<div style='margin-top:18px; font-size:20px; font-weight:600; color:white;'>Exposure</div>"]
+    for label, value, note in rows:
+        html.append(
+            f"""
+            <div style="
+                margin-top:8px;
+                padding:12px;
+                background:#151515;
+                border-left:6px solid #888888;
+                border-radius:12px;
+            ">
+                <div style="font-size:14px; color:#aaaaaa;">{label}</div>
+                <div style="font-size:16px; font-weight:600; color:white;">{value}</div>
+                <div style="font-size:12px; color:#777777;">{note}</div>
+            </div>
+            """
+        )
+    return "".join(html)
+
+# ---------------------------
+# Derived conditions (temperature / humidity detail)
+# ---------------------------
+def render_conditions_section(d):
+    """Dew point, absolute humidity, heat index and mold risk cached on the Sample."""
+    if d is None or d.dew_point is None:
+        return ""
+    rows = [
+        ("Dew point", f"{d.dew_point:g} °F"),
+        ("Absolute humidity", f"{d.abs_humidity:g} g/m³"),
+        ("Heat index", f"{d.heat_index:g} °F"),
+        ("Mold risk", mold_risk_label(d.mold_risk)),
+    ]
+    html = ["<div style='margin-top:12px; color:#aaaaaa; font-size:13px;'>DERIVED CONDITIONS</div>"]
+    for label, value in rows:
+        html.append(
+            f"<div style='font-size:15px; color:#dddddd;'>{label}: "
+            f"<span style='color:white; font-weight:600;'>{value}</span></div>"
+        )
+    return "".join(html)
+
+# ---------------------------
 # Smart advice engine (pattern-based)
 # ---------------------------
-def smart_advice(history):
+def smart_advice(history, long_history=None, spikes=None):
     advice = []
 
-    pm_avg = rolling_avg(history["pm25"])
-    pm_peaks = peak_count(history["pm25"], 35)
-
-    if pm_avg > 35:
+    # "Over time" means the ~30 min tiered view once it has data,
+    # the raw ~1 min window until then
+    def avg_of(metric):
+        lv = long_view(long_history, metric)
+        return lv.mean if lv is not None else rolling_avg(history[metric])
+
+    def peaks_of(metric, threshold):
+        events = recent_spikes((spikes or {}).get(metric))
+        if events is not None:
+            return len(events)  # discrete events, compared against the same 3
+        lv = long_view(long_history, metric)
+        raw = peak_count(history[metric], threshold)
+        return raw if lv is None else max(raw, lv.runs_reaching(threshold))
+
+    def sustained_of(metric, threshold, ratio):
+        lv = long_view(long_history, metric)
+        if lv is None:
+            return sustained(history[metric], threshold, ratio=ratio)
+        return lv.fraction_at_least(threshold) >= ratio
+
+    pm_avg = avg_of("pm25")
+    pm_peaks = peaks_of("pm25", PM25_MODERATE_MAX)
+
+    if pm_avg > PM25_MODERATE_MAX:
         advice.append(
             "PM2.5 has remained elevated over time, indicating a continuous particle source rather than a brief event."
         )
@@ -1264,38 +1747,41 @@ def smart_advice(history):
             "Repeated PM2.5 spikes detected, often caused by cooking, candles, or intermittent airflow."
         )
 
-    co2_avg = rolling_avg(history["co2"])
-    if co2_avg > 1200:
+    co2_avg = avg_of("co2")
+    if co2_avg > CO2_ELEVATED_MAX:
         advice.append(
             "CO₂ has remained elevated over time, suggesting insufficient ventilation for current occupancy."
         )
 
-    voc_peaks = peak_count(
-        [v for v in history["voc"] if isinstance(v, (int, float))],
-        150
-    )
+    # history only ever holds numeric VOC values (None is skipped on append)
+    voc_peaks = peaks_of("voc", VOC_MODERATE_MAX)
 
     if voc_peaks >= 3:
         advice.append(
             "Repeated VOC spikes detected, commonly linked to cleaners, fragrances, or off-gassing materials."
         )
 
-    if sustained(history["co"], 9, ratio=0.3):
+    if sustained_of("co", CO_SAFE_MAX, 0.3):
         advice.insert(
             0,
             "Carbon monoxide has appeared repeatedly; combustion appliances should be inspected even if levels fluctuate."
         )
 
-    hum_avg = rolling_avg(history["humidity"])
+    hum_avg = avg_of("humidity")
     if hum_avg > 55:
         advice.append(
             "Humidity has stayed elevated over time, increasing the risk of mold growth."
         )
-    elif hum_avg < 30:
+    elif hum_avg < HUMIDITY_LOW:
         advice.append(
             "Humidity has remained low, which may worsen dryness and respiratory irritation."
         )
 
+    if sustained_of("mold_risk", MOLD_RISK_HIGH, 0.5):
+        advice.append(
+            "Conditions have stayed in the mold-growth range for much of the window; check for leaks, condensation, or poor drainage."
+        )
+
     return advice
 
 # ---------------------------
@@ -1509,7 +1995,7 @@ class DetailOverlay(QtWidgets.QWidget):
 
 
         self.current_key = None
-    def show_score_detail(self, score, breakdown, how_to):
+    def show_score_detail(self, score, breakdown, how_to, exposure=None):
         self.desc.clear()
         #trend line disabled below
         #self.trend.show()
@@ -1593,6 +2079,9 @@ class DetailOverlay(QtWidgets.QWidget):
                     """
                 )
 
+        if exposure:
+            html.append(render_exposure_section(exposure))
+
         html.append("</div>")
         self.desc.setText("".join(html))
         self.show()
@@ -1713,7 +2202,12 @@ class CODangerOverlay(QtWidgets.QWidget):
 # Dashboard
 # ---------------------------
 class Dashboard(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, source=None, record_path=None):
+        """
+        source: optional read function returning Samples (e.g. a SampleReplayer);
+                defaults to the real sensors via safe_readings().
+        record_path: optional file to record every acquired Sample to.
+        """
         super().__init__()
         # ---- SAFETY INIT (prevents race condition on fast user interaction) ----
         self.last_co2 = 0
@@ -1722,6 +2216,7 @@ class Dashboard(QtWidgets.QWidget):
         self.last_temp = 0
         self.last_humidity = 0
         self.last_co = 0
+        self.last_sample = None  # newest Sample (derived metrics for the detail views)
         self.co_test_mode = False
         # === ENABLE REAL SENSORS ===
         self.USE_REAL_SENSORS = True
@@ -1735,13 +2230,23 @@ class Dashboard(QtWidgets.QWidget):
             "job_id": None,
             "start_ts": None,
         }
+        self.survey_sketches = make_quantile_sketches()
         # ---------------------------
         # Survey storage paths
         # ---------------------------
-        self.base_path = Path.home() / ".howlx_scout"
+        self.base_path = DATA_DIR
         self.surveys_path = self.base_path / "surveys"
         self.surveys_path.mkdir(parents=True, exist_ok=True)
-        
+        # Readings go through a background writer (one open handle, batched)
+        # into the binary survey log; survey_log.py converts to/from CSV.
+        # Closing a job syncs its columnar copy (survey_columns) and its
+        # catalog entry, on the writer thread.
+        self.survey_catalog = SurveyCatalog(self.surveys_path)
+        self.survey_writer = survey_log.make_writer(
+            on_close=lambda path: self.survey_catalog.index_job(path.parent)
+        )
+        self.survey_writer.start()
+
         self.last_score = 100
         self.last_breakdown = []
         self.last_how_to = []
@@ -1749,15 +2254,23 @@ class Dashboard(QtWidgets.QWidget):
         from collections import deque
         self.score_history = deque(maxlen=40)  # ~1 min rolling window\
         
-        # Rolling history for smart advice (AdviceEngine) 
-        self.history = {
-            "pm25": deque(maxlen=40),
-            "co2": deque(maxlen=40),
-            "voc": deque(maxlen=40),
-            "co": deque(maxlen=40),
-            "humidity": deque(maxlen=40),
-            "temp": deque(maxlen=40),
-}
+        # Rolling history for smart advice (AdviceEngine); each metric is a
+        # RollingWindow so the analyses read running aggregates, not rescans
+        self.history = make_history()
+        # Same metrics (plus score) rolled up into 1 min / 15 min / 1 h buckets
+        self.long_history = make_long_history()
+        # Spike/change-point events for PM2.5 and VOC (analysis + charts)
+        self.spikes = make_spike_detectors()
+        # CO2 decay segments -> air changes per hour (CO2 detail, survey summary)
+        self.decay = make_decay_fitter()
+
+        # Regulatory-window exposure; only the live device persists it
+        # (replays/benchmarks must not overwrite the real windows)
+        self.exposure = ExposureEngine()
+        self._exposure_persist = source is None
+        self._exposure_saved = 0.0
+        if self._exposure_persist:
+            self.exposure.load(EXPOSURE_STATE_FILE)
    
 
 
@@ -1886,6 +2399,25 @@ class Dashboard(QtWidgets.QWidget):
         # ---------------------------
         # Update loop (SINGLE INSTANCE)
         # ---------------------------
+        # Sensor I/O runs on its own worker; the UI tick only consumes
+        # the newest published Sample (never blocks on I2C/UART).
+        read_fn = source or self.safe_readings
+        if source is None and self.USE_REAL_SENSORS:
+            init_sensors()  # first probe pass before the worker's first read
+
+        self.recorder = None
+        if record_path:
+            self.recorder = SampleRecorder(record_path, status_fn=sensor_status_since)
+            read_fn = self.recorder.wrap(read_fn)
+
+        self.acquisition = AcquisitionEngine(
+            read_fn,
+            interval_s=1.0,
+            wake_fn=getattr(source, "next_due", None) if source is not None else _sampler.next_due,
+        )
+        self._last_sample_seq = 0
+        self.acquisition.start()
+
         self.fact_index = 0
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.update_data)
@@ -1982,32 +2514,67 @@ class Dashboard(QtWidgets.QWidget):
     # Survey sample writer
     # ---------------------------
     def _record_survey_sample(self, d, score, state):
+        """Queue one row for the survey writer thread (no file I/O here)."""
         if not self.survey_meta["customer"] or not self.survey_meta["job_id"]:
             return
+        self.survey_writer.write(d, score, state.name)
 
-        job_path = (
+    # ---------------------------
+    # Survey lifecycle / exposure persistence
+    # ---------------------------
+    def _survey_job_path(self):
+        return (
             self.surveys_path
             / self.survey_meta["customer"]
             / self.survey_meta["job_id"]
         )
-        job_path.mkdir(parents=True, exist_ok=True)
-
-        data_file = job_path / "readings.csv"
 
-        header = "timestamp,co,co2,pm25,voc,temp,humidity,score,state\n"
-
-        row = (
-            f"{int(time.time())},"
-            f"{d['co']},{d['co2']},{d['pm25']},"
-            f"{'' if d.get('voc') is None else d['voc']},{d['temp']},{d['humidity']},"
-            f"{score},{state.name}\n"
-        )
+    def start_survey(self, customer, job_id):
+        now = time.time()
+        self.survey_meta = {"customer": customer, "job_id": job_id, "start_ts": now}
+        if customer and job_id:
+            self.survey_writer.open(self._survey_job_path())
+        self.exposure.start_session(now)
+        self.survey_sketches = make_quantile_sketches()
+        self.survey_mode = True
+
+    def stop_survey(self):
+        """End the survey and write summary.json next to its readings."""
+        if not self.survey_mode:
+            return None
+        self.survey_mode = False
+        self.survey_writer.close()
+        exposure = self.exposure.stop_session()
 
-        if not data_file.exists():
-            data_file.write_text(header)
+        if not self.survey_meta["customer"] or not self.survey_meta["job_id"]:
+            return None
+        summary = {
+            "customer": self.survey_meta["customer"],
+            "job_id": self.survey_meta["job_id"],
+            "start_ts": self.survey_meta["start_ts"],
+            "end_ts": time.time(),
+            "exposure": exposure,
+            "ventilation": decay_summary(self.decay.since(self.survey_meta["start_ts"])),
+            "percentiles": {m: sk.summary() for m, sk in self.survey_sketches.items() if sk.count},
+            # Raw sketch state so percentiles can be merged across jobs later
+            "sketches": {m: sk.to_state() for m, sk in self.survey_sketches.items() if sk.count},
+            "storage": self.survey_writer.stats(),
+        }
+        try:
+            job_path = self._survey_job_path()
+            job_path.mkdir(parents=True, exist_ok=True)
+            (job_path / "summary.json").write_text(json.dumps(summary, indent=2))
+        except Exception as e:
+            print("Survey summary write failed:", repr(e))
+        return summary
 
-        with data_file.open("a") as f:
-            f.write(row)
+    def save_exposure(self, now=None):
+        if not self._exposure_persist:
+            return
+        self._exposure_saved = now if now is not None else time.time()
+        # Snapshot here (GUI thread owns the engine); serialize + fsync on the writer thread
+        state = self.exposure.to_state()
+        self.survey_writer.call(lambda: save_exposure_state(state, EXPOSURE_STATE_FILE))
 
     # ---------------------------
     # Exit confirmation
@@ -2033,6 +2600,10 @@ class Dashboard(QtWidgets.QWidget):
         """)
 
         if dlg.exec_() == QtWidgets.QMessageBox.Yes:
+            if self.survey_mode:
+                self.stop_survey()
+            self.save_exposure()  # queued ahead of the stop, so it is written before exit
+            self.survey_writer.stop()
             QtWidgets.QApplication.quit()
 
     # ---------------------------
@@ -2121,19 +2692,19 @@ class Dashboard(QtWidgets.QWidget):
         else:
             lines.append("✓ Air quality looks good.")
 
-        co  = nval(d.get("co"), 0.0)
-        pm  = nval(d.get("pm25"), 0.0)
-        co2 = nval(d.get("co2"), 450)
-        voc = nval(d.get("voc"), 0.0)
+        co  = nval(d.co, MISSING_DEFAULTS["co"])
+        pm  = nval(d.pm25, MISSING_DEFAULTS["pm25"])
+        co2 = nval(d.co2, MISSING_DEFAULTS["co2"])
+        voc = nval(d.voc, MISSING_DEFAULTS["voc"])
 
         drivers = []
-        if installed_state("co") and co >= 9:
+        if installed_state("co") and alert_level("co", co):
             drivers.append(f"CO {co} ppm")
-        if installed_state("pm25") and pm > 12:
+        if installed_state("pm25") and pm25_penalty(pm):
             drivers.append(f"PM2.5 {pm} µg/m³")
-        if installed_state("scd41") and co2 > 800:
+        if installed_state("scd41") and co2_penalty(co2):
             drivers.append(f"CO₂ {co2} ppm")
-        if installed_state("sgp40") and d.get("voc") is not None and voc >= 150:
+        if installed_state("sgp40") and d.voc is not None and alert_level("voc", voc):
             drivers.append(f"VOC {voc}")
 
 
@@ -2187,23 +2758,30 @@ class Dashboard(QtWidgets.QWidget):
             return read_sensors()
         except Exception as e:
             print("read_sensors() failed:", repr(e))
-            return mock_readings()
+            return None  # skip this tick; real sensors never fall back to mock data
 
     def update_data(self):
-        d = self.safe_readings()
+        d = self.acquisition.latest()
+        if d is None or d.seq == self._last_sample_seq:
+            return  # nothing new from the acquisition worker yet
+        self._last_sample_seq = d.seq
+        self.last_sample = d
+
         self._flash = not self._flash  # toggles each tick for warmup flashing
 
 
         # NEW unified evaluation
-        s, breakdown, how_to, state = evaluate_readings(d, self.history)
-        if installed_state("pm25") and d.get("pm25") is not None:
-            self.last_pm25_analysis = analyze_pm25(d["pm25"], list(self.history["pm25"]))
+        s, breakdown, how_to, state = evaluate_readings(d, self.history, self.long_history, self.spikes)
+        if installed_state("pm25") and d.pm25 is not None:
+            self.last_pm25_analysis = cached_analysis(
+                "pm25", d.pm25, self.history["pm25"], self.long_history, spikes=self.spikes["pm25"]
+            )
         else:
             self.last_pm25_analysis = None
 
 
         # Pattern-based smart advice
-        pattern_advice = smart_advice(self.history)
+        pattern_advice = smart_advice(self.history, self.long_history, self.spikes)
         for msg in pattern_advice:
             if msg not in how_to:
                 how_to.append(msg)
@@ -2218,11 +2796,11 @@ class Dashboard(QtWidgets.QWidget):
         self.update_alert_state_ui()
 
 
-        self.tiles["CO₂ (ppm)"].setText("--" if d.get("co2") is None else str(d["co2"]))
-        self.tiles["PM2.5 (µg/m³)"].setText("--" if d.get("pm25") is None else str(d["pm25"]))
-        self.tiles["VOC Index"].setText("--" if d.get("voc") is None else str(d["voc"]))
-        self.tiles["Temp (°F)"].setText(str(d["temp"]))
-        self.tiles["Humidity (%)"].setText(str(d["humidity"]))
+        self.tiles["CO₂ (ppm)"].setText("--" if d.co2 is None else str(d.co2))
+        self.tiles["PM2.5 (µg/m³)"].setText("--" if d.pm25 is None else str(d.pm25))
+        self.tiles["VOC Index"].setText("--" if d.voc is None else str(d.voc))
+        self.tiles["Temp (°F)"].setText(str(TEMP_PLACEHOLDER_F if d.temp is None else d.temp))
+        self.tiles["Humidity (%)"].setText(str(HUMIDITY_PLACEHOLDER if d.humidity is None else d.humidity))
         self.tiles["Score"].setText(f"{s}/100")
         # Technician mode tile (static, not a sensor)
         self.tiles["Technician"].setText("Analyze")
@@ -2230,35 +2808,57 @@ class Dashboard(QtWidgets.QWidget):
         if badge:
             badge.setText("Tools & Charts")
 
-        self.tiles["CO (ppm)"].setText("--" if d.get("co") is None else str(d["co"]))
+        self.tiles["CO (ppm)"].setText("--" if d.co is None else str(d.co))
 
         
 
-        self.last_co2 = d.get("co2")
+        self.last_co2 = d.co2
         if self.last_co2 is None:
             self.last_co2 = 450  # only for analysis funcs, not UI display
-        self.last_pm25 = d["pm25"]
-        self.last_voc = d.get("voc")
-        self.last_temp = d["temp"]
-        self.last_humidity = d["humidity"]
-        self.last_co = d.get("co")
+        self.last_pm25 = d.pm25
+        self.last_voc = d.voc
+        # Placeholders only for display/analysis; stored values stay None
+        self.last_temp = TEMP_PLACEHOLDER_F if d.temp is None else d.temp
+        self.last_humidity = HUMIDITY_PLACEHOLDER if d.humidity is None else d.humidity
+        self.last_co = d.co
         # ---------------------------
         # Survey mode data capture
         # ---------------------------
         if self.survey_mode:
             self._record_survey_sample(d, s, state)
+            for k, sketch in self.survey_sketches.items():
+                sketch.add(s if k == "score" else getattr(d, k))
 
         # Update rolling history
         for k in self.history:
-            val = d.get(k)
+            val = getattr(d, k)
             if val is None:
                 continue
             self.history[k].append(val)
+            self.long_history.add(k, d.ts, val)
+        self.long_history.add("score", d.ts, s)
+        for k, detector in self.spikes.items():
+            if k == "voc" and voc_confidence() == "Low":
+                continue  # the index ramps up from 0 while learning; not a spike
+            detector.update(d.ts, getattr(d, k))
+        self.decay.update(d.ts, d.co2)
+        if self.technician.charts.isVisible():
+            self.technician.charts.set_events(
+                [ev for det in self.spikes.values() for ev in recent_spikes(det, 24 * 3600) or ()]
+            )
+            self.technician.charts.set_percentiles(
+                {m: sk.summary() for m, sk in self.survey_sketches.items() if sk.count}
+                if self.survey_mode else None
+            )
+
+        self.exposure.add(d.ts, {"co": d.co, "pm25": d.pm25, "co2": d.co2})
+        if d.ts - self._exposure_saved >= EXPOSURE_SAVE_S:
+            self.save_exposure(d.ts)
 
 
         # Auto-trigger CO danger overlay (skip if test mode)
         if not self.co_test_mode:
-            co_val = d.get("co")  # use the fresh reading directly
+            co_val = d.co  # use the fresh reading directly
             if isinstance(co_val, (int, float)) and co_val >= CO_DANGER_THRESHOLD:
                 self.co_danger.show_level(co_val)
             elif self.co_danger.isVisible():
@@ -2404,7 +3004,9 @@ class Dashboard(QtWidgets.QWidget):
                 )
                 return
 
-            analysis = analyze_pm25(self.last_pm25, list(self.history["pm25"]))
+            analysis = cached_analysis(
+                "pm25", self.last_pm25, self.history["pm25"], self.long_history, spikes=self.spikes["pm25"]
+            )
             _, pm_color, _ = pm25_severity(self.last_pm25)
 
             self.detail.show_detail(
@@ -2416,7 +3018,9 @@ class Dashboard(QtWidgets.QWidget):
             )
 
         elif key == "co2":
-            analysis = analyze_co2(self.last_co2, list(self.history["co2"]))
+            analysis = cached_analysis(
+                "co2", self.last_co2, self.history["co2"], self.long_history, decay=self.decay
+            )
             _, co2_color, _ = co2_severity(self.last_co2)
 
             self.detail.show_detail(
@@ -2432,7 +3036,9 @@ class Dashboard(QtWidgets.QWidget):
             voc_current = self.last_voc
             voc_for_analysis = voc_current if voc_current is not None else 0.0
 
-            analysis = analyze_voc(voc_for_analysis, list(self.history["voc"]))
+            analysis = cached_analysis(
+                "voc", voc_for_analysis, self.history["voc"], self.long_history, spikes=self.spikes["voc"]
+            )
 
             if voc_current is None:
                 voc_color = "#888888"
@@ -2451,24 +3057,30 @@ class Dashboard(QtWidgets.QWidget):
             )
 
         elif key == "temp":
-            analysis = analyze_temp(self.last_temp, list(self.history["temp"]))
+            analysis = cached_analysis("temp", self.last_temp, self.history["temp"], self.long_history)
             self.detail.show_detail(
                 key="temp",
                 title="Temperature",
                 value_text=f"{self.last_temp} °F",
                 color="#03a9f4",
-                description=render_analysis_detail(analysis, accent="#03a9f4"),
+                description=(
+                    render_analysis_detail(analysis, accent="#03a9f4")
+                    + render_conditions_section(self.last_sample)
+                ),
             )
 
         elif key == "humidity":
-            analysis = analyze_humidity(self.last_humidity, list(self.history["humidity"]))
+            analysis = cached_analysis("humidity", self.last_humidity, self.history["humidity"], self.long_history)
             _, color, _ = humidity_severity(self.last_humidity)
             self.detail.show_detail(
                 key="humidity",
                 title="Relative Humidity",
                 value_text=f"{self.last_humidity} %",
                 color=color,
-                description=render_analysis_detail(analysis, accent="#00bcd4"),
+                description=(
+                    render_analysis_detail(analysis, accent="#00bcd4")
+                    + render_conditions_section(self.last_sample)
+                ),
             )
 
         elif key == "co":
@@ -2493,7 +3105,7 @@ class Dashboard(QtWidgets.QWidget):
                 )
                 return
 
-            analysis = analyze_co(self.last_co, list(self.history["co"]))
+            analysis = cached_analysis("co", self.last_co, self.history["co"], self.long_history)
             _, color, _ = co_severity(self.last_co)
 
             self.detail.show_detail(
@@ -2509,6 +3121,7 @@ class Dashboard(QtWidgets.QWidget):
                 score=self.last_score,
                 breakdown=self.last_breakdown,
                 how_to=self.last_how_to,
+                exposure=self.exposure.snapshot(),
             )
 
 
@@ -2518,7 +3131,20 @@ class Dashboard(QtWidgets.QWidget):
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
 
-    w = Dashboard()
+    # Dev/bench hooks:
+    #   HOWLX_REPLAY=<recording> [HOWLX_REPLAY_SPEED=N] -> replay instead of sensors
+    #   HOWLX_RECORD=<file> -> record every acquired sample + status transitions
+    source = None
+    if os.environ.get("HOWLX_REPLAY"):
+        source = SampleReplayer(
+            os.environ["HOWLX_REPLAY"],
+            speed=float(os.environ.get("HOWLX_REPLAY_SPEED", "1")),
+            loop=True,
+            state_cls=SensorState,
+            status_cb=apply_replayed_status,
+        )
+
+    w = Dashboard(source=source, record_path=os.environ.get("HOWLX_RECORD"))
     w.show()
     sys.exit(app.exec_())
 
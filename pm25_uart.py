@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import serial
+
+
+# =========================================================
+# Plantower PMS frame layout
+# =========================================================
+# 0x42 0x4D | length (2, BE = 28) | 13 x uint16 BE data words | checksum (2, BE)
+# checksum = sum of the first 30 bytes
+FRAME_START = b"\x42\x4d"
+FRAME_LEN = 32
+
+# Same key names adafruit_pm25 uses, so existing consumers keep working
+FRAME_FIELDS = (
+    "pm10 standard",
+    "pm25 standard",
+    "pm100 standard",
+    "pm10 env",
+    "pm25 env",
+    "pm100 env",
+    "particles 03um",
+    "particles 05um",
+    "particles 10um",
+    "particles 25um",
+    "particles 50um",
+    "particles 100um",
+)
+
+
+class PMFrame(NamedTuple):
+    seq: int
+    mono: float   # time.monotonic() when the frame completed
+    ts: float     # wall clock
+    data: dict
+
+
+def parse_frame(buf):
+    """
+    Validate and decode one 32-byte frame.
+    Returns the field dict, or None if header/length/checksum are wrong.
+    """
+    if len(buf) != FRAME_LEN or buf[:2] != FRAME_START:
+        return None
+    if int.from_bytes(buf[2:4], "big") != FRAME_LEN - 4:
+        return None
+    if sum(buf[:30]) & 0xFFFF != int.from_bytes(buf[30:32], "big"):
+        return None
+
+    return {
+        name: int.from_bytes(buf[4 + i * 2:6 + i * 2], "big")
+        for i, name in enumerate(FRAME_FIELDS)
+    }
+
+
+# =========================================================
+# Frame-synchronized reader (blocking, no polling)
+# =========================================================
+class PlantowerReader:
+    """
+    Reads PMS frames from a UART on a background thread.
+    - blocks on incoming bytes; the thread only wakes when the sensor talks
+      (read_timeout_s just bounds how long stop() can take)
+    - resyncs on the 0x42 0x4D header and validates the checksum itself
+    - every valid frame goes into a bounded ring buffer with timestamps
+    """
+
+    def __init__(self, port="/dev/ttyAMA0", baudrate=9600, maxlen=3600, read_timeout_s=2.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.read_timeout_s = read_timeout_s
+
+        self.frames = deque(maxlen=maxlen)  # ~1 h at 1 frame/s
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._ser = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.checksum_errors = 0
+        self.resync_bytes = 0
+        self.io_errors = 0
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    def start(self):
+        """Open the port (raises on failure) and start the reader thread."""
+        if self._thread is not None:
+            return
+        self._ser = serial.Serial(self.port, baudrate=self.baudrate, timeout=self.read_timeout_s)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pm25-uart", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 3.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._ser is not None:
+            try:
+                self._ser.close()
+            except Exception:
+                pass
+            self._ser = None
+
+    # ---------------------------
+    # Consumer API
+    # ---------------------------
+    def latest(self):
+        """Newest PMFrame, or None if nothing valid has arrived yet."""
+        with self._lock:
+            return self.frames[-1] if self.frames else None
+
+    def since(self, seq: int):
+        """Frames with seq > the given one, oldest first (still buffered ones only)."""
+        out = []
+        with self._lock:
+            for f in reversed(self.frames):
+                if f.seq <= seq:
+                    break
+                out.append(f)
+        out.reverse()
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": self._seq,
+                "buffered": len(self.frames),
+                "checksum_errors": self.checksum_errors,
+                "resync_bytes": self.resync_bytes,
+                "io_errors": self.io_errors,
+            }
+
+    # ---------------------------
+    # Reader thread
+    # ---------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                buf = self._read_frame()
+            except Exception as e:
+                print("PM2.5 UART read error:", repr(e))
+                self.io_errors += 1
+                self._stop.wait(1.0)
+                continue
+
+            if buf is None:
+                continue  # read timeout with no traffic
+
+            data = parse_frame(buf)
+            if data is None:
+                self.checksum_errors += 1
+                continue
+
+            with self._lock:
+                self._seq += 1
+                self.frames.append(PMFrame(self._seq, time.monotonic(), time.time(), data))
+
+    def _read_frame(self):
+        ser = self._ser
+
+        # Sync on 0x42 0x4D (blocking reads; no sleep/poll loop)
+        b = ser.read(1)
+        while True:
+            if not b:
+                return None
+            if b != b"\x42":
+                self.resync_bytes += 1
+                b = ser.read(1)
+                continue
+            b = ser.read(1)
+            if b == b"\x4d":
+                break
+            # That 0x42 was noise; b itself may be the next frame's 0x42
+            self.resync_bytes += 1
+
+        rest = ser.read(FRAME_LEN - 2)
+        if len(rest) != FRAME_LEN - 2:
+            return None
+        return FRAME_START + rest
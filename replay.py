@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import threading
+import time
+
+from acquisition import Sample, METRICS
+
+
+# =========================================================
+# Recording format (JSON Lines)
+# =========================================================
+# line 1: {"format": "howlx-replay", "version": 1, "metrics": [...]}
+# then, in acquisition order:
+#   {"k": "s",  "mono": ..., "ts": ..., <metric>: value, ..., "states": [...]}
+#   {"k": "st", "mono": ..., "ts": ..., "sensor": "scd41", "state": "READY", "age_s": 12.3}
+# "st" lines are sensor status transitions; age_s = seconds since SENSOR_SINCE.
+REPLAY_FORMAT = "howlx-replay"
+REPLAY_VERSION = 1
+
+
+def _state_name(st):
+    return getattr(st, "name", st)
+
+
+def _encode_sample(s):
+    d = {"k": "s", "mono": round(s.mono, 3), "ts": round(s.ts, 3)}
+    for m in METRICS:
+        d[m] = getattr(s, m)
+    d["states"] = [_state_name(st) for st in s.states]
+    return d
+
+
+def _decode_sample(d, state_cls=None):
+    states = tuple(
+        state_cls[n] if (state_cls is not None and n is not None) else n
+        for n in d.get("states", ())
+    )
+    return Sample(mono=d["mono"], ts=d["ts"], states=states, **{m: d.get(m) for m in METRICS})
+
+
+def load_recording(path):
+    """Yield decoded lines (dicts) from a recording, validating the header."""
+    with open(path) as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != REPLAY_FORMAT:
+            raise ValueError(f"{path}: not a {REPLAY_FORMAT} recording")
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break  # torn last line from a power cut; stop there
+
+
+# =========================================================
+# Recorder (wraps the acquisition read function)
+# =========================================================
+class SampleRecorder:
+    """
+    Appends every Sample (and sensor status transitions) to a recording.
+    - status_fn() -> {sensor: (state, since_wall_or_None)}; only changes are written
+    - runs on the acquisition thread, so file I/O never touches the UI tick
+    """
+
+    def __init__(self, path, status_fn=None, flush_every: int = 20):
+        self.path = path
+        self.status_fn = status_fn
+        self.flush_every = flush_every
+
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._f = open(path, "a")
+        if new:
+            self._write({"format": REPLAY_FORMAT, "version": REPLAY_VERSION, "metrics": list(METRICS)})
+        self._last_status = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, read_fn):
+        def read_and_record():
+            sample = read_fn()
+            if sample is not None:
+                self.record(sample)
+            return sample
+        return read_and_record
+
+    def record(self, sample):
+        with self._lock:
+            if self._f is None:
+                return
+            if self.status_fn is not None:
+                for sensor, (state, since) in self.status_fn().items():
+                    name = _state_name(state)
+                    if self._last_status.get(sensor) != name:
+                        self._last_status[sensor] = name
+                        self._write({
+                            "k": "st",
+                            "mono": round(sample.mono, 3),
+                            "ts": round(sample.ts, 3),
+                            "sensor": sensor,
+                            "state": name,
+                            "age_s": None if since is None else round(sample.ts - since, 1),
+                        })
+            self._write(_encode_sample(sample))
+
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._f.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+    def _write(self, obj):
+        self._f.write(json.dumps(obj, separators=(",", ":")) + "\n")
+
+
+# =========================================================
+# Replayer (drop-in read function for the acquisition engine)
+# =========================================================
+class SampleReplayer:
+    """
+    Plays a recording back as a read function at 1x or N x speed.
+    - call it like read_sensors(); returns the next due Sample or None
+    - next_due() is the engine's wake_fn, so samples keep their spacing
+    - status_cb(sensor, state, age_s) is called for status transitions
+    - samples keep their recorded timestamps (deterministic downstream);
+      each later pass (loop=True, or iterating again) is shifted forward by
+      the recording span plus one sample interval, so time never runs back
+    """
+
+    def __init__(self, path, speed: float = 1.0, loop: bool = False, state_cls=None, status_cb=None):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.state_cls = state_cls
+        self.status_cb = status_cb
+
+        self._lines = list(load_recording(path))
+        self._i = 0
+        self._t0 = None
+        self._mono0 = self._lines[0]["mono"] if self._lines else 0.0
+        self.done = not self._lines
+
+        # Per-pass offset: span + one (mean) interval, wall and monotonic
+        samples = [d for d in self._lines if d.get("k") == "s"]
+        self._pass = 0
+        self._shift_ts = self._shift_mono = 0.0
+        if samples:
+            n = len(samples)
+            span_ts = samples[-1]["ts"] - samples[0]["ts"]
+            span_mono = samples[-1]["mono"] - samples[0]["mono"]
+            self._shift_ts = span_ts + (span_ts / (n - 1) if n > 1 else 1.0)
+            self._shift_mono = span_mono + (span_mono / (n - 1) if n > 1 else 1.0)
+
+    def __iter__(self):
+        """
+        Every sample in order, as fast as possible (status applied on the way).
+        Iterating again continues with the next (time-shifted) pass.
+        """
+        for d in self._lines:
+            if d.get("k") == "st":
+                self._apply_status(d)
+            elif d.get("k") == "s":
+                yield self._decode(d)
+        self._pass += 1
+
+    def next_due(self) -> float:
+        if self.done:
+            return float("inf")
+        if self._t0 is None:
+            return time.monotonic()
+        return self._t0 + (self._lines[self._i]["mono"] - self._mono0) / self.speed
+
+    def __call__(self):
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+
+        while not self.done and time.monotonic() >= self.next_due():
+            d = self._lines[self._i]
+            sample = self._decode(d) if d.get("k") == "s" else None
+            self._advance()
+            if d.get("k") == "st":
+                self._apply_status(d)
+            elif sample is not None:
+                return sample
+        return None
+
+    def _decode(self, d):
+        sample = _decode_sample(d, self.state_cls)
+        if not self._pass:
+            return sample
+        return sample._replace(
+            ts=sample.ts + self._pass * self._shift_ts,
+            mono=sample.mono + self._pass * self._shift_mono,
+        )
+
+    def _advance(self):
+        self._i += 1
+        if self._i >= len(self._lines):
+            if self.loop:
+                self._i = 0
+                self._t0 = time.monotonic()
+                self._pass += 1
+            else:
+                self.done = True
+
+    def _apply_status(self, d):
+        if self.status_cb is None:
+            return
+        state = d["state"]
+        if self.state_cls is not None and state is not None:
+            state = self.state_cls[state]
+        self.status_cb(d["sensor"], state, d.get("age_s"))
+
+
+# =========================================================
+# Headless benchmark (dev box, no Pi attached)
+# =========================================================
+def bench(path, repeat: int = 1):
+    """
+    Drive Dashboard.update_data with every recorded sample and time it.
+    Runs offscreen; the acquisition worker is stopped and samples are
+    published directly so each one gets exactly one UI tick.
+    """
+    import main  # sets the Qt env; override the platform before QApplication
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PyQt5 import QtWidgets
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    replayer = SampleReplayer(path, state_cls=main.SensorState, status_cb=main.apply_replayed_status)
+    dash = main.Dashboard(source=lambda: None)
+    dash.timer.stop()
+    dash.acquisition.stop()
+
+    ticks = []
+    for _ in range(repeat):
+        for sample in replayer:
+            dash.acquisition.publish(sample)
+            t0 = time.perf_counter()
+            dash.update_data()
+            ticks.append(time.perf_counter() - t0)
+
+    if not ticks:
+        print("No samples in recording")
+        return None
+
+    ticks.sort()
+    total = sum(ticks)
+    result = {
+        "samples": len(ticks),
+        "mean_ms": round(total / len(ticks) * 1000, 3),
+        "p95_ms": round(ticks[int(0.95 * (len(ticks) - 1))] * 1000, 3),
+        "max_ms": round(ticks[-1] * 1000, 3),
+        "samples_per_s": round(len(ticks) / total, 1) if total else None,
+    }
+    print(json.dumps(result, indent=2))
+    app.quit()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="HowlX Scout recording tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="time Dashboard.update_data over a recording")
+    b.add_argument("recording")
+    b.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.cmd == "bench":
+        bench(args.recording, repeat=args.repeat)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scoring import AlertState, HAS_NUMPY, score_columns, score_reading
+from survey_log import LOG_FILE, SURVEYS_ROOT, load_csv_columns, read_records, record_to_csv_cells
+from survey_writer import READINGS_COLUMNS, READINGS_FILE
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+# =========================================================
+# Batch rescoring of survey readings.csv files
+# =========================================================
+# Layout written by survey_writer.SurveyWriter (encode_csv_row):
+#   <root>/<customer>/<job_id>/readings.csv
+#   timestamp,co,co2,pm25,voc,temp,humidity,score,state[,dew_point,abs_humidity,heat_index,mold_risk]
+# or, for current jobs, the binary survey log (survey_log.LOG_FILE), which
+# is read instead when present.
+RESCORED_FILE = "readings.rescored.csv"
+
+# The live VOC penalty is gated on voc_confidence(), which is not recorded.
+#   warmup: no VOC penalty for the first VOC_WARMUP_S of each job (sensor
+#           assumed to start with the survey; matches main.VOC_WARMUP_SECONDS)
+#   always: penalize VOC whenever a value was recorded
+#   never:  ignore VOC in the score (alert state still uses it, as live)
+VOC_GATES = ("warmup", "always", "never")
+VOC_WARMUP_S = 6 * 60
+
+SCORED_COLUMNS = ("co", "pm25", "co2", "voc")
+
+
+def find_jobs(root):
+    """Every job directory under root that has a readings file, sorted."""
+    root = Path(root)
+    return sorted({p.parent for name in (LOG_FILE, READINGS_FILE) for p in root.glob(f"*/*/{name}")})
+
+
+def load_job(job_dir):
+    """(header, rows, columns) from the job's survey log, else its readings.csv."""
+    job_dir = Path(job_dir)
+    if not (job_dir / LOG_FILE).exists():
+        return load_csv_columns(job_dir / READINGS_FILE, ("timestamp",) + SCORED_COLUMNS)
+    # One pass over the log feeds both the scored columns and the stored
+    # rows they are compared against
+    recs = read_records(job_dir / LOG_FILE)
+    names = ("timestamp",) + SCORED_COLUMNS
+    if HAS_NUMPY:
+        cols = {name: recs[name].astype(np.float64).tolist() for name in names}
+        recs = zip(*(recs[name].tolist() for name in READINGS_COLUMNS))
+    else:
+        cols = {name: [r[READINGS_COLUMNS.index(name)] for r in recs] for name in names}
+    rows = [record_to_csv_cells(r) for r in recs]
+    return list(READINGS_COLUMNS), rows, cols
+
+
+def _voc_scored(timestamps, voc_gate, warmup_s):
+    if voc_gate == "always":
+        return [True] * len(timestamps)
+    if voc_gate == "never" or not timestamps:
+        return [False] * len(timestamps)
+    t0 = timestamps[0]
+    return [not (t - t0 < warmup_s) for t in timestamps]
+
+
+def score_job_columns(cols, voc_gate="warmup", warmup_s=VOC_WARMUP_S):
+    """Score whole columns; vectorized with NumPy, per-row fallback without."""
+    n = len(cols.get("timestamp", ()))
+    gate = _voc_scored(cols.get("timestamp", []), voc_gate, warmup_s)
+    series = [cols.get(name, [math.nan] * n) for name in SCORED_COLUMNS]
+
+    if HAS_NUMPY:
+        co, pm, co2, voc = (np.asarray(c, dtype=np.float64) for c in series)
+        scores, states = score_columns(co, pm, co2, voc, voc_scored=np.asarray(gate, dtype=bool))
+        return scores.tolist(), [AlertState(s).name for s in states.tolist()]
+
+    scores, states = [], []
+    for co, pm, co2, voc, g in zip(*series, gate):
+        s, st = score_reading(
+            co=None if math.isnan(co) else co,
+            pm25=None if math.isnan(pm) else pm,
+            co2=None if math.isnan(co2) else co2,
+            voc=None if math.isnan(voc) else voc,
+            voc_scored=g,
+        )
+        scores.append(s)
+        states.append(st.name)
+    return scores, states
+
+
+def rescore_job(job_dir, voc_gate="warmup", warmup_s=VOC_WARMUP_S, write=False):
+    """
+    Rescore one job directory (runs in a worker process).
+    Returns counts of rows and of score/state changes vs. what was stored.
+    """
+    job_dir = Path(job_dir)
+    t0 = time.perf_counter()
+    header, rows, cols = load_job(job_dir)
+    t_load = time.perf_counter()
+
+    result = {"job": str(job_dir), "rows": len(rows), "score_changed": 0, "state_changed": 0}
+    if not rows:
+        result.update(load_s=t_load - t0, score_s=0.0)
+        return result
+
+    scores, states = score_job_columns(cols, voc_gate, warmup_s)
+    t_score = time.perf_counter()
+
+    i_score, i_state = header.index("score"), header.index("state")
+    for r, s, st in zip(rows, scores, states):
+        if r[i_score] != str(s):
+            result["score_changed"] += 1
+        if r[i_state] != st:
+            result["state_changed"] += 1
+
+    if write:
+        out = job_dir / RESCORED_FILE
+        tmp = out.with_suffix(".tmp")
+        with open(tmp, "w", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(header)
+            for r, s, st in zip(rows, scores, states):
+                r = list(r)
+                r[i_score], r[i_state] = str(s), st
+                w.writerow(r)
+        os.replace(tmp, out)
+
+    result.update(load_s=t_load - t0, score_s=t_score - t_load)
+    return result
+
+
+def rescore_all(root=SURVEYS_ROOT, workers=None, voc_gate="warmup", warmup_s=VOC_WARMUP_S, write=False):
+    """Rescore every job under root across a process pool; returns a summary."""
+    jobs = find_jobs(root)
+    t0 = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = [rescore_job(j, voc_gate, warmup_s, write) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                rescore_job, jobs,
+                [voc_gate] * len(jobs), [warmup_s] * len(jobs), [write] * len(jobs),
+            ))
+    wall = time.perf_counter() - t0
+
+    rows = sum(r["rows"] for r in results)
+    score_s = sum(r["score_s"] for r in results)
+    return {
+        "jobs": len(results),
+        "rows": rows,
+        "score_changed": sum(r["score_changed"] for r in results),
+        "state_changed": sum(r["state_changed"] for r in results),
+        "wall_s": round(wall, 3),
+        "rows_per_s": round(rows / wall, 1) if wall else None,
+        # scoring alone (excludes CSV parsing), summed over workers
+        "score_rows_per_s": round(rows / score_s, 1) if score_s else None,
+        "vectorized": HAS_NUMPY,
+        "voc_gate": voc_gate,
+        "changed_jobs": [r["job"] for r in results if r["score_changed"] or r["state_changed"]],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Rescore survey readings with the current scoring rules")
+    ap.add_argument("root", nargs="?", default=str(SURVEYS_ROOT), help="surveys directory")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--voc-gate", choices=VOC_GATES, default="warmup")
+    ap.add_argument("--voc-warmup-s", type=float, default=VOC_WARMUP_S)
+    ap.add_argument("--write", action="store_true", help=f"write {RESCORED_FILE} next to each job's readings")
+    ap.add_argument("--verify", action="store_true", help="exit 1 if any stored score/state differs")
+    args = ap.parse_args()
+
+    summary = rescore_all(args.root, args.workers, args.voc_gate, args.voc_warmup_s, args.write)
+    print(json.dumps(summary, indent=2))
+    if args.verify and (summary["score_changed"] or summary["state_changed"]):
+        raise SystemExit(1)
@@ -0,0 +1,306 @@
+from bisect import bisect_left
+from enum import Enum
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# =========================================================
+# Thresholds (single source; everything below is built from these)
+# =========================================================
+PM25_GOOD_MAX = 12        # µg/m³
+PM25_MODERATE_MAX = 35
+PM25_POOR_MAX = 55
+
+CO2_GOOD_MAX = 800        # ppm
+CO2_ELEVATED_MAX = 1200
+
+VOC_GOOD_MAX = 100        # Sensirion VOC index
+VOC_MODERATE_MAX = 150
+VOC_ELEVATED_MAX = 250
+
+CO_SAFE_MAX = 9           # ppm
+CO_DANGER_THRESHOLD = 35
+
+HUMIDITY_LOW = 30         # %RH, comfort band 30–50
+HUMIDITY_HIGH = 50
+
+TEMP_COOL = 68            # °F, comfort band 68–78
+TEMP_WARM = 78
+
+
+# =========================================================
+# Threshold tables (bisect scalar lookup, searchsorted array lookup)
+# =========================================================
+class ThresholdTable:
+    """
+    Sorted band edges -> one value per band (len(values) == len(edges) + 1).
+    A value equal to an edge falls in the band below it, unless the edge is
+    listed in lower_inclusive (then it starts the band above: ">=" rules).
+    """
+
+    def __init__(self, edges, values, lower_inclusive=()):
+        if len(values) != len(edges) + 1:
+            raise ValueError("need one value per band")
+        self.edges = tuple(edges)
+        self.values = tuple(values)
+        self.lower_inclusive = tuple(e in lower_inclusive for e in self.edges)
+        if HAS_NUMPY:
+            self._edges_arr = np.asarray(self.edges, dtype=np.float64)
+            self._lower_arr = np.asarray(self.lower_inclusive + (False,), dtype=bool)
+
+    def index(self, v):
+        i = bisect_left(self.edges, v)
+        if i < len(self.edges) and self.lower_inclusive[i] and self.edges[i] == v:
+            i += 1
+        return i
+
+    def lookup(self, v):
+        return self.values[self.index(v)]
+
+    def index_array(self, values):
+        """Band index per element (NaN -> -1); a plain list without NumPy."""
+        if not HAS_NUMPY:
+            return [-1 if v != v else self.index(v) for v in values]
+        x = np.asarray(values, dtype=np.float64)
+        idx = np.searchsorted(self._edges_arr, x, side="left")
+        if len(self.edges):
+            at = np.minimum(idx, len(self.edges) - 1)
+            idx += (self._lower_arr[idx] & (self._edges_arr[at] == x)).astype(idx.dtype)
+        return np.where(np.isnan(x), -1, idx)
+
+    def lookup_array(self, values, missing=0):
+        """Numeric band values per element; NaN -> missing."""
+        idx = self.index_array(values)
+        if not HAS_NUMPY:
+            return [missing if i < 0 else self.values[i] for i in idx]
+        table = np.asarray(self.values + (missing,))
+        return table[idx]  # -1 picks the trailing `missing` entry
+
+    def band_counts(self, values):
+        """Samples per band (e.g. time-in-band for a chart or report)."""
+        counts = [0] * len(self.values)
+        if HAS_NUMPY:
+            idx = np.asarray(self.index_array(values))
+            hist = np.bincount(idx[idx >= 0], minlength=len(self.values))
+            return hist.tolist()
+        for i in self.index_array(values):
+            if i >= 0:
+                counts[i] += 1
+        return counts
+
+
+# =========================================================
+# Severity bands (label, color, text) for the UI
+# =========================================================
+GOOD = "#4caf50"
+YELLOW = "#ffeb3b"
+ORANGE = "#ff9800"
+RED = "#f44336"
+BLUE = "#03a9f4"
+
+PM25_SEVERITY = ThresholdTable(
+    (PM25_GOOD_MAX, PM25_MODERATE_MAX, PM25_POOR_MAX),
+    (
+        ("Good", GOOD, "Air quality is healthy."),
+        ("Moderate", YELLOW, "Sensitive individuals may be affected."),
+        ("Poor", ORANGE, "Unhealthy for sensitive groups."),
+        ("Unhealthy", RED, "Unhealthy for everyone."),
+    ),
+)
+
+CO2_SEVERITY = ThresholdTable(
+    (CO2_GOOD_MAX, CO2_ELEVATED_MAX),
+    (
+        ("Good", GOOD, "Ventilation is adequate."),
+        ("Elevated", ORANGE, "Ventilation could be improved."),
+        ("High", RED, "Fresh air strongly recommended."),
+    ),
+)
+
+VOC_SEVERITY = ThresholdTable(
+    (VOC_GOOD_MAX, VOC_MODERATE_MAX, VOC_ELEVATED_MAX),
+    (
+        ("Good", GOOD, "VOC levels are low."),
+        ("Moderate", YELLOW, "VOC levels slightly elevated."),
+        ("Elevated", ORANGE, "VOC levels elevated."),
+        ("High", RED, "High VOC levels detected."),
+    ),
+)
+
+CO_SEVERITY = ThresholdTable(
+    (CO_SAFE_MAX, CO_DANGER_THRESHOLD),
+    (
+        ("Safe", GOOD, "Carbon monoxide levels are safe."),
+        ("Elevated", ORANGE, "CO detected — investigate sources."),
+        ("Danger", RED, "Dangerous CO levels — ventilate immediately."),
+    ),
+)
+
+HUMIDITY_SEVERITY = ThresholdTable(
+    (HUMIDITY_LOW, HUMIDITY_HIGH),
+    (
+        ("Low", BLUE, "May cause dry skin and irritation."),
+        ("Optimal", GOOD, "Comfortable humidity level."),
+        ("High", ORANGE, "May encourage mold growth."),
+    ),
+    lower_inclusive=(HUMIDITY_LOW,),
+)
+
+TEMP_SEVERITY = ThresholdTable(
+    (TEMP_COOL, TEMP_WARM),
+    (
+        ("Cool", BLUE, "Temperature is below comfort range."),
+        ("Comfortable", GOOD, "Temperature is within comfort range."),
+        ("Warm", ORANGE, "Temperature is above comfort range."),
+    ),
+    lower_inclusive=(TEMP_COOL,),
+)
+
+SEVERITY_TABLES = {
+    "pm25": PM25_SEVERITY,
+    "co2": CO2_SEVERITY,
+    "voc": VOC_SEVERITY,
+    "co": CO_SEVERITY,
+    "humidity": HUMIDITY_SEVERITY,
+    "temp": TEMP_SEVERITY,
+}
+
+
+# =========================================================
+# Score / alert rules (shared by the live UI and batch rescoring)
+# =========================================================
+class AlertState(Enum):
+    NORMAL = 0
+    WARNING = 1
+    CRITICAL = 2
+
+
+CRITICAL_SCORE_CAP = 30   # a CRITICAL reading never scores above this
+
+# Value used when a metric is installed but has no reading this tick
+MISSING_DEFAULTS = {"co": 0.0, "pm25": 0.0, "co2": 450, "voc": 0.0}
+
+# Score penalties (negative points, 0 = none)
+PENALTY_TABLES = {
+    "pm25": ThresholdTable((PM25_GOOD_MAX, PM25_MODERATE_MAX), (0, -10, -25)),
+    "co2": ThresholdTable((CO2_GOOD_MAX, CO2_ELEVATED_MAX), (0, -10, -20)),
+    "voc": ThresholdTable((VOC_MODERATE_MAX, VOC_ELEVATED_MAX), (0, -10, -20)),
+    "co": ThresholdTable(
+        (CO_SAFE_MAX, CO_DANGER_THRESHOLD), (0, -20, -60),
+        lower_inclusive=(CO_SAFE_MAX, CO_DANGER_THRESHOLD),
+    ),
+}
+
+# Alert level per metric (AlertState values); the reading's state is the max
+ALERT_TABLES = {
+    "pm25": ThresholdTable((PM25_MODERATE_MAX,), (0, 1)),
+    "co2": ThresholdTable((CO2_ELEVATED_MAX,), (0, 1)),
+    "voc": ThresholdTable((VOC_MODERATE_MAX,), (0, 1), lower_inclusive=(VOC_MODERATE_MAX,)),
+    "co": ThresholdTable(
+        (CO_SAFE_MAX, CO_DANGER_THRESHOLD), (0, 1, 2),
+        lower_inclusive=(CO_SAFE_MAX, CO_DANGER_THRESHOLD),
+    ),
+}
+
+
+# ---------------------------
+# Scalar rules (one reading)
+# ---------------------------
+def pm25_penalty(pm):
+    return PENALTY_TABLES["pm25"].lookup(pm)
+
+def co2_penalty(co2):
+    return PENALTY_TABLES["co2"].lookup(co2)
+
+def voc_penalty(voc):
+    return PENALTY_TABLES["voc"].lookup(voc)
+
+def co_penalty(co):
+    return PENALTY_TABLES["co"].lookup(co)
+
+def alert_level(metric, v):
+    return ALERT_TABLES[metric].lookup(v)
+
+
+def alert_state(co, pm, co2, voc, has_co=True, has_pm=True, has_co2=True, has_voc=True):
+    level = max(
+        alert_level("co", co) if has_co else 0,
+        alert_level("pm25", pm) if has_pm else 0,
+        alert_level("co2", co2) if has_co2 else 0,
+        alert_level("voc", voc) if has_voc else 0,
+    )
+    return AlertState(level)
+
+
+def final_score(raw, state):
+    """Apply the CRITICAL cap and clamp to 0..100."""
+    if state == AlertState.CRITICAL:
+        raw = min(raw, CRITICAL_SCORE_CAP)
+    return max(min(int(raw), 100), 0)
+
+
+def score_reading(co=None, pm25=None, co2=None, voc=None, voc_scored=True):
+    """
+    Score one reading; None = sensor not installed / no value.
+    voc_scored is the VOC confidence gate (False while the baseline is Low).
+    Returns (score, AlertState).
+    """
+    has_co, has_pm, has_co2, has_voc = (
+        co is not None, pm25 is not None, co2 is not None, voc is not None
+    )
+    co = co if has_co else MISSING_DEFAULTS["co"]
+    pm = pm25 if has_pm else MISSING_DEFAULTS["pm25"]
+    co2 = co2 if has_co2 else MISSING_DEFAULTS["co2"]
+    voc = voc if has_voc else MISSING_DEFAULTS["voc"]
+
+    state = alert_state(co, pm, co2, voc, has_co, has_pm, has_co2, has_voc)
+
+    score = 100
+    if has_pm:
+        score += pm25_penalty(pm)
+    if has_co2:
+        score += co2_penalty(co2)
+    if has_voc and voc_scored:
+        score += voc_penalty(voc)
+    if has_co:
+        score += co_penalty(co)
+
+    return final_score(score, state), state
+
+
+# ---------------------------
+# Vectorized rules (whole columns, NumPy)
+# ---------------------------
+def score_columns(co, pm25, co2, voc, voc_scored=True):
+    """
+    Column version of score_reading(); NaN = not installed / no value.
+    voc_scored may be a bool or a bool array (per-row confidence gate).
+    Returns (scores int16 array, states int8 array of AlertState values).
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("score_columns requires numpy")
+
+    cols = {
+        "co": np.asarray(co, dtype=np.float64),
+        "pm25": np.asarray(pm25, dtype=np.float64),
+        "co2": np.asarray(co2, dtype=np.float64),
+        "voc": np.asarray(voc, dtype=np.float64),
+    }
+    # Missing values fall in no band: 0 alert level, 0 penalty
+    states = np.zeros(cols["co"].shape, dtype=np.int8)
+    score = np.full(cols["co"].shape, 100, dtype=np.int16)
+    for metric, x in cols.items():
+        states = np.maximum(states, ALERT_TABLES[metric].lookup_array(x).astype(np.int8))
+        pen = PENALTY_TABLES[metric].lookup_array(x).astype(np.int16)
+        if metric == "voc":
+            pen = np.where(np.asarray(voc_scored, dtype=bool), pen, 0)
+        score += pen
+
+    critical = states == AlertState.CRITICAL.value
+    score = np.where(critical, np.minimum(score, CRITICAL_SCORE_CAP), score)
+    return np.clip(score, 0, 100).astype(np.int16), states
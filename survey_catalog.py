@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+import json
+import math
+import sqlite3
+import time
+from pathlib import Path
+
+from scoring import AlertState
+from survey_columns import HAS_NUMPY, open_job
+from survey_log import LOG_FILE, SCORE_MISSING, SURVEYS_ROOT, load_csv_columns
+from survey_writer import READINGS_FILE
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+# =========================================================
+# Survey catalog (SQLite index of every job under the surveys root)
+# =========================================================
+# <root>/catalog.sqlite3
+#   jobs         one row per <customer>/<job_id>: time span, sample count,
+#                worst alert state and WARNING/CRITICAL sample counts
+#   job_metrics  per job and metric: count / min / max / mean
+# Rows are (re)written by index_job() when a survey closes (writer thread)
+# and by rebuild() for jobs recorded before the catalog existed.
+CATALOG_FILE = "catalog.sqlite3"
+CATALOG_VERSION = 1
+
+CATALOG_METRICS = (
+    "co", "co2", "pm25", "voc", "temp", "humidity",
+    "dew_point", "abs_humidity", "heat_index", "score",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    customer       TEXT NOT NULL,
+    job_id         TEXT NOT NULL,
+    path           TEXT NOT NULL,
+    source         TEXT NOT NULL,
+    start_ts       REAL,
+    end_ts         REAL,
+    samples        INTEGER NOT NULL,
+    max_state      INTEGER NOT NULL,
+    warning_count  INTEGER NOT NULL,
+    critical_count INTEGER NOT NULL,
+    indexed_ts     REAL NOT NULL,
+    PRIMARY KEY (customer, job_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_customer ON jobs (customer, start_ts);
+CREATE INDEX IF NOT EXISTS jobs_by_start ON jobs (start_ts);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (max_state, start_ts);
+
+CREATE TABLE IF NOT EXISTS job_metrics (
+    customer TEXT NOT NULL,
+    job_id   TEXT NOT NULL,
+    metric   TEXT NOT NULL,
+    count    INTEGER NOT NULL,
+    min      REAL,
+    max      REAL,
+    mean     REAL,
+    PRIMARY KEY (customer, job_id, metric)
+) WITHOUT ROWID;
+"""
+
+
+# ---------------------------
+# Per-job statistics
+# ---------------------------
+def _series_stats(values):
+    """(count, min, max, mean) ignoring NaN; min/max/mean None when empty."""
+    if HAS_NUMPY:
+        v = np.asarray(values, dtype=np.float64)
+        v = v[~np.isnan(v)]
+        if not v.size:
+            return 0, None, None, None
+        return int(v.size), float(v.min()), float(v.max()), float(v.mean())
+
+    n, total, lo, hi = 0, 0.0, math.inf, -math.inf
+    for x in values:
+        if x != x:  # NaN
+            continue
+        n += 1
+        total += x
+        lo = x if x < lo else lo
+        hi = x if x > hi else hi
+    if not n:
+        return 0, None, None, None
+    return n, lo, hi, total / n
+
+
+def _state_counts(states):
+    """{AlertState value: samples} for a column of state values."""
+    if HAS_NUMPY:
+        counts = np.bincount(np.asarray(states, dtype=np.int64), minlength=len(AlertState))
+        return {i: int(c) for i, c in enumerate(counts)}
+    counts = dict.fromkeys(range(len(AlertState)), 0)
+    for s in states:
+        counts[s] = counts.get(s, 0) + 1
+    return counts
+
+
+def _store_columns(store):
+    """{column: view} from a job's ColumnStore (views die with the store)."""
+    cols = {name: store.column(name) for name in ("timestamp", "state") + CATALOG_METRICS}
+    if HAS_NUMPY:
+        cols["score"] = np.where(cols["score"] == SCORE_MISSING, np.nan, cols["score"])
+    else:
+        cols["score"] = [math.nan if v == SCORE_MISSING else v for v in cols["score"]]
+    return cols
+
+
+def _csv_columns(path):
+    """{column: list} from a legacy readings.csv (rows with a bad state dropped)."""
+    header, rows, floats = load_csv_columns(path, ("timestamp",) + CATALOG_METRICS)
+    i_state = header.index("state") if "state" in header else None
+    keep = [i for i, r in enumerate(rows) if i_state is not None and r[i_state] in AlertState.__members__]
+    cols = {
+        name: [floats[name][i] for i in keep] if name in floats else [math.nan] * len(keep)
+        for name in ("timestamp",) + CATALOG_METRICS
+    }
+    cols["state"] = [AlertState[rows[i][i_state]].value for i in keep]
+    return cols
+
+
+def _columns_stats(job_dir, source, cols):
+    """Catalog entry from a job's columns; only plain numbers are kept."""
+    ts = cols["timestamp"]
+    counts = _state_counts(cols["state"])
+    hit = [s for s, n in counts.items() if n]
+    return {
+        "customer": job_dir.parent.name,
+        "job_id": job_dir.name,
+        "path": str(job_dir),
+        "source": source,
+        "start_ts": float(ts[0]) if len(ts) else None,
+        "end_ts": float(ts[-1]) if len(ts) else None,
+        "samples": len(ts),
+        "max_state": max(hit) if hit else AlertState.NORMAL.value,
+        "warning_count": counts.get(AlertState.WARNING.value, 0),
+        "critical_count": counts.get(AlertState.CRITICAL.value, 0),
+        "metrics": {m: _series_stats(cols[m]) for m in CATALOG_METRICS},
+    }
+
+
+def job_stats(job_dir):
+    """Catalog entry for one job directory (dict with a "metrics" sub-dict)."""
+    job_dir = Path(job_dir)
+    if (job_dir / LOG_FILE).exists():
+        # Stats are reduced while the store is open, so its maps are closed
+        # on return rather than whenever the views get garbage collected
+        with open_job(job_dir) as store:
+            return _columns_stats(job_dir, LOG_FILE, _store_columns(store))
+    return _columns_stats(job_dir, READINGS_FILE, _csv_columns(job_dir / READINGS_FILE))
+
+
+# =========================================================
+# Catalog
+# =========================================================
+class SurveyCatalog:
+    """
+    SQLite index over a surveys root.
+    - one short-lived connection per call (safe from the writer thread and
+      the GUI thread at once; WAL keeps readers from blocking the writer)
+    - jobs() filters by customer, overlapping time range and worst alert
+      state, each backed by an index
+    """
+
+    def __init__(self, root=SURVEYS_ROOT, path=None):
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / CATALOG_FILE
+        self.root.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            db.execute(f"PRAGMA user_version={CATALOG_VERSION}")
+        finally:
+            db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _run(self, fn):
+        db = self._connect()
+        try:
+            with db:  # one transaction
+                return fn(db)
+        finally:
+            db.close()
+
+    # ---------------------------
+    # Indexing
+    # ---------------------------
+    def index_job(self, job_dir):
+        """(Re)index one job directory; returns its entry."""
+        entry = job_stats(job_dir)
+        self._run(lambda db: self._store(db, entry))
+        return entry
+
+    def _store(self, db, entry):
+        key = (entry["customer"], entry["job_id"])
+        db.execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (
+                entry["path"], entry["source"], entry["start_ts"], entry["end_ts"],
+                entry["samples"], entry["max_state"], entry["warning_count"],
+                entry["critical_count"], time.time(),
+            ),
+        )
+        db.execute("DELETE FROM job_metrics WHERE customer = ? AND job_id = ?", key)
+        db.executemany(
+            "INSERT INTO job_metrics VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [key + (m,) + stats for m, stats in entry["metrics"].items() if stats[0]],
+        )
+
+    def remove_job(self, customer, job_id):
+        def fn(db):
+            db.execute("DELETE FROM jobs WHERE customer = ? AND job_id = ?", (customer, job_id))
+            db.execute("DELETE FROM job_metrics WHERE customer = ? AND job_id = ?", (customer, job_id))
+        self._run(fn)
+
+    def rebuild(self, stale_only=True):
+        """
+        Index every job under root that has readings (skipping ones whose
+        files are older than their catalog row unless stale_only=False) and
+        drop rows whose directory is gone. Returns (indexed, removed).
+        """
+        jobs = sorted({p.parent for name in (LOG_FILE, READINGS_FILE) for p in self.root.glob(f"*/*/{name}")})
+        known = {
+            (r["customer"], r["job_id"]): r["indexed_ts"]
+            for r in self._run(lambda db: db.execute("SELECT customer, job_id, indexed_ts FROM jobs").fetchall())
+        }
+        indexed = 0
+        for job_dir in jobs:
+            key = (job_dir.parent.name, job_dir.name)
+            mtime = max(
+                (job_dir / name).stat().st_mtime
+                for name in (LOG_FILE, READINGS_FILE) if (job_dir / name).exists()
+            )
+            if stale_only and key in known and known[key] >= mtime:
+                continue
+            try:
+                self.index_job(job_dir)
+                indexed += 1
+            except Exception as e:
+                print(f"Catalog: skipping {job_dir}:", repr(e))
+
+        present = {(j.parent.name, j.name) for j in jobs}
+        gone = [k for k in known if k not in present]
+        for customer, job_id in gone:
+            self.remove_job(customer, job_id)
+        return indexed, len(gone)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def jobs(self, customer=None, since=None, until=None, min_state=None, limit=None):
+        """
+        Job rows (dicts), newest first.
+        since/until select jobs whose span overlaps [since, until];
+        min_state (AlertState or name) keeps jobs that reached that state.
+        """
+        where, args = [], []
+        if customer is not None:
+            where.append("customer = ?")
+            args.append(customer)
+        if until is not None:
+            where.append("start_ts <= ?")
+            args.append(until)
+        if since is not None:
+            where.append("end_ts >= ?")
+            args.append(since)
+        if min_state is not None:
+            if isinstance(min_state, str):
+                min_state = AlertState[min_state]
+            where.append("max_state >= ?")
+            args.append(AlertState(min_state).value)
+        sql = "SELECT * FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY start_ts DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return self._run(lambda db: [dict(r) for r in db.execute(sql, args)])
+
+    def customers(self):
+        """[(customer, job count, last start_ts)] alphabetically."""
+        return self._run(lambda db: [tuple(r) for r in db.execute(
+            "SELECT customer, COUNT(*), MAX(start_ts) FROM jobs GROUP BY customer ORDER BY customer"
+        )])
+
+    def metrics(self, customer, job_id):
+        """{metric: {count, min, max, mean}} for one job."""
+        rows = self._run(lambda db: db.execute(
+            "SELECT metric, count, min, max, mean FROM job_metrics WHERE customer = ? AND job_id = ?",
+            (customer, job_id),
+        ).fetchall())
+        return {r["metric"]: {k: r[k] for k in ("count", "min", "max", "mean")} for r in rows}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="HowlX Scout survey catalog")
+    ap.add_argument("--root", default=str(SURVEYS_ROOT), help="surveys directory")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("rebuild", help="index new/changed jobs, drop deleted ones")
+    c.add_argument("--full", action="store_true", help="reindex every job")
+    c = sub.add_parser("list", help="list jobs (newest first)")
+    c.add_argument("--customer")
+    c.add_argument("--since", type=float, help="unix s")
+    c.add_argument("--until", type=float, help="unix s")
+    c.add_argument("--state", choices=[s.name for s in AlertState], help="reached at least this state")
+    c.add_argument("--limit", type=int)
+    c.add_argument("--metrics", action="store_true", help="include per-metric stats")
+    args = ap.parse_args()
+
+    catalog = SurveyCatalog(args.root)
+    if args.cmd == "rebuild":
+        t0 = time.perf_counter()
+        indexed, removed = catalog.rebuild(stale_only=not args.full)
+        print(f"{indexed} indexed, {removed} removed in {time.perf_counter() - t0:.2f} s")
+    elif args.cmd == "list":
+        rows = catalog.jobs(args.customer, args.since, args.until, args.state, args.limit)
+        for r in rows:
+            if args.metrics:
+                r["metrics"] = catalog.metrics(r["customer"], r["job_id"])
+            r["max_state"] = AlertState(r["max_state"]).name
+        print(json.dumps(rows, indent=2))
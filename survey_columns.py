@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+import fcntl
+import json
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from survey_log import (
+    BLOCK_HEADER_FMT, BLOCK_MAGIC, FILE_HEADER_FMT, LOG_FILE, RECORD_FMT, RECORD_SIZE, scan_blocks,
+)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+if HAS_NUMPY:
+    from survey_log import RECORD_DTYPE
+
+
+# =========================================================
+# Columnar job layout (derived from the survey log)
+# =========================================================
+# <job_dir>/columns/
+#   meta.json        {"version", "rows", "log_offset", "log_id", "t0", "t1", "columns": {name: typecode}}
+#   <name>.col       one contiguous native-endian array per column, `rows` long
+# Columns are appended incrementally (SYNC_CHUNK_BYTES of log at a time) from
+# where the last sync stopped reading the log (log_offset), so re-syncing a
+# finished job costs nothing. meta.json is replaced last; rows past
+# meta["rows"] (a sync cut short) are dropped on the next sync. log_id
+# (inode + first block header) detects a log that was replaced, e.g. rebuilt
+# by csv_to_log, even when it is no smaller than log_offset.
+COLUMNS_DIR = "columns"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+COLUMNS_VERSION = 1
+SYNC_CHUNK_BYTES = 4 << 20
+
+# (name, array typecode) in survey log record order
+COLUMN_TYPES = (
+    ("timestamp", "d"),
+    ("co", "f"), ("co2", "f"), ("pm25", "f"), ("voc", "f"), ("temp", "f"), ("humidity", "f"),
+    ("score", "B"), ("state", "B"),
+    ("dew_point", "f"), ("abs_humidity", "f"), ("heat_index", "f"),
+    ("mold_risk", "b"),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMN_TYPES)
+TYPECODES = dict(COLUMN_TYPES)
+
+
+def _col_path(cdir, name):
+    return cdir / f"{name}.col"
+
+
+def _read_meta(cdir):
+    try:
+        meta = json.loads((cdir / META_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != COLUMNS_VERSION:
+        return None
+    return meta
+
+
+def _empty_meta():
+    return {
+        "version": COLUMNS_VERSION, "rows": 0, "log_offset": None, "t0": None, "t1": None,
+        "columns": dict(TYPECODES),
+    }
+
+
+def _split_records(payload):
+    """Record bytes -> {name: array / ndarray} (one pass, no per-row dicts)."""
+    if HAS_NUMPY:
+        recs = np.frombuffer(payload, dtype=RECORD_DTYPE)
+        return {name: recs[name].astype(tc) for name, tc in COLUMN_TYPES}
+    cols = [array(tc) for _, tc in COLUMN_TYPES]
+    for rec in RECORD_FMT.iter_unpack(payload):
+        for col, v in zip(cols, rec):
+            col.append(v)
+    return dict(zip(COLUMN_NAMES, cols))
+
+
+def _log_identity(f, mm):
+    """Identity of a log file: inode + its first block header (CRC included)."""
+    first = mm[FILE_HEADER_FMT.size:FILE_HEADER_FMT.size + BLOCK_HEADER_FMT.size]
+    return {"inode": os.fstat(f.fileno()).st_ino, "first_block": first.hex()}
+
+
+def _resumable(meta, mm, identity):
+    """True if meta was built from this log and log_offset is a block boundary."""
+    offset = meta["log_offset"]
+    if offset is None:
+        return meta["rows"] == 0
+    if meta.get("log_id") != identity or offset > len(mm):
+        return False
+    return offset == len(mm) or mm[offset:offset + len(BLOCK_MAGIC)] == BLOCK_MAGIC
+
+
+def sync_columns(job_dir):
+    """
+    Bring <job_dir>/columns up to date with the job's survey log.
+    Returns the number of rows appended. Safe to call on a live job (only
+    whole, checksummed blocks are read) and from several threads/processes
+    at once (an flock on columns/.lock serializes syncs of the same job).
+    """
+    job_dir = Path(job_dir)
+    log_path = job_dir / LOG_FILE
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return 0
+    cdir = job_dir / COLUMNS_DIR
+    cdir.mkdir(exist_ok=True)
+
+    with open(cdir / LOCK_FILE, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            return _sync_locked(log_path, cdir)
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _sync_locked(log_path, cdir):
+    meta = _read_meta(cdir) or _empty_meta()
+    added = 0
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        identity = _log_identity(f, mm)
+        if not _resumable(meta, mm, identity):
+            meta = _empty_meta()  # log replaced (e.g. rebuilt from CSV): start over
+        meta["log_id"] = identity
+        rows = meta["rows"]
+
+        files = [open(_col_path(cdir, name), "ab") for name in COLUMN_NAMES]
+        try:
+            for out, (_, tc) in zip(files, COLUMN_TYPES):
+                out.truncate(rows * array(tc).itemsize)  # drop a partial previous sync
+            blocks, end = scan_blocks(mm, meta["log_offset"])
+            chunk, size = [], 0
+            for i, (o, n) in enumerate(blocks):
+                chunk.append(mm[o:o + n * RECORD_SIZE])
+                size += n * RECORD_SIZE
+                if size < SYNC_CHUNK_BYTES and i + 1 < len(blocks):
+                    continue
+                new = _split_records(b"".join(chunk))
+                chunk, size = [], 0
+                for out, name in zip(files, COLUMN_NAMES):
+                    new[name].tofile(out)
+                ts = new["timestamp"]
+                if meta["t0"] is None:
+                    meta["t0"] = float(ts[0])
+                meta["t1"] = float(ts[-1])
+                added += len(ts)
+        finally:
+            for out in files:
+                out.close()
+
+    meta["rows"] = rows + added
+    meta["log_offset"] = end
+    tmp = cdir / (META_FILE + ".tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, cdir / META_FILE)
+    return added
+
+
+# =========================================================
+# Reader (zero-copy views over mmap'd columns)
+# =========================================================
+class ColumnStore:
+    """
+    Read-only view of a job's columns.
+    - open() maps nothing up front; each column file is mmap'd the first time
+      it is asked for, so slicing one metric never touches the others
+    - column() returns a NumPy memmap view (or a typed memoryview without
+      NumPy); range()/slice() bisect the timestamp column and return views,
+      not copies
+    """
+
+    def __init__(self, job_dir, sync=True):
+        self.job_dir = Path(job_dir)
+        self.cdir = self.job_dir / COLUMNS_DIR
+        if sync:
+            sync_columns(self.job_dir)
+        meta = _read_meta(self.cdir)
+        if meta is None:
+            raise FileNotFoundError(f"{self.job_dir}: no columnar survey data")
+        self.meta = meta
+        self.rows = meta["rows"]
+        self._views = {}
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def t0(self):
+        return self.meta["t0"]
+
+    @property
+    def t1(self):
+        return self.meta["t1"]
+
+    def close(self):
+        """Drop the views; the maps close once no caller slice refers to them."""
+        self._views.clear()
+        self._maps.clear()
+
+    def column(self, name):
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        tc = TYPECODES[name]
+        path = _col_path(self.cdir, name)
+        if self.rows == 0:
+            view = np.zeros(0, dtype=tc) if HAS_NUMPY else memoryview(array(tc))
+        elif HAS_NUMPY:
+            view = np.memmap(path, dtype=tc, mode="r", shape=(self.rows,))
+        else:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), self.rows * array(tc).itemsize, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            view = memoryview(mm).cast(tc)
+        self._views[name] = view
+        return view
+
+    def range(self, t0=None, t1=None):
+        """Row indices [i, j) with t0 <= timestamp <= t1 (None = open end)."""
+        ts = self.column("timestamp")
+        if HAS_NUMPY:
+            i = 0 if t0 is None else int(np.searchsorted(ts, t0, side="left"))
+            j = self.rows if t1 is None else int(np.searchsorted(ts, t1, side="right"))
+        else:
+            i = 0 if t0 is None else bisect_left(ts, t0)
+            j = self.rows if t1 is None else bisect_right(ts, t1)
+        return i, j
+
+    def slice(self, name, t0=None, t1=None):
+        """(timestamps, values) views of one column between t0 and t1."""
+        i, j = self.range(t0, t1)
+        return self.column("timestamp")[i:j], self.column(name)[i:j]
+
+
+def open_job(job_dir, sync=True):
+    """ColumnStore for a job directory (syncing it from the log first)."""
+    return ColumnStore(job_dir, sync=sync)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="HowlX Scout columnar survey data")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("sync", help=f"build/update {COLUMNS_DIR}/ from the job's {LOG_FILE}")
+    c.add_argument("job_dir")
+    c = sub.add_parser("slice", help="time one metric over a time range")
+    c.add_argument("job_dir")
+    c.add_argument("metric", choices=COLUMN_NAMES)
+    c.add_argument("--from", dest="t0", type=float, default=None, help="start (unix s)")
+    c.add_argument("--to", dest="t1", type=float, default=None, help="end (unix s)")
+    args = ap.parse_args()
+
+    if args.cmd == "sync":
+        print(f"{sync_columns(args.job_dir)} rows appended")
+    elif args.cmd == "slice":
+        sync_columns(args.job_dir)
+        t_open = time.perf_counter()
+        with open_job(args.job_dir, sync=False) as store:
+            ts, vals = store.slice(args.metric, args.t0, args.t1)
+            t_slice = time.perf_counter()
+            print(f"rows={len(store)} selected={len(vals)} numpy={HAS_NUMPY}")
+            print(f"open+slice {(t_slice - t_open) * 1000:.2f} ms")
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+from derived import DERIVED_METRICS, derived_values, f_to_c
+from scoring import AlertState
+from survey_log import LOG_FILE, MOLD_MISSING, SCORE_MISSING, SURVEYS_ROOT, iter_csv, iter_records, parse_cell
+from survey_writer import READINGS_COLUMNS, READINGS_FILE
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAS_ZSTD = False
+
+
+# =========================================================
+# Streaming survey export
+# =========================================================
+# source (one job's log or legacy readings.csv, one block in memory at a time)
+#   -> time_range -> resample -> with_derived -> convert_units -> with_time
+#   -> CSV / JSON Lines, optionally gzip or zstd compressed
+# Every stage is a generator over row dicts, so memory stays constant no
+# matter how large the job; rows are never collected into a list.
+FORMATS = ("csv", "jsonl")
+COMPRESSIONS = ("none", "gzip", "zstd")
+SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+TEMP_COLUMNS = ("temp", "dew_point", "heat_index")   # °F as stored
+
+
+def _f32(v):
+    """Stored f32 -> the 7 significant digits it actually holds (None for NaN)."""
+    if v != v:
+        return None
+    return float(f"{v:.7g}")
+
+
+# ---------------------------
+# Sources
+# ---------------------------
+def iter_log_rows(path):
+    """Row dicts (READINGS_COLUMNS keys) from a survey log."""
+    for ts, co, co2, pm25, voc, temp, hum, score, state, dp, ah, hi, mold in iter_records(path):
+        yield {
+            "timestamp": ts,
+            "co": _f32(co), "co2": _f32(co2), "pm25": _f32(pm25), "voc": _f32(voc),
+            "temp": _f32(temp), "humidity": _f32(hum),
+            "score": None if score == SCORE_MISSING else score,
+            "state": AlertState(state).name,
+            "dew_point": _f32(dp), "abs_humidity": _f32(ah), "heat_index": _f32(hi),
+            "mold_risk": None if mold == MOLD_MISSING else mold,
+        }
+
+
+def iter_csv_dicts(path):
+    """Row dicts from a legacy readings.csv (missing columns -> None)."""
+    rows = iter_csv(path)
+    idx = {name: i for i, name in enumerate(next(rows, None) or [])}
+    parsed = [(name, idx.get(name)) for name in READINGS_COLUMNS if name != "state"]
+    i_state = idx.get("state")
+    for cells in rows:
+        row = {name: None if i is None else parse_cell(cells[i]) for name, i in parsed}
+        if row["timestamp"] is None:
+            continue
+        row["state"] = (cells[i_state] or None) if i_state is not None else None
+        for name in ("score", "mold_risk"):
+            if row[name] is not None:
+                row[name] = int(row[name])
+        yield row
+
+
+def iter_job(job_dir):
+    """Rows of one job, from its survey log when it has one."""
+    job_dir = Path(job_dir)
+    if (job_dir / LOG_FILE).exists():
+        return iter_log_rows(job_dir / LOG_FILE)
+    return iter_csv_dicts(job_dir / READINGS_FILE)
+
+
+# ---------------------------
+# Stages
+# ---------------------------
+def time_range(rows, t0=None, t1=None):
+    """Rows with t0 <= timestamp <= t1; stops reading once past t1."""
+    for row in rows:
+        ts = row["timestamp"]
+        if t0 is not None and ts < t0:
+            continue
+        if t1 is not None and ts > t1:
+            return
+        yield row
+
+
+def resample(rows, interval_s):
+    """
+    One row per interval_s bucket (timestamp = bucket start): numeric columns
+    averaged (None ignored), state = worst in the bucket, mold_risk =
+    highest, labels (string columns) kept, plus a "samples" count.
+    """
+    bucket = None
+    for row in rows:
+        start = math.floor(row["timestamp"] / interval_s) * interval_s
+        if bucket is not None and start != bucket["start"]:
+            yield _close_bucket(bucket)
+            bucket = None
+        if bucket is None:
+            bucket = {"start": start, "first": row, "n": 0, "sums": {}, "counts": {}, "state": -1, "mold": None}
+        bucket["n"] += 1
+        for name, v in row.items():
+            if name == "timestamp" or v is None:
+                continue
+            if name == "state":
+                if v in AlertState.__members__:
+                    bucket["state"] = max(bucket["state"], AlertState[v].value)
+            elif name == "mold_risk":
+                bucket["mold"] = v if bucket["mold"] is None else max(bucket["mold"], v)
+            elif not isinstance(v, str):
+                bucket["sums"][name] = bucket["sums"].get(name, 0.0) + v
+                bucket["counts"][name] = bucket["counts"].get(name, 0) + 1
+    if bucket is not None:
+        yield _close_bucket(bucket)
+
+
+def _close_bucket(b):
+    out = {}
+    for name, v in b["first"].items():
+        if name == "timestamp":
+            out[name] = b["start"]
+        elif name == "state":
+            out[name] = AlertState(b["state"]).name if b["state"] >= 0 else None
+        elif name == "mold_risk":
+            out[name] = b["mold"]
+        elif isinstance(v, str):
+            out[name] = v  # label
+        else:
+            n = b["counts"].get(name)
+            out[name] = round(b["sums"][name] / n, 3) if n else None
+    out["samples"] = b["n"]
+    return out
+
+
+def with_derived(rows):
+    """Fill dew point / absolute humidity / heat index / mold risk where missing (legacy CSVs)."""
+    for row in rows:
+        if row.get("dew_point") is None and row.get("temp") is not None:
+            row.update(derived_values(row["temp"], row.get("humidity")))
+        else:
+            for name in DERIVED_METRICS:
+                row.setdefault(name, None)
+        yield row
+
+
+def convert_units(rows, temp_unit="F"):
+    """Temperatures in °F (as stored) or °C."""
+    if temp_unit == "F":
+        yield from rows
+        return
+    for row in rows:
+        for name in TEMP_COLUMNS:
+            if row.get(name) is not None:
+                row[name] = round(f_to_c(row[name]), 2)
+        yield row
+
+
+def with_time(rows, utc=False):
+    """Add an ISO-8601 "time" column next to the unix timestamp."""
+    conv = time.gmtime if utc else time.localtime
+    fmt = "%Y-%m-%dT%H:%M:%SZ" if utc else "%Y-%m-%dT%H:%M:%S"
+    for row in rows:
+        yield {"time": time.strftime(fmt, conv(row["timestamp"])), **row}
+
+
+def with_labels(rows, **labels):
+    """Prefix constant columns (e.g. customer/job_id for multi-job exports)."""
+    for row in rows:
+        yield {**labels, **row}
+
+
+def pipeline(job_dir, t0=None, t1=None, resample_s=None, derived=False,
+             temp_unit="F", iso_time=False, labels=None):
+    """Compose the stages for one job; returns a row generator."""
+    rows = time_range(iter_job(job_dir), t0, t1)
+    if labels:
+        rows = with_labels(rows, **labels)
+    if resample_s:
+        rows = resample(rows, resample_s)
+    if derived:
+        rows = with_derived(rows)
+    rows = convert_units(rows, temp_unit)
+    if iso_time:
+        rows = with_time(rows)
+    return rows
+
+
+# ---------------------------
+# Sinks
+# ---------------------------
+def open_output(path, compression="none"):
+    """Binary stream for path (or stdout for "-"), compressed as asked."""
+    to_stdout = str(path) == "-"
+    if compression == "zstd" and not HAS_ZSTD:
+        raise RuntimeError("zstd export needs the 'zstandard' package")
+    if compression == "gzip":
+        if to_stdout:
+            return gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb", compresslevel=6)
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        raw = sys.stdout.buffer if to_stdout else open(path, "wb")
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=not to_stdout)
+    return sys.stdout.buffer if to_stdout else open(path, "wb")
+
+
+def _jsonable(v):
+    return None if isinstance(v, float) and not math.isfinite(v) else v
+
+
+def write_rows(rows, out, fmt="csv"):
+    """Stream rows into a binary file object; returns rows written."""
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=False)
+    n = 0
+    try:
+        if fmt == "jsonl":
+            for row in rows:
+                text.write(json.dumps({k: _jsonable(v) for k, v in row.items()}, separators=(",", ":")))
+                text.write("\n")
+                n += 1
+        else:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(text, fieldnames=list(row), lineterminator="\n", extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow({k: "" if v is None else v for k, v in row.items()})
+                n += 1
+        text.flush()
+    finally:
+        text.detach()
+    return n
+
+
+def export(job_dirs, out_path, fmt="csv", compression=None, progress=None, **stages):
+    """
+    Export one or more jobs into out_path ("-" = stdout).
+    compression defaults to the suffix (.gz / .zst). stages are pipeline()
+    keyword arguments; with several jobs every row is labelled with its
+    customer and job_id. progress(job_index, job_count, rows_so_far), if
+    given, is called between jobs (e.g. to update a technician screen).
+    Returns {"jobs", "rows", "seconds"}.
+    """
+    job_dirs = [Path(j) for j in job_dirs]
+    if compression is None:
+        compression = SUFFIXES.get(Path(str(out_path)).suffix, "none")
+    multi = len(job_dirs) > 1
+
+    def rows():
+        n = 0
+        for i, job in enumerate(job_dirs):
+            if progress is not None:
+                progress(i, len(job_dirs), n)
+            labels = {"customer": job.parent.name, "job_id": job.name} if multi else None
+            for row in pipeline(job, labels=labels, **stages):
+                n += 1
+                yield row
+        if progress is not None:
+            progress(len(job_dirs), len(job_dirs), n)
+
+    t0 = time.perf_counter()
+    tmp = None if str(out_path) == "-" else Path(str(out_path) + ".tmp")
+    out = open_output(tmp or out_path, compression)
+    try:
+        n = write_rows(rows(), out, fmt)
+    except BaseException:
+        if tmp is not None:
+            out.close()
+            tmp.unlink(missing_ok=True)
+        raise
+    if out is not sys.stdout.buffer:
+        out.close()
+    if tmp is not None:
+        os.replace(tmp, out_path)
+    return {"jobs": len(job_dirs), "rows": n, "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def catalog_jobs(root, customer=None, since=None, until=None, min_state=None):
+    """Job directories selected through the survey catalog, oldest first."""
+    from survey_catalog import SurveyCatalog
+
+    rows = SurveyCatalog(root).jobs(customer, since, until, min_state)
+    return [Path(r["path"]) for r in reversed(rows)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Export survey readings (streaming, constant memory)")
+    ap.add_argument("out", help="output file, '-' for stdout (.gz / .zst pick the compression)")
+    ap.add_argument("jobs", nargs="*", help="job directories (default: select through the catalog)")
+    ap.add_argument("--root", default=str(SURVEYS_ROOT), help="surveys directory (catalog selection)")
+    ap.add_argument("--customer")
+    ap.add_argument("--state", choices=[s.name for s in AlertState], help="jobs that reached at least this state")
+    ap.add_argument("--from", dest="t0", type=float, help="start (unix s); also selects overlapping jobs")
+    ap.add_argument("--to", dest="t1", type=float, help="end (unix s); also selects overlapping jobs")
+    ap.add_argument("--format", choices=FORMATS, default="csv")
+    ap.add_argument("--compress", choices=COMPRESSIONS, default=None)
+    ap.add_argument("--resample", type=float, default=None, metavar="SECONDS")
+    ap.add_argument("--derived", action="store_true", help="fill derived metrics missing from legacy jobs")
+    ap.add_argument("--celsius", action="store_true", help="temperatures in °C")
+    ap.add_argument("--iso-time", action="store_true", help="add an ISO-8601 time column")
+    args = ap.parse_args()
+
+    jobs = args.jobs or catalog_jobs(args.root, args.customer, args.t0, args.t1, args.state)
+    if not jobs:
+        raise SystemExit("no jobs selected")
+    summary = export(
+        jobs, args.out, fmt=args.format, compression=args.compress,
+        progress=lambda i, n, rows: print(f"[{i}/{n}] {rows} rows", file=sys.stderr),
+        t0=args.t0, t1=args.t1, resample_s=args.resample, derived=args.derived,
+        temp_unit="C" if args.celsius else "F", iso_time=args.iso_time,
+    )
+    print(json.dumps(summary), file=sys.stderr)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+import csv
+import math
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+from scoring import AlertState
+from survey_writer import READINGS_FILE, READINGS_HEADER, SurveyWriter
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# =========================================================
+# Survey log layout (append-only binary, primary survey store)
+# =========================================================
+# <SURVEYS_ROOT>/<customer>/<job_id>/readings.hxl
+#   file header  "<8sHH"   magic, version, record size              (12 B)
+#   then blocks  "<4sII"   block magic, record count, crc32(payload) (12 B)
+#                + count fixed-width records (little-endian, 48 B each):
+#     timestamp f64 (s, sub-second) | co co2 pm25 voc temp humidity f32 |
+#     score u8 | state u8 | dew_point abs_humidity heat_index f32 |
+#     mold_risk i8 | pad
+# Missing floats are NaN, a missing score is 255 and a missing mold risk -1.
+# One block per writer batch: a power cut can only tear the last block, which
+# recover() finds by its length/checksum and truncates away.
+SURVEYS_ROOT = Path.home() / ".howlx_scout" / "surveys"
+LOG_FILE = "readings.hxl"
+LOG_MAGIC = b"HXSLOG\r\n"   # \r\n catches text-mode mangling
+LOG_VERSION = 1
+BLOCK_MAGIC = b"HXB1"
+
+FILE_HEADER_FMT = struct.Struct("<8sHH")
+BLOCK_HEADER_FMT = struct.Struct("<4sII")
+RECORD_FMT = struct.Struct("<dffffffBBfffbx")
+RECORD_SIZE = RECORD_FMT.size
+FILE_HEADER = FILE_HEADER_FMT.pack(LOG_MAGIC, LOG_VERSION, RECORD_SIZE)
+
+# Record fields in READINGS_COLUMNS order
+FLOAT_COLUMNS = ("co", "co2", "pm25", "voc", "temp", "humidity", "dew_point", "abs_humidity", "heat_index")
+SCORE_MISSING = 255
+MOLD_MISSING = -1
+
+if HAS_NUMPY:
+    RECORD_DTYPE = np.dtype([
+        ("timestamp", "<f8"),
+        ("co", "<f4"), ("co2", "<f4"), ("pm25", "<f4"), ("voc", "<f4"),
+        ("temp", "<f4"), ("humidity", "<f4"),
+        ("score", "u1"), ("state", "u1"),
+        ("dew_point", "<f4"), ("abs_humidity", "<f4"), ("heat_index", "<f4"),
+        ("mold_risk", "i1"), ("_pad", "V1"),
+    ])
+    assert RECORD_DTYPE.itemsize == RECORD_SIZE
+
+
+def _f(v):
+    return math.nan if v is None else v
+
+
+def pack_record(ts, co, co2, pm25, voc, temp, humidity, score, state,
+                dew_point=None, abs_humidity=None, heat_index=None, mold_risk=None):
+    """One fixed-width record; state is an AlertState value (int)."""
+    return RECORD_FMT.pack(
+        ts, _f(co), _f(co2), _f(pm25), _f(voc), _f(temp), _f(humidity),
+        SCORE_MISSING if score is None else int(score), state,
+        _f(dew_point), _f(abs_humidity), _f(heat_index),
+        MOLD_MISSING if mold_risk is None else int(mold_risk),
+    )
+
+
+def encode_record(d, score, state_name):
+    """SurveyWriter encode hook: a Sample plus its score/state -> record bytes."""
+    return pack_record(
+        d.ts, d.co, d.co2, d.pm25, d.voc, d.temp, d.humidity,
+        score, AlertState[state_name].value,
+        d.dew_point, d.abs_humidity, d.heat_index, d.mold_risk,
+    )
+
+
+def frame_block(records):
+    """SurveyWriter frame hook: one checksummed block per batch."""
+    payload = b"".join(records)
+    return BLOCK_HEADER_FMT.pack(BLOCK_MAGIC, len(records), zlib.crc32(payload)) + payload
+
+
+# ---------------------------
+# Block scan / recovery
+# ---------------------------
+def iter_blocks(buf, start=None):
+    """
+    Yield (payload_offset, count) for each valid block of a log image
+    (bytes/mmap), from the first block or from a block boundary `start`
+    (e.g. where a previous scan ended); stops at the first torn/corrupt block.
+    """
+    if len(buf) < FILE_HEADER_FMT.size:
+        return
+    magic, version, rec_size = FILE_HEADER_FMT.unpack_from(buf, 0)
+    if magic != LOG_MAGIC or version != LOG_VERSION or rec_size != RECORD_SIZE:
+        raise ValueError(f"not a survey log (v{LOG_VERSION}) image")
+
+    pos = FILE_HEADER_FMT.size if start is None else start
+    hsize = BLOCK_HEADER_FMT.size
+    with memoryview(buf) as mv:
+        while pos + hsize <= len(buf):
+            bmagic, count, crc = BLOCK_HEADER_FMT.unpack_from(buf, pos)
+            payload = pos + hsize
+            stop = payload + count * RECORD_SIZE
+            if bmagic != BLOCK_MAGIC or stop > len(buf) or zlib.crc32(mv[payload:stop]) != crc:
+                return
+            yield payload, count
+            pos = stop
+
+
+def scan_blocks(buf, start=None):
+    """
+    ([(payload_offset, count)], valid_end) for the blocks iter_blocks()
+    accepts; valid_end is the byte offset just past the last valid block.
+    """
+    if len(buf) < FILE_HEADER_FMT.size:
+        return [], 0
+    blocks = list(iter_blocks(buf, start))
+    if blocks:
+        o, n = blocks[-1]
+        return blocks, o + n * RECORD_SIZE
+    return blocks, FILE_HEADER_FMT.size if start is None else start
+
+
+def recover(path):
+    """
+    Make an existing log safe to append to: truncate anything after the last
+    valid block (torn write), or reset a file whose header never made it to
+    disk. Returns {"records", "truncated_bytes"} (SurveyWriter recover hook).
+    """
+    path = Path(path)
+    if not path.exists():
+        return {"records": 0, "truncated_bytes": 0}
+    with open(path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < FILE_HEADER_FMT.size:
+            blocks, end = [], 0  # torn file header: start over
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blocks, end = scan_blocks(mm)
+        if end < size:
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+    return {"records": sum(n for _, n in blocks), "truncated_bytes": size - end}
+
+
+def make_writer(**kw):
+    """SurveyWriter that appends to <job_dir>/readings.hxl."""
+    return SurveyWriter(
+        filename=LOG_FILE, header=FILE_HEADER, encode=encode_record,
+        frame=frame_block, recover=recover, **kw,
+    )
+
+
+# ---------------------------
+# Reading
+# ---------------------------
+def read_records(path):
+    """
+    All valid records of a log. With NumPy: one structured array (field per
+    column); without: a list of RECORD_FMT tuples. A torn tail is ignored.
+    """
+    data = Path(path).read_bytes()
+    blocks, _ = scan_blocks(data)
+    payload = b"".join(data[o:o + n * RECORD_SIZE] for o, n in blocks)
+    if HAS_NUMPY:
+        return np.frombuffer(payload, dtype=RECORD_DTYPE)
+    return list(RECORD_FMT.iter_unpack(payload))
+
+
+def iter_records(path):
+    """RECORD_FMT tuples, one block in memory at a time (mmap'd log)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for o, n in iter_blocks(mm):
+                yield from RECORD_FMT.iter_unpack(mm[o:o + n * RECORD_SIZE])
+
+
+def read_columns(path):
+    """{column: [float|nan]} for timestamp + every float column, plus score/state/mold_risk."""
+    recs = read_records(path)
+    if HAS_NUMPY:
+        cols = {name: recs[name].astype(np.float64).tolist() for name in ("timestamp",) + FLOAT_COLUMNS}
+        score = recs["score"].astype(np.float64)
+        score[recs["score"] == SCORE_MISSING] = np.nan
+        mold = recs["mold_risk"].astype(np.float64)
+        mold[recs["mold_risk"] == MOLD_MISSING] = np.nan
+        cols.update(score=score.tolist(), state=recs["state"].tolist(), mold_risk=mold.tolist())
+        return cols
+
+    names = ("timestamp", "co", "co2", "pm25", "voc", "temp", "humidity",
+             "score", "state", "dew_point", "abs_humidity", "heat_index", "mold_risk")
+    cols = {name: list(vals) for name, vals in zip(names, zip(*recs))} if recs else {n: [] for n in names}
+    cols["score"] = [math.nan if v == SCORE_MISSING else float(v) for v in cols["score"]]
+    cols["mold_risk"] = [math.nan if v == MOLD_MISSING else float(v) for v in cols["mold_risk"]]
+    return cols
+
+
+# =========================================================
+# CSV conversion (readings.csv layout, see survey_writer)
+# =========================================================
+# Cells are formatted the way encode_csv_row formats a live Sample, so a
+# converted log reads back byte-for-byte like the legacy CSV: whole-second
+# timestamps, "None" for a missing core reading or score, "" for a missing
+# VOC/derived value, ints for CO2 (and a whole VOC, the SGP40 index) and
+# str() of the float elsewhere ("21.0", not "21"). Floats come back as the
+# shortest decimal that round-trips through the f32 record, i.e. the value
+# the sensor code rounded to. The one known mismatch: a VOC proxy reading
+# that is exactly whole (e.g. clamped to 0.0) is printed as the index "0".
+_F32 = struct.Struct("<f")
+
+
+def _cell(v, missing="", whole=False):
+    """f32 record value -> str() of the value it was packed from."""
+    if math.isnan(v):
+        return missing
+    if whole and v == int(v):
+        return str(int(v))
+    for digits in range(1, 10):
+        x = float(f"{v:.{digits}g}")
+        if _F32.unpack(_F32.pack(x))[0] == v:
+            return str(x)
+    return str(v)
+
+
+def record_to_csv_cells(r):
+    """RECORD_FMT tuple -> readings.csv cells (strings, READINGS_COLUMNS order)."""
+    ts, co, co2, pm25, voc, temp, hum, score, state, dp, ah, hi, mold = r
+    return [
+        str(int(ts)), _cell(co, "None"), _cell(co2, "None", whole=True), _cell(pm25, "None"),
+        _cell(voc, whole=True), _cell(temp, "None"), _cell(hum, "None"),
+        "None" if score == SCORE_MISSING else str(score), AlertState(state).name,
+        _cell(dp), _cell(ah), _cell(hi), "" if mold == MOLD_MISSING else str(mold),
+    ]
+
+
+def iter_csv_rows(path):
+    """Log records as readings.csv cell lists (no header)."""
+    for r in iter_records(path):
+        yield record_to_csv_cells(r)
+
+
+def log_to_csv(log_path, csv_path):
+    """Write a log out in the readings.csv layout. Returns rows written."""
+    n = 0
+    tmp = Path(csv_path).with_suffix(".tmp")
+    with open(tmp, "w", newline="") as f:
+        f.write(READINGS_HEADER.decode())
+        w = csv.writer(f, lineterminator="\n")
+        for cells in iter_csv_rows(log_path):
+            w.writerow(cells)
+            n += 1
+    os.replace(tmp, csv_path)
+    return n
+
+
+def parse_cell(text, missing=None):
+    """CSV cell -> float, `missing` for '' / 'None' / garbage."""
+    if text in ("", "None", None):
+        return missing
+    try:
+        return float(text)
+    except ValueError:
+        return missing
+
+
+def iter_csv(path):
+    """
+    readings.csv reader shared by every tool: yields the header, then each
+    row as a cell list. Rows whose cell count differs from the header (a torn last
+    line) are skipped. An empty file yields nothing.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        n = len(header)
+        for cells in reader:
+            if len(cells) == n:
+                yield cells
+
+
+def load_csv_columns(path, names=None):
+    """
+    readings.csv -> (header, rows, {column: [float|nan]}).
+    names limits the parsed columns (default: every column in the header).
+    """
+    rows = iter_csv(path)
+    header = next(rows, None)
+    if header is None:
+        return [], [], {}
+    rows = list(rows)
+    idx = {name: i for i, name in enumerate(header)}
+    cols = {
+        name: [parse_cell(r[idx[name]], math.nan) for r in rows]
+        for name in (header if names is None else names)
+        if name in idx
+    }
+    return header, rows, cols
+
+
+def csv_to_log(csv_path, log_path, block_rows=256):
+    """
+    Convert a readings.csv (old 9-column or current layout) into a log.
+    Rows with a bad timestamp or state are skipped (torn lines never reach
+    here, iter_csv drops them). Returns (rows written, rows skipped).
+    """
+    written = skipped = 0
+    tmp = Path(log_path).with_suffix(".tmp")
+    rows = iter_csv(csv_path)
+    idx = {name: i for i, name in enumerate(next(rows, None) or [])}
+    with open(tmp, "wb") as out:
+        out.write(FILE_HEADER)
+        block = []
+        for row in rows:
+            vals = {name: row[i] for name, i in idx.items()}
+            ts = parse_cell(vals.get("timestamp"))
+            state = vals.get("state")
+            if ts is None or state not in AlertState.__members__:
+                skipped += 1
+                continue
+            score, mold = parse_cell(vals.get("score")), parse_cell(vals.get("mold_risk"))
+            block.append(pack_record(
+                ts, *(parse_cell(vals.get(c)) for c in ("co", "co2", "pm25", "voc", "temp", "humidity")),
+                None if score is None else int(score), AlertState[state].value,
+                *(parse_cell(vals.get(c)) for c in ("dew_point", "abs_humidity", "heat_index")),
+                None if mold is None else int(mold),
+            ))
+            if len(block) >= block_rows:
+                out.write(frame_block(block))
+                written += len(block)
+                block = []
+        if block:
+            out.write(frame_block(block))
+            written += len(block)
+    os.replace(tmp, log_path)
+    return written, skipped
+
+
+def bench(job_dir, repeat=3):
+    """Compare parsing a job's readings.csv vs its log (builds the log if missing)."""
+    job_dir = Path(job_dir)
+    csv_path, log_path = job_dir / READINGS_FILE, job_dir / LOG_FILE
+    if not log_path.exists():
+        csv_to_log(csv_path, log_path)
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    t_csv = best(lambda: load_csv_columns(csv_path))
+    t_log = best(lambda: read_records(log_path))
+    rows = len(read_records(log_path))
+    print(f"rows={rows}")
+    print(f"csv  {t_csv * 1000:9.1f} ms  ({os.path.getsize(csv_path)} B)")
+    print(f"log  {t_log * 1000:9.1f} ms  ({os.path.getsize(log_path)} B)  numpy={HAS_NUMPY}")
+    print(f"speedup x{t_csv / t_log:.1f}" if t_log else "speedup n/a")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="HowlX Scout survey log tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("to-csv", help=f"write {READINGS_FILE} from a job's {LOG_FILE}")
+    c.add_argument("job_dir")
+    c = sub.add_parser("from-csv", help=f"build {LOG_FILE} from a job's {READINGS_FILE}")
+    c.add_argument("job_dir")
+    c = sub.add_parser("check", help="recovery scan (truncates a torn tail)")
+    c.add_argument("job_dir")
+    c = sub.add_parser("bench", help="CSV vs log parse time")
+    c.add_argument("job_dir")
+    c.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    job = Path(args.job_dir)
+    if args.cmd == "to-csv":
+        print(f"{log_to_csv(job / LOG_FILE, job / READINGS_FILE)} rows")
+    elif args.cmd == "from-csv":
+        written, skipped = csv_to_log(job / READINGS_FILE, job / LOG_FILE)
+        print(f"{written} rows ({skipped} skipped)")
+    elif args.cmd == "check":
+        print(recover(job / LOG_FILE))
+    elif args.cmd == "bench":
+        bench(job, repeat=args.repeat)
@@ -0,0 +1,268 @@
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+
+# =========================================================
+# Survey readings layout (CSV)
+# =========================================================
+READINGS_FILE = "readings.csv"
+READINGS_COLUMNS = (
+    "timestamp", "co", "co2", "pm25", "voc", "temp", "humidity", "score", "state",
+    "dew_point", "abs_humidity", "heat_index", "mold_risk",
+)
+READINGS_HEADER = (",".join(READINGS_COLUMNS) + "\n").encode()
+
+
+def encode_csv_row(d, score, state_name):
+    """One readings.csv line (bytes) for a Sample plus its score/state."""
+    return (
+        f"{int(d.ts)},"
+        f"{d.co},{d.co2},{d.pm25},"
+        f"{'' if d.voc is None else d.voc},{d.temp},{d.humidity},"
+        f"{score},{state_name},"
+        + ",".join("" if v is None else str(v) for v in (d.dew_point, d.abs_humidity, d.heat_index, d.mold_risk))
+        + "\n"
+    ).encode()
+
+
+# =========================================================
+# Background writer (keeps the GUI tick free of file I/O)
+# =========================================================
+_STOP = object()
+
+
+class SurveyWriter:
+    """
+    Writes survey rows on its own thread through one open file handle.
+    - write() only enqueues (never blocks; rows are dropped and counted if
+      the queue is full, e.g. a stalled SD card)
+    - rows are encoded and written in batches: flush_rows queued rows or
+      flush_interval_s after the first unflushed one, whichever comes first
+    - fsync at most every fsync_interval_s (0 = every batch, None = never);
+      close() always fsyncs
+    - the record format is pluggable (filename / header / encode), CSV by default;
+      frame(rows) turns a batch of encoded rows into the bytes written (plain
+      concatenation by default), recover(path) repairs an existing file before
+      it is appended to and returns a dict reported by stats(), and
+      on_close(path) runs on the writer thread after a file is closed
+    - call(fn) runs other background file work (checkpoints) on the same thread
+    """
+
+    def __init__(
+        self, filename=READINGS_FILE, header=READINGS_HEADER, encode=encode_csv_row,
+        frame=b"".join, recover=None, on_close=None,
+        flush_rows=32, flush_interval_s=5.0, fsync_interval_s=30.0, max_queue=10000,
+    ):
+        self.filename = filename
+        self.header = header
+        self.encode = encode
+        self.frame = frame
+        self.recover = recover
+        self.on_close = on_close
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.fsync_interval_s = fsync_interval_s
+
+        self._q = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()  # guards the counters below
+
+        self._f = None
+        self.path = None
+        self._last_fsync = 0.0
+
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_batch = 0
+        self.last_flush_ms = 0.0
+        self.recovered = None
+
+    # ---------------------------
+    # Lifecycle (GUI thread)
+    # ---------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="survey-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Flush, close the file and end the thread."""
+        if self._thread is None:
+            return
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def open(self, job_dir):
+        """Switch to <job_dir>/<filename> (created with its header if new)."""
+        self._q.put(("open", Path(job_dir)))
+
+    def close(self, wait: bool = True, timeout: float = 2.0):
+        """Flush + fsync and close the current file; optionally wait for it."""
+        done = threading.Event()
+        self._q.put(("close", done))
+        if wait and self._thread is not None:
+            done.wait(timeout)
+
+    def call(self, fn):
+        """Run fn() on the writer thread (other background file I/O); False if dropped."""
+        try:
+            self._q.put_nowait(("call", fn))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def write(self, sample, score, state_name):
+        try:
+            self._q.put_nowait(("row", (sample, score, state_name)))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": None if self.path is None else str(self.path),
+                "queue_depth": self._q.qsize(),
+                "rows_written": self.rows_written,
+                "bytes_written": self.bytes_written,
+                "batches": self.batches,
+                "max_batch": self.max_batch,
+                "fsyncs": self.fsyncs,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "recovered": self.recovered,
+            }
+
+    # ---------------------------
+    # Writer thread
+    # ---------------------------
+    def _run(self):
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if not pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                self._flush(pending)
+                pending, deadline = [], None
+                continue
+
+            if item is _STOP:
+                self._flush(pending)
+                self._close()
+                return
+
+            kind, arg = item
+            if kind == "row":
+                if self._f is None:
+                    with self._lock:
+                        self.dropped += 1  # no survey file open
+                    continue
+                try:
+                    pending.append(self.encode(*arg))
+                except Exception as e:
+                    print("Survey writer encode error:", repr(e))
+                    with self._lock:
+                        self.errors += 1
+                    continue
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_s
+                if len(pending) >= self.flush_rows:
+                    self._flush(pending)
+                    pending, deadline = [], None
+            elif kind == "open":
+                self._flush(pending)
+                pending, deadline = [], None
+                self._close()
+                self._open(arg)
+            elif kind == "call":
+                try:
+                    arg()
+                except Exception as e:
+                    print("Survey writer call failed:", repr(e))
+                    with self._lock:
+                        self.errors += 1
+            elif kind == "close":
+                self._flush(pending)
+                pending, deadline = [], None
+                path = self.path if self._f is not None else None
+                self._close()
+                arg.set()
+                if self.on_close is not None and path is not None:
+                    try:
+                        self.on_close(path)
+                    except Exception as e:
+                        print("Survey writer on_close failed:", repr(e))
+
+    def _open(self, job_dir):
+        try:
+            job_dir.mkdir(parents=True, exist_ok=True)
+            path = job_dir / self.filename
+            recovered = self.recover(path) if self.recover is not None else None
+            f = open(path, "ab")
+            if f.tell() == 0 and self.header:
+                f.write(self.header)
+                f.flush()
+            self._f = f
+            with self._lock:
+                self.path = path
+                self.recovered = recovered
+        except Exception as e:
+            print("Survey writer open failed:", repr(e))
+            with self._lock:
+                self.errors += 1
+
+    def _flush(self, pending):
+        if not pending or self._f is None:
+            return
+        t0 = time.perf_counter()
+        data = self.frame(pending)
+        try:
+            self._f.write(data)
+            self._f.flush()
+            now = time.monotonic()
+            synced = False
+            if self.fsync_interval_s is not None and now - self._last_fsync >= self.fsync_interval_s:
+                os.fsync(self._f.fileno())
+                self._last_fsync = now
+                synced = True
+        except Exception as e:
+            print("Survey writer write failed:", repr(e))
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.rows_written += len(pending)
+            self.bytes_written += len(data)
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(pending))
+            self.fsyncs += synced
+            self.last_flush_ms = (time.perf_counter() - t0) * 1000
+
+    def _close(self):
+        if self._f is None:
+            return
+        try:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+            with self._lock:
+                self.fsyncs += 1
+        except Exception as e:
+            print("Survey writer close failed:", repr(e))
+            with self._lock:
+                self.errors += 1
+        self._f = None
@@ -1,7 +1,22 @@
+import time
+
 from PyQt5 import QtWidgets, QtCore, QtGui
 
 WIDTH, HEIGHT = 800, 480
 
+EVENT_UNITS = {"pm25": ("PM2.5", "µg/m³"), "voc": ("VOC", "")}
+MAX_EVENT_ROWS = 12
+PERCENTILE_UNITS = {
+    "pm25": ("PM2.5", "µg/m³"),
+    "co2": ("CO₂", "ppm"),
+    "voc": ("VOC", ""),
+    "co": ("CO", "ppm"),
+    "temp": ("Temp", "°F"),
+    "humidity": ("Humidity", "%"),
+    "score": ("Score", ""),
+}
+NO_PERCENTILES = "Percentiles are collected while a survey is running."
+
 
 class AnalysisTrends(QtWidgets.QWidget):
     def __init__(self, parent=None):
@@ -26,6 +41,22 @@ class AnalysisTrends(QtWidgets.QWidget):
         layout = QtWidgets.QVBoxLayout(content)
         layout.setSpacing(24)
 
+        # Spike events (fed by the dashboard via set_events)
+        self.events_label = QtWidgets.QLabel("No spike events detected yet.")
+        self.events_label.setWordWrap(True)
+        self.events_label.setStyleSheet(
+            "background:#151515; border-radius:16px; padding:16px; font-size:15px; color:#dddddd;"
+        )
+        layout.addWidget(self.events_label)
+
+        # Survey percentiles (fed by the dashboard via set_percentiles)
+        self.percentiles_label = QtWidgets.QLabel(NO_PERCENTILES)
+        self.percentiles_label.setWordWrap(True)
+        self.percentiles_label.setStyleSheet(
+            "background:#151515; border-radius:16px; padding:16px; font-size:15px; color:#dddddd;"
+        )
+        layout.addWidget(self.percentiles_label)
+
         layout.addWidget(self._severity_block(
             "TVOC",
             "Elevated chemical levels detected",
@@ -46,6 +77,40 @@ class AnalysisTrends(QtWidgets.QWidget):
         back.clicked.connect(self.hide)
         root.addWidget(back)
 
+    def set_events(self, events):
+        """Show recent SpikeEvents (newest first); cheap to call every tick."""
+        if not events:
+            self.events_label.setText("No spike events detected yet.")
+            return
+
+        lines = ["<b>Recent spike events</b>"]
+        for ev in sorted(events, key=lambda e: e.start_ts, reverse=True)[:MAX_EVENT_ROWS]:
+            name, unit = EVENT_UNITS.get(ev.metric, (ev.metric, ""))
+            kind = "level shift" if ev.plateau else "spike"
+            lines.append(
+                f"{time.strftime('%H:%M', time.localtime(ev.start_ts))} · {name} {kind} "
+                f"+{ev.magnitude:.0f}{' ' + unit if unit else ''} "
+                f"(peak {ev.peak:.0f}, {ev.duration_s / 60:.1f} min)"
+            )
+        self.events_label.setText("<br>".join(lines))
+
+    def set_percentiles(self, summaries):
+        """Show survey P50/P95/P99 per metric ({metric: QuantileSketch.summary()})."""
+        if not summaries:
+            self.percentiles_label.setText(NO_PERCENTILES)
+            return
+
+        lines = ["<b>Survey percentiles</b> (P50 / P95 / P99, ±1%)"]
+        for metric, (name, unit) in PERCENTILE_UNITS.items():
+            p = summaries.get(metric)
+            if not p:
+                continue
+            lines.append(
+                f"{name}: {p['p50']:g} / {p['p95']:g} / {p['p99']:g}{' ' + unit if unit else ''} "
+                f"(max {p['max']:g}, {p['count']} samples)"
+            )
+        self.percentiles_label.setText("<br>".join(lines))
+
     def _severity_block(self, title, finding, action):
         frame = QtWidgets.QFrame()
         frame.setStyleSheet("background:#151515; border-radius:16px;")
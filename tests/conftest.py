@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app is a set of flat modules at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeClock:
+    """Stand-in for time.monotonic / time.time that only moves when told to."""
+
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr("time.monotonic", c)
+    return c
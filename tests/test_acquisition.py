@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from acquisition import METRICS, AcquisitionEngine, Sample
+
+
+def test_latest_is_none_before_first_read():
+    assert AcquisitionEngine(lambda: Sample()).latest() is None
+
+
+def test_publish_stamps_increasing_seq():
+    eng = AcquisitionEngine(lambda: Sample())
+    eng.publish(Sample(co2=500))
+    eng.publish(Sample(co2=600))
+    d = eng.latest()
+    assert d.seq == 2
+    assert d.co2 == 600
+
+
+def test_tick_skips_none_and_counts_errors():
+    results = iter([None, RuntimeError("bus"), Sample(pm25=3.0)])
+
+    def read():
+        r = next(results)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    eng = AcquisitionEngine(read)
+    eng._tick()
+    assert eng.latest() is None
+    eng._tick()
+    assert eng.errors == 1
+    eng._tick()
+    assert eng.latest().pm25 == 3.0
+
+
+def test_worker_thread_publishes_until_stopped():
+    seen = threading.Event()
+
+    def read():
+        seen.set()
+        return Sample(co2=700)
+
+    eng = AcquisitionEngine(read, interval_s=0.01)
+    eng.start()
+    try:
+        assert seen.wait(2.0)
+    finally:
+        eng.stop()
+    assert eng.latest().co2 == 700
+
+
+def test_sample_state_lookup_by_metric():
+    states = tuple(range(len(METRICS)))
+    d = Sample(states=states)
+    for i, m in enumerate(METRICS):
+        assert d.state(m) == i
+    assert Sample().state(METRICS[0]) is None
+
+
+def test_sample_is_a_slim_immutable_record():
+    d = Sample(co2=650, temp=71.5)
+    assert not hasattr(d, "__dict__")
+    assert d.value("co2") == 650 and d.value("pm25") is None
+    with pytest.raises(AttributeError):
+        d.co2 = 700
+    assert d._replace(co2=700).co2 == 700 and d.co2 == 650
@@ -0,0 +1,37 @@
+from analytics import AnalysisCache
+
+
+def test_same_key_computes_once():
+    cache = AnalysisCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"status": "ok"}
+
+    a = cache.get("pm25", (1, "High"), compute)
+    b = cache.get("pm25", (1, "High"), compute)
+    assert a is b and len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_new_key_recomputes_and_replaces():
+    cache = AnalysisCache()
+    cache.get("co2", 1, lambda: "v1")
+    assert cache.get("co2", 2, lambda: "v2") == "v2"
+    assert cache.get("co2", 1, lambda: "v1 again") == "v1 again"  # only the newest is kept
+
+
+def test_metrics_are_cached_independently():
+    cache = AnalysisCache()
+    cache.get("co2", 1, lambda: "co2")
+    cache.get("voc", 1, lambda: "voc")
+    assert cache.get("co2", 1, lambda: "recomputed") == "co2"
+
+
+def test_clear_drops_entries_and_empty_stats():
+    cache = AnalysisCache()
+    assert cache.stats()["hit_rate"] is None
+    cache.get("co2", 1, lambda: "x")
+    cache.clear()
+    assert cache.get("co2", 1, lambda: "y") == "y"
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("serial")
+pytest.importorskip("sensirion_gas_index_algorithm")
+
+import main  # noqa: E402
+
+
+class FakeBME680:
+    """Mimics adafruit_bme680: every property read may trigger a new measurement."""
+
+    def __init__(self):
+        self._min_refresh_time = 0.0
+        self.readings = 0
+        self._vals = None
+
+    def _perform_reading(self):
+        self.readings += 1
+        n = self.readings
+        self._vals = (20.0 + n, 40.0 + n, 1000.0 + n, 50_000.0 + n)
+
+    def _prop(self, i):
+        if self._min_refresh_time != float("inf"):
+            self._perform_reading()
+        return self._vals[i]
+
+    temperature = property(lambda self: self._prop(0))
+    relative_humidity = property(lambda self: self._prop(1))
+    pressure = property(lambda self: self._prop(2))
+    gas = property(lambda self: self._prop(3))
+
+
+def test_one_measurement_per_sample():
+    dev = FakeBME680()
+    s = main.read_bme688_sample(dev)
+    assert dev.readings == 1
+    assert s == main.BMESample(21.0, 41.0, 1001.0, 50_001.0)
+    assert dev._min_refresh_time == 0.0  # driver setting restored
+
+
+class FakeSGP40:
+    def __init__(self):
+        self.args = None
+
+    def measure_raw(self, temperature, relative_humidity):
+        self.args = (temperature, relative_humidity)
+        return 30000
+
+
+class FakeVocAlgo:
+    def process(self, raw):
+        return 100
+
+
+@pytest.fixture
+def sgp(monkeypatch):
+    dev = FakeSGP40()
+    monkeypatch.setattr(main, "_sgp40", dev)
+    monkeypatch.setattr(main, "_voc_algo", FakeVocAlgo())
+    monkeypatch.setattr(main, "_voc_state_saved", float("inf"))  # no checkpoint writes
+    monkeypatch.setattr(main, "SENSOR_STATUS", dict(main.SENSOR_STATUS))
+    monkeypatch.setitem(main._latest, "voc", None)
+    return dev
+
+
+def test_sgp40_compensates_with_one_bme_record(monkeypatch, sgp):
+    monkeypatch.setitem(main._latest, "bme", main.BMESample(23.5, 61.0, 1000.0, 40_000.0))
+    main._sample_sgp40()
+    assert sgp.args == (23.5, 61.0)
+    assert main._latest["voc"] == 100
+
+
+def test_sgp40_uses_sensirion_defaults_without_a_bme_record(monkeypatch, sgp):
+    monkeypatch.setitem(main._latest, "bme", None)
+    main._sample_sgp40()
+    assert sgp.args == (25.0, 50.0)
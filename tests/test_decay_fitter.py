@@ -0,0 +1,93 @@
+import math
+
+import pytest
+
+from analytics import DecayFitter
+
+OUTDOOR = 420.0
+
+
+def decay(ach, c0=1400.0, t0=0.0, minutes=40, read_s=1.0, update_s=5.0):
+    """SCD41-style stream: a new integer ppm every update_s, re-read every read_s."""
+    out = []
+    held = None
+    for i in range(int(minutes * 60 / read_s)):
+        t = t0 + i * read_s
+        if held is None or i % int(update_s / read_s) == 0:
+            held = round(OUTDOOR + (c0 - OUTDOOR) * math.exp(-ach * t / 3600.0))
+        out.append((t, held))
+    return out
+
+
+def feed(fitter, readings):
+    return [f for f in (fitter.update(t, c) for t, c in readings) if f is not None]
+
+
+def rise(t0, minutes=10, c=1400):
+    return [(t0 + i, c) for i in range(minutes * 60)]
+
+
+def test_recovers_the_simulated_air_change_rate():
+    fitter = DecayFitter()
+    feed(fitter, rise(-600))
+    feed(fitter, decay(2.0))
+    live = fitter.current
+    assert live is not None and live.ach == pytest.approx(2.0, rel=0.02)
+    assert live.r2 > 0.99 and live.label == "High"
+
+
+def test_held_values_are_not_refitted():
+    fitter = DecayFitter()
+    feed(fitter, rise(-600))
+    feed(fitter, decay(2.0, minutes=20))
+    assert fitter._seg["n"] <= 20 * 60 / 5 + 1
+
+
+def test_rise_closes_and_records_the_segment():
+    fitter = DecayFitter()
+    feed(fitter, rise(-600))
+    readings = decay(2.0, minutes=30)
+    feed(fitter, readings)
+    t_end = readings[-1][0]
+    fits = feed(fitter, [(t_end + 1, readings[-1][1] + 100)])  # occupancy back
+    assert len(fits) == 1 and fits[0].ach == pytest.approx(2.0, rel=0.02)
+    assert fits[0].start_ts == 4.0            # the last reading of the flat peak
+    assert fitter.latest is fits[0] and fitter.since(4.0) == fits and fitter.since(5.0) == []
+
+
+def test_gap_closes_the_segment_even_on_a_held_value():
+    fitter = DecayFitter(max_gap_s=60.0)
+    feed(fitter, rise(-600))
+    readings = decay(2.0, minutes=30)
+    feed(fitter, readings)
+    t, c = readings[-1]
+    fits = feed(fitter, [(t + 120, c)])       # same ppm after a 2 min outage
+    assert len(fits) == 1
+    assert fitter._seg is None and fitter._peak == (t + 120, c)
+
+
+def test_short_segments_are_dropped():
+    fitter = DecayFitter(min_duration_s=15 * 60)
+    feed(fitter, rise(-600))
+    readings = decay(2.0, minutes=10)
+    feed(fitter, readings)
+    assert fitter.current is None
+    assert feed(fitter, [(readings[-1][0] + 1, 1500)]) == []
+    assert not fitter.estimates and fitter.latest is None
+
+
+def test_poor_fit_is_dropped():
+    fitter = DecayFitter(min_r2=0.8, rise_tol=400.0)
+    feed(fitter, rise(-600))
+    # falls, then wanders around without decaying
+    noisy = [(i * 5.0, 1300 - 50 * (i % 7)) for i in range(400)]
+    feed(fitter, noisy)
+    assert feed(fitter, [(2001.0, 2000)]) == []
+    assert not fitter.estimates
+
+
+def test_low_excess_peak_never_opens():
+    fitter = DecayFitter(min_excess=200.0)
+    feed(fitter, rise(-600, c=580))
+    feed(fitter, decay(2.0, c0=580))
+    assert fitter._seg is None and not fitter.estimates
@@ -0,0 +1,61 @@
+import pytest
+
+from acquisition import Sample
+from derived import (
+    DERIVED_METRICS, absolute_humidity, derive, derived_values, dew_point_f,
+    heat_index_f, mold_risk, mold_risk_label,
+)
+
+
+def test_dew_point_reference_values():
+    assert dew_point_f(77.0, 50.0) == pytest.approx(56.9, abs=0.1)   # 25 °C, 50 % -> 13.85 °C
+    assert dew_point_f(68.0, 100.0) == pytest.approx(68.0, abs=1e-9)  # saturated air
+    assert dew_point_f(68.0, 0.0) is None
+
+
+def test_absolute_humidity_reference_value():
+    assert absolute_humidity(77.0, 50.0) == pytest.approx(11.5, abs=0.1)
+    assert absolute_humidity(77.0, 0.0) == 0.0
+
+
+@pytest.mark.parametrize("temp, rh, expected", [
+    (70.0, 50.0, 69.05),  # simple Steadman form below ~80 °F
+    (90.0, 70.0, 106.0),  # NWS heat index chart
+    (85.0, 90.0, 102.0),  # NWS chart, high-humidity adjustment applies
+])
+def test_heat_index_matches_the_nws_chart(temp, rh, expected):
+    assert heat_index_f(temp, rh) == pytest.approx(expected, abs=0.5)
+
+
+def test_heat_index_low_humidity_adjustment():
+    t, r = 96.0, 10.0
+    rothfusz = (
+        -42.379 + 2.04901523 * t + 10.14333127 * r
+        - 0.22475541 * t * r - 0.00683783 * t * t - 0.05481717 * r * r
+        + 0.00122874 * t * t * r + 0.00085282 * t * r * r
+        - 0.00000199 * t * t * r * r
+    )
+    assert heat_index_f(t, r) == pytest.approx(rothfusz - 0.75 * (16 / 17) ** 0.5)
+
+
+def test_mold_risk_edges():
+    assert [mold_risk(70.0, rh) for rh in (59.9, 60.0, 69.9, 70.0)] == [0, 1, 1, 2]
+    assert mold_risk(40.9, 90.0) == 0 and mold_risk(41.0, 90.0) == 2
+    assert mold_risk(104.0, 90.0) == 2 and mold_risk(104.1, 90.0) == 0
+    assert mold_risk_label(2) == "High" and mold_risk_label(None) is None
+
+
+def test_derived_values_are_rounded_and_none_without_inputs():
+    d = derived_values(77.0, 50.0)
+    assert set(d) == set(DERIVED_METRICS)
+    assert d["dew_point"] == round(d["dew_point"], 1)
+    assert d["abs_humidity"] == round(d["abs_humidity"], 2)
+    assert derived_values(None, 50.0) == dict.fromkeys(DERIVED_METRICS)
+    assert derived_values(77.0, None) == dict.fromkeys(DERIVED_METRICS)
+
+
+def test_derive_fills_the_sample():
+    s = derive(Sample(temp=77.0, humidity=65.0, co2=600))
+    assert s.co2 == 600
+    assert s.mold_risk == 1 and s.dew_point is not None and s.heat_index is not None
+    assert derive(Sample(co2=600)).dew_point is None
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from exposure import ExposureEngine, WindowIntegral
+
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % 3600
+
+
+def test_window_integral_splits_across_buckets():
+    w = WindowIntegral(600, bucket_s=60)
+    w.add(T0 + 30, T0 + 150, 2.0)            # spans three 1-min buckets
+    assert w.total_area == pytest.approx(240.0)
+    assert w.total_cov == pytest.approx(120.0)
+    assert w.mean == 2.0
+    assert w.twa == pytest.approx(240.0 / 600)
+
+
+def test_window_integral_evicts_old_buckets():
+    w = WindowIntegral(600, bucket_s=60)
+    w.add(T0, T0 + 60, 5.0)
+    w.expire(T0 + 600)                        # first bucket is now 10 buckets back
+    assert w.total_area == 0.0 and w.mean is None
+    w.add(T0, T0 + 60, 5.0)                   # too old to land
+    assert w.total_area == 0.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_window_integral_matches_brute_force(seed):
+    rng = random.Random(seed)
+    w = WindowIntegral(1800, bucket_s=60)
+    spans, t = [], T0
+    for _ in range(500):
+        dt = rng.uniform(0.5, 20)
+        v = rng.uniform(0, 50)
+        w.add(t, t + dt, v)
+        spans.append((t, t + dt, v))
+        t += dt + rng.choice([0, 0, 30])      # occasional gaps
+    w.expire(t)
+    lo = (int(t // 60) - w.n + 1) * 60        # oldest bucket still in the window
+    kept = [(max(a, lo), b, v) for a, b, v in spans if b > lo]
+    area = sum(v * (b - a) for a, b, v in kept)
+    cov = sum(b - a for a, b, v in kept)
+    assert w.total_area == pytest.approx(area)
+    assert w.total_cov == pytest.approx(cov)
+
+
+def test_window_state_round_trip():
+    w = WindowIntegral(600, bucket_s=60)
+    w.add(T0, T0 + 250, 3.0)
+    w2 = WindowIntegral(600, bucket_s=60)
+    w2.load_state(w.to_state())
+    assert (w2.head, w2.total_area, w2.total_cov) == (w.head, w.total_area, w.total_cov)
+    w2.add(T0 + 250, T0 + 300, 3.0)           # continues in place after a reload
+    assert w2.total_cov == pytest.approx(300.0)
+
+
+def feed(engine, values, step=10.0, t0=T0):
+    for i, v in enumerate(values):
+        engine.add(t0 + i * step, v)
+
+
+def test_values_are_held_until_the_next_sample():
+    e = ExposureEngine()
+    feed(e, [{"co": 10.0}, {"co": 0.0}, {"co": 0.0}])
+    co = e.snapshot()["co_8h"]
+    assert co["mean"] == 5.0                  # 10 s at 10 ppm, 10 s at 0
+    assert co["twa"] == pytest.approx(100.0 / (8 * 3600), abs=0.01)
+
+
+def test_gaps_and_missing_values_are_not_counted():
+    e = ExposureEngine(max_gap_s=90.0)
+    e.add(T0, {"pm25": 20.0})
+    e.add(T0 + 300, {"pm25": 20.0})           # 5 min gap: dropped
+    e.add(T0 + 310, {"pm25": None})           # 10 s counted, then no value
+    e.add(T0 + 320, {"pm25": 40.0})           # nothing held across the None
+    e.add(T0 + 330, {"pm25": 40.0})
+    w = e.windows["pm25_24h"]
+    assert w.total_cov == pytest.approx(20.0)
+    assert w.mean == pytest.approx(30.0)
+
+
+def test_co2_minutes_above_limits():
+    e = ExposureEngine()
+    feed(e, [{"co2": 1100}] * 60 + [{"co2": 1300}] * 31)  # 10 min, then 5 min
+    snap = e.snapshot()
+    assert snap["co2_over_1000_24h"]["minutes"] == 15.0
+    assert snap["co2_over_1200_24h"]["minutes"] == 5.0
+
+
+def test_value_equal_to_the_limit_is_not_above_it():
+    e = ExposureEngine()
+    feed(e, [{"co2": 1000}] * 10)
+    assert e.snapshot()["co2_over_1000_24h"]["minutes"] == 0.0
+
+
+def test_session_totals_track_only_the_session():
+    e = ExposureEngine()
+    feed(e, [{"pm25": 100.0}] * 10)
+    e.start_session(T0 + 90)
+    feed(e, [{"pm25": 10.0, "co2": 1250}] * 13, t0=T0 + 90)
+    s = e.stop_session()
+    assert s["duration_min"] == 2.0
+    assert s["pm25_mean"] == 10.0             # the 100 µg/m³ before the start is not included
+    assert s["co2_minutes_over_1200"] == 2.0
+    assert s["max"] == {"pm25": 10.0, "co2": 1250.0}
+    assert e.session is None and e.session_summary() is None
+
+
+def test_engine_state_round_trip(tmp_path):
+    e = ExposureEngine()
+    feed(e, [{"co": 4.0, "co2": 1300}] * 30)
+    path = tmp_path / "exposure.json"
+    assert e.save(path)
+    e2 = ExposureEngine()
+    assert e2.load(path)
+    assert e2.snapshot() == e.snapshot()
+    e.add(T0 + 300, {"co": 4.0})
+    e2.add(T0 + 300, {"co": 4.0})             # held value resumes across the reload
+    assert e2.snapshot() == e.snapshot()
+
+
+def test_mismatched_or_missing_state_is_ignored(tmp_path):
+    e = ExposureEngine()
+    assert not e.load(tmp_path / "missing.json")
+    assert not e.load_state({"version": 999})
+    assert not ExposureEngine(bucket_s=30).load_state(ExposureEngine().to_state())
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from i2c_bus import (
+    PRIORITY_DIAG, PRIORITY_MEASURE, PRIORITY_SAFETY, ArbitratedI2C, BusArbiter, Histogram,
+)
+
+
+def _waiter(bus, device, priority, order, deadline_s=5.0):
+    def run():
+        with bus.context(device, priority, deadline_s):
+            bus.acquire()
+            order.append(device)
+            bus.release()
+    t = threading.Thread(target=run)
+    t.start()
+    return t
+
+
+def _wait_queued(bus, n):
+    end = time.monotonic() + 2.0
+    while len(bus._waiters) < n:
+        assert time.monotonic() < end, "waiter never queued"
+        time.sleep(0.001)
+
+
+def test_waiters_are_served_by_priority_then_fifo():
+    bus = BusArbiter()
+    order = []
+    with bus.context("holder", PRIORITY_MEASURE):
+        bus.acquire()
+        threads = []
+        for i, (dev, prio) in enumerate((
+            ("diag", PRIORITY_DIAG), ("bme688", PRIORITY_MEASURE),
+            ("co", PRIORITY_SAFETY), ("scd41", PRIORITY_MEASURE),
+        )):
+            threads.append(_waiter(bus, dev, prio, order))
+            _wait_queued(bus, i + 1)
+        bus.release()
+    for t in threads:
+        t.join(2.0)
+    assert order == ["co", "bme688", "scd41", "diag"]
+
+
+def test_waiter_past_its_deadline_times_out_without_blocking_others():
+    bus = BusArbiter()
+    errors = []
+
+    def late():
+        with bus.context("sgp40", PRIORITY_MEASURE, deadline_s=0.05):
+            try:
+                bus.acquire()
+            except TimeoutError as e:
+                errors.append(e)
+
+    with bus.context("holder", PRIORITY_MEASURE):
+        bus.acquire()
+        t = threading.Thread(target=late)
+        t.start()
+        t.join(2.0)
+        bus.release()
+
+    assert len(errors) == 1
+    assert bus.stats()["sgp40"]["timeouts"] == 1
+    assert bus._waiters == []
+    with bus.context("scd41"):
+        bus.acquire()  # the timed-out entry is gone from the queue
+        bus.release()
+
+
+def test_acquire_is_reentrant_per_thread():
+    bus = BusArbiter()
+    with bus.context("scd41"):
+        bus.acquire()
+        bus.acquire()
+        bus.release()
+        assert bus._owner is not None
+        bus.release()
+    assert bus._owner is None
+
+
+def test_release_from_a_non_owner_is_ignored():
+    bus = BusArbiter()
+    with bus.context("scd41"):
+        bus.acquire()
+    t = threading.Thread(target=bus.release)
+    t.start()
+    t.join()
+    assert bus._owner == threading.get_ident()
+    bus.release()
+
+
+def test_hold_time_and_overruns_are_recorded_per_device():
+    bus = BusArbiter(hold_budget_s=0.001)
+    with bus.context("bme688"):
+        bus.acquire()
+        time.sleep(0.005)
+        bus.release()
+    st = bus.stats()["bme688"]
+    assert st["overruns"] == 1
+    assert st["hold"]["n"] == 1 and st["wait"]["n"] == 1
+    assert bus.busy_fraction(1.0) > 0
+
+
+def test_histogram_percentiles_use_bucket_edges():
+    h = Histogram()
+    assert h.percentile_ms(50) is None
+    for _ in range(90):
+        h.add(0.0004)   # 0.4 ms -> 0.5 ms bucket
+    for _ in range(10):
+        h.add(0.02)     # 20 ms -> 25 ms bucket
+    assert h.percentile_ms(50) == 0.5
+    assert h.percentile_ms(95) == 25
+    h.add(5.0)          # past the last edge: reported as the max
+    assert h.percentile_ms(100) == 5000.0
+
+
+def test_histogram_edge_value_lands_in_its_own_bucket():
+    h = Histogram()
+    h.add(0.001)  # exactly 1 ms
+    assert h.counts[Histogram.EDGES_MS.index(1)] == 1
+
+
+class FakeI2C:
+    def __init__(self, lockable=True):
+        self.lockable = lockable
+        self.locked = False
+
+    def try_lock(self):
+        if not self.lockable or self.locked:
+            return False
+        self.locked = True
+        return True
+
+    def unlock(self):
+        self.locked = False
+
+    def scan(self):
+        return [0x62]
+
+
+def test_arbitrated_i2c_locks_through_the_arbiter():
+    bus = BusArbiter()
+    raw = FakeI2C()
+    i2c = ArbitratedI2C(raw, bus)
+    with bus.context("scd41"):
+        assert i2c.try_lock()
+        assert raw.locked and bus._owner is not None
+        i2c.unlock()
+    assert not raw.locked and bus._owner is None
+    assert i2c.scan() == [0x62]  # everything else passes through
+
+
+def test_raw_lock_held_outside_the_arbiter_times_out_and_releases():
+    bus = BusArbiter()
+    i2c = ArbitratedI2C(FakeI2C(lockable=False), bus)
+    with bus.context("scd41"):
+        with pytest.raises(TimeoutError):
+            i2c.try_lock()
+    assert bus._owner is None
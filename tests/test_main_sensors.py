@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("serial")
+pytest.importorskip("sensirion_gas_index_algorithm")
+
+import main  # noqa: E402
+from pm25_uart import PMFrame  # noqa: E402
+
+
+class FakeReader:
+    """PlantowerReader stand-in: frames are appended by the test."""
+
+    def __init__(self, *args, **kw):
+        self.frames = []
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+    def push(self, pm25):
+        seq = len(self.frames) + 1
+        self.frames.append(PMFrame(seq, 0.0, 0.0, {"pm25 standard": pm25}))
+
+    def since(self, seq):
+        return [f for f in self.frames if f.seq > seq]
+
+    def latest(self):
+        return self.frames[-1] if self.frames else None
+
+
+@pytest.fixture
+def pm_reader(monkeypatch):
+    monkeypatch.setattr(main, "PlantowerReader", FakeReader, raising=False)
+    monkeypatch.setattr(main, "_pm25", None)
+    monkeypatch.setattr(main, "_pm25_seen_seq", 0)
+    monkeypatch.setitem(main._latest, "pm25", None)
+    assert main._init_pm25()
+    return main._pm25
+
+
+def test_reconnect_resets_the_frame_cursor(pm_reader):
+    for _ in range(40):
+        pm_reader.push(10.0)
+    main._sample_pm25()
+    assert main._pm25_seen_seq == 40
+
+    # Supervisor re-probe: the new reader numbers its frames from 1 again
+    assert main._init_pm25()
+    assert pm_reader.stopped
+    assert main._pm25_seen_seq == 0
+    assert main._latest["pm25"] is None  # the pre-reconnect value is not scored
+
+    main._pm25.push(80.0)
+    main._sample_pm25()
+    assert main._latest["pm25"] == 80.0
+    assert main._pm25_seen_seq == 1
+
+
+def test_sample_folds_every_new_frame(pm_reader):
+    for v in (10.0, 20.0, 30.0):
+        pm_reader.push(v)
+    main._sample_pm25()
+    assert main._latest["pm25"] == 20.0
+    main._sample_pm25()
+    assert main._latest["pm25"] == 20.0  # nothing new: value held
+
+
+def test_no_mock_data_when_nothing_is_up(monkeypatch):
+    for name in ("_scd41", "_bme688", "_pm25"):
+        monkeypatch.setattr(main, name, None)
+    d = main.read_sensors()
+    assert (d.co, d.co2, d.pm25, d.voc, d.temp, d.humidity) == (None,) * 6
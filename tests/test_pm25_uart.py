@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip("serial")
+
+from pm25_uart import FRAME_FIELDS, FRAME_LEN, PlantowerReader, PMFrame, parse_frame  # noqa: E402
+
+
+def make_frame(pm25=12, fill=1):
+    words = [fill] * len(FRAME_FIELDS) + [0]  # 13th word is reserved
+    words[FRAME_FIELDS.index("pm25 standard")] = pm25
+    body = b"\x42\x4d" + (FRAME_LEN - 4).to_bytes(2, "big") + b"".join(w.to_bytes(2, "big") for w in words)
+    return body + (sum(body) & 0xFFFF).to_bytes(2, "big")
+
+
+class FakeSerial:
+    def __init__(self, data):
+        self.data = bytearray(data)
+
+    def read(self, n):
+        out = bytes(self.data[:n])
+        del self.data[:n]
+        return out
+
+
+def read_all(reader, data):
+    """Drive the reader's framing + validation the way its thread does."""
+    reader._ser = FakeSerial(data)
+    out = []
+    while reader._ser.data:
+        buf = reader._read_frame()
+        if buf is None:
+            continue
+        parsed = parse_frame(buf)
+        if parsed is None:
+            reader.checksum_errors += 1
+        else:
+            out.append(parsed)
+    return out
+
+
+def test_parse_frame_decodes_fields():
+    data = parse_frame(make_frame(pm25=37, fill=5))
+    assert data["pm25 standard"] == 37
+    assert data["pm10 standard"] == 5
+    assert set(data) == set(FRAME_FIELDS)
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda f: f[:-1],                          # short
+    lambda f: b"\x42\x4e" + f[2:],             # bad header
+    lambda f: f[:2] + b"\x00\x1d" + f[4:],     # bad length word
+    lambda f: f[:10] + bytes([f[10] ^ 1]) + f[11:],  # bit flip -> checksum
+])
+def test_parse_frame_rejects_bad_frames(mangle):
+    assert parse_frame(mangle(make_frame())) is None
+
+
+def test_reader_resyncs_past_garbage():
+    r = PlantowerReader()
+    frames = read_all(r, b"\x00\xff\x4d" + make_frame(pm25=8) + b"\x13" + make_frame(pm25=9))
+    assert [f["pm25 standard"] for f in frames] == [8, 9]
+    assert r.resync_bytes == 4
+
+
+def test_reader_resyncs_on_repeated_start_byte():
+    r = PlantowerReader()
+    frames = read_all(r, b"\x42" + make_frame(pm25=21))
+    assert [f["pm25 standard"] for f in frames] == [21]
+    assert r.resync_bytes == 1
+
+
+def test_reader_counts_checksum_errors_and_recovers():
+    bad = bytearray(make_frame(pm25=1))
+    bad[12] ^= 0xFF
+    r = PlantowerReader()
+    frames = read_all(r, bytes(bad) + make_frame(pm25=2))
+    assert [f["pm25 standard"] for f in frames] == [2]
+    assert r.checksum_errors == 1
+
+
+def test_truncated_tail_yields_nothing():
+    r = PlantowerReader()
+    assert read_all(r, make_frame()[:20]) == []
+
+
+def test_since_returns_newer_frames_oldest_first():
+    r = PlantowerReader(maxlen=5)
+    for seq in range(1, 8):
+        r.frames.append(PMFrame(seq, 0.0, 0.0, {}))
+    assert [f.seq for f in r.since(4)] == [5, 6, 7]
+    assert [f.seq for f in r.since(0)] == [3, 4, 5, 6, 7]  # only what is still buffered
+    assert r.since(7) == []
+    assert r.latest().seq == 7
+
+
+def test_new_reader_numbers_frames_from_one():
+    """A reconnect replaces the reader; callers must reset their seq cursor."""
+    old, new = PlantowerReader(), PlantowerReader()
+    for seq in range(1, 51):
+        old.frames.append(PMFrame(seq, 0.0, 0.0, {}))
+    new.frames.append(PMFrame(1, 0.0, 0.0, {}))
+    cursor = old.latest().seq
+    assert new.since(cursor) == []   # a stale cursor hides fresh frames
+    assert [f.seq for f in new.since(0)] == [1]
@@ -0,0 +1,90 @@
+import json
+import random
+
+import pytest
+
+from analytics import QuantileSketch
+
+QS = (0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0)
+
+
+def true_quantile(sorted_values, q):
+    """The sample the sketch's rank rule points at: index floor(q * (n - 1))."""
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+
+def check_bound(sk, values, alpha):
+    xs = sorted(values)
+    for q in QS:
+        est, exact = sk.quantile(q), true_quantile(xs, q)
+        assert abs(est - exact) <= alpha * abs(exact) + 1e-12, (q, est, exact)
+
+
+@pytest.mark.parametrize("alpha", (0.01, 0.05))
+@pytest.mark.parametrize("seed", range(3))
+def test_relative_error_bound_on_skewed_data(alpha, seed):
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(2.0, 1.5) for _ in range(5000)]  # PM-like tail
+    sk = QuantileSketch(alpha=alpha)
+    for v in values:
+        sk.add(v)
+    check_bound(sk, values, alpha)
+
+
+def test_relative_error_bound_with_zero_and_negatives():
+    rng = random.Random(7)
+    values = [rng.uniform(-50, 50) for _ in range(2000)] + [0.0] * 100
+    sk = QuantileSketch(alpha=0.01)
+    for v in values:
+        sk.add(v)
+    check_bound(sk, values, 0.01)
+
+
+def test_merge_is_exact():
+    rng = random.Random(1)
+    a, b, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i in range(3000):
+        v = rng.expovariate(0.05)
+        (a if i % 2 else b).add(v)
+        whole.add(v)
+    a.merge(b)
+    assert a.quantiles(QS) == whole.quantiles(QS)
+    assert (a.count, a.min, a.max) == (whole.count, whole.min, whole.max)
+    assert a.sum == pytest.approx(whole.sum)
+
+
+def test_merge_rejects_a_different_alpha():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_state_round_trips_through_json():
+    sk = QuantileSketch()
+    for v in (0.0, -3.0, 1.0, 12.5, 400.0):
+        sk.add(v)
+    back = QuantileSketch.from_state(json.loads(json.dumps(sk.to_state())))
+    assert back.quantiles(QS) == sk.quantiles(QS)
+    assert back.summary() == sk.summary()
+
+
+def test_bins_are_capped():
+    sk = QuantileSketch(alpha=0.01, max_bins=50)
+    for i in range(1, 10_000):
+        sk.add(i * 1.0)
+    assert len(sk._pos) <= 50
+    assert sk.count == 9999 and sk.min == 1.0
+    # smallest bins are folded together; the upper quantiles keep the bound
+    assert sk.quantile(0.99) == pytest.approx(9899, rel=0.01)
+
+
+def test_empty_and_missing_values():
+    sk = QuantileSketch()
+    sk.add(None)
+    sk.add(float("nan"))
+    assert len(sk) == 0 and sk.quantile(0.5) is None and sk.mean is None
+    sk.add(5.0, n=3)
+    assert sk.count == 3 and sk.quantile(0.5) == pytest.approx(5.0, rel=0.01)
+    with pytest.raises(ValueError):
+        sk.quantile(1.5)
+    with pytest.raises(ValueError):
+        QuantileSketch(alpha=0)
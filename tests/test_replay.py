@@ -0,0 +1,89 @@
+from enum import Enum
+
+import pytest
+
+from acquisition import METRICS, Sample
+from replay import SampleRecorder, SampleReplayer, load_recording
+
+
+class State(Enum):
+    WARMUP = 1
+    READY = 2
+
+
+def record(path, n=4, status=None):
+    rec = SampleRecorder(str(path), status_fn=status)
+    for i in range(n):
+        rec.record(Sample(mono=10.0 + i, ts=1000.0 + i, co2=500 + i, states=(State.READY,) * len(METRICS)))
+    rec.close()
+
+
+def test_round_trip_keeps_values_and_states(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    record(path)
+    samples = list(SampleReplayer(str(path), state_cls=State))
+    assert [s.co2 for s in samples] == [500, 501, 502, 503]
+    assert [s.ts for s in samples] == [1000.0, 1001.0, 1002.0, 1003.0]
+    assert samples[0].states == (State.READY,) * len(METRICS)
+
+
+def test_status_transitions_are_recorded_once_and_replayed(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    record(path, status=lambda: {"scd41": (State.READY, 990.0)})
+    seen = []
+    list(SampleReplayer(str(path), state_cls=State, status_cb=lambda *a: seen.append(a)))
+    assert seen == [("scd41", State.READY, 10.0)]
+
+
+def test_recording_appends_without_a_second_header(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    record(path, n=2)
+    record(path, n=2)
+    assert sum(1 for d in load_recording(str(path)) if d.get("k") == "s") == 4
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    record(path, n=3)
+    with open(path, "a") as f:
+        f.write('{"k":"s","mono":13.0,"ts":10')
+    assert len(list(load_recording(str(path)))) == 3
+
+
+def test_not_a_recording_is_rejected(tmp_path):
+    path = tmp_path / "other.jsonl"
+    path.write_text('{"format": "something-else"}\n')
+    with pytest.raises(ValueError):
+        list(load_recording(str(path)))
+
+
+def test_each_pass_is_shifted_so_time_never_runs_back(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    record(path)
+    rp = SampleReplayer(str(path))
+    ts = [s.ts for _ in range(3) for s in rp]
+    assert ts == [1000.0 + i for i in range(12)]
+
+
+def test_realtime_playback_honors_spacing_and_loops(tmp_path, clock):
+    path = tmp_path / "rec.jsonl"
+    record(path, n=2)
+    rp = SampleReplayer(str(path), speed=2.0, loop=True)
+
+    first = rp()
+    assert first.ts == 1000.0
+    assert rp() is None                 # next one is due 0.5 s later at 2x
+    assert rp.next_due() == clock.t + 0.5
+    clock.advance(0.5)
+    assert rp().ts == 1001.0
+    assert rp().ts == 1002.0            # looped: pass 2, shifted by span + interval
+    assert not rp.done
+
+
+def test_playback_without_loop_finishes(tmp_path, clock):
+    path = tmp_path / "rec.jsonl"
+    record(path, n=1)
+    rp = SampleReplayer(str(path))
+    assert rp().co2 == 500
+    assert rp.done and rp() is None
+    assert rp.next_due() == float("inf")
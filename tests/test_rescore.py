@@ -0,0 +1,138 @@
+import itertools
+import random
+
+import pytest
+
+from acquisition import Sample
+from rescore import load_job, rescore_all, rescore_job
+from scoring import AlertState, score_reading
+from survey_log import LOG_FILE, csv_to_log, log_to_csv
+from survey_writer import READINGS_FILE, READINGS_HEADER, encode_csv_row
+
+
+def legacy_score(co, pm, co2, voc, voc_scored=True):
+    """The original main.evaluate_readings() ladders, spelled out."""
+    has_co, has_pm, has_co2, has_voc = (v is not None for v in (co, pm, co2, voc))
+    co, pm, co2, voc = (0.0 if co is None else co, 0.0 if pm is None else pm,
+                        450 if co2 is None else co2, 0.0 if voc is None else voc)
+    if has_co and co >= 35:
+        state = AlertState.CRITICAL
+    elif (has_pm and pm > 35) or (has_co2 and co2 > 1200) or (has_voc and voc >= 150) or (has_co and co >= 9):
+        state = AlertState.WARNING
+    else:
+        state = AlertState.NORMAL
+    score = 100
+    if has_pm:
+        score += -25 if pm > 35 else -10 if pm > 12 else 0
+    if has_co2:
+        score += -20 if co2 > 1200 else -10 if co2 > 800 else 0
+    if has_voc and voc_scored:
+        score += -20 if voc > 250 else -10 if voc > 150 else 0
+    if has_co:
+        score += -60 if co >= 35 else -20 if co >= 9 else 0
+    if state == AlertState.CRITICAL:
+        score = min(score, 30)
+    return max(min(int(score), 100), 0), state
+
+
+EDGES = {
+    "co": (None, 0.0, 8.9, 9.0, 9.1, 34.9, 35.0, 35.1, 80.0),
+    "pm25": (None, 0.0, 12.0, 12.1, 35.0, 35.1, 55.0, 55.1),
+    "co2": (None, 450, 800, 801, 1200, 1201),
+    "voc": (None, 0.0, 149.0, 150.0, 151.0, 250.0, 251.0),
+}
+
+
+@pytest.mark.parametrize("voc_scored", (True, False))
+def test_score_reading_matches_the_legacy_ladders(voc_scored):
+    for co, pm, co2, voc in itertools.product(*EDGES.values()):
+        assert score_reading(co, pm, co2, voc, voc_scored) == legacy_score(co, pm, co2, voc, voc_scored)
+
+
+def test_critical_score_is_capped():
+    assert score_reading(co=35.0) == (30, AlertState.CRITICAL)
+    assert score_reading(co=35.0, pm25=80.0, co2=2000, voc=400) == (0, AlertState.CRITICAL)
+
+
+def make_job(root, n=50, seed=0, stale=()):
+    """A readings.csv the way the live app writes it (VOC scored throughout)."""
+    job = root / "acme" / "job-1"
+    job.mkdir(parents=True)
+    rng = random.Random(seed)
+    samples = []
+    with open(job / READINGS_FILE, "wb") as f:
+        f.write(READINGS_HEADER)
+        for i in range(n):
+            d = Sample(
+                ts=1_700_000_000 + i * 2,
+                co=round(rng.choice([0.0, 9.0, 12.4, 35.0]), 1),
+                co2=rng.choice([None, 640, 800, 1201]),
+                pm25=round(rng.uniform(0, 60), 1),
+                voc=rng.choice([None, 80, 150, 251]),
+                temp=round(rng.uniform(65, 80), 1),
+                humidity=round(rng.uniform(25, 60), 1),
+            )
+            score, state = score_reading(d.co, d.pm25, d.co2, d.voc)
+            samples.append(d)
+            if i in stale:
+                score = 100
+            f.write(encode_csv_row(d, score, state.name))
+    return job, samples
+
+
+def test_stored_scores_rescore_unchanged(tmp_path):
+    job, _ = make_job(tmp_path)
+    r = rescore_job(job, voc_gate="always")
+    assert (r["rows"], r["score_changed"], r["state_changed"]) == (50, 0, 0)
+
+
+def test_changed_rows_are_counted_and_written(tmp_path):
+    job, samples = make_job(tmp_path, stale=(3, 7))
+    expected = sum(score_reading(d.co, d.pm25, d.co2, d.voc)[0] != 100 for d in (samples[3], samples[7]))
+    assert expected
+    r = rescore_job(job, voc_gate="always", write=True)
+    assert (r["score_changed"], r["state_changed"]) == (expected, 0)
+    out = job / "readings.rescored.csv"
+    assert out.read_text().count("\n") == 51
+    (job / READINGS_FILE).write_bytes(out.read_bytes())  # rescored file rescores clean
+    assert rescore_job(job, voc_gate="always")["score_changed"] == 0
+
+
+def test_log_and_csv_of_a_job_rescore_alike(tmp_path):
+    job, _ = make_job(tmp_path, stale=(1, 2, 3))
+    for gate in ("warmup", "always", "never"):
+        from_csv = rescore_job(job, voc_gate=gate)
+        csv_to_log(job / READINGS_FILE, job / LOG_FILE)
+        from_log = rescore_job(job, voc_gate=gate)
+        (job / LOG_FILE).unlink()
+        assert {k: from_log[k] for k in ("rows", "score_changed", "state_changed")} == \
+               {k: from_csv[k] for k in ("rows", "score_changed", "state_changed")}
+
+
+def test_load_job_rows_from_the_log_match_log_to_csv(tmp_path):
+    job, _ = make_job(tmp_path)
+    csv_to_log(job / READINGS_FILE, job / LOG_FILE)
+    header, rows, cols = load_job(job)
+    log_to_csv(job / LOG_FILE, tmp_path / "back.csv")
+    lines = (tmp_path / "back.csv").read_text().splitlines()
+    assert lines[0] == ",".join(header)
+    assert [",".join(r) for r in rows] == lines[1:]
+    assert len(cols["timestamp"]) == 50 and set(cols) == {"timestamp", "co", "pm25", "co2", "voc"}
+
+
+def test_voc_gate_warmup_skips_the_first_minutes(tmp_path):
+    job, samples = make_job(tmp_path, n=400)
+    # stored rows always scored VOC, so only warmup rows with a VOC penalty differ
+    warm = [d for d in samples if d.ts - samples[0].ts < 6 * 60]
+    expected = sum(score_reading(d.co, d.pm25, d.co2, d.voc, voc_scored=False) != score_reading(d.co, d.pm25, d.co2, d.voc)
+                   for d in warm)
+    assert expected
+    assert rescore_job(job, voc_gate="warmup")["score_changed"] == expected
+    assert rescore_job(job, voc_gate="warmup", warmup_s=0)["score_changed"] == 0
+
+
+def test_rescore_all_walks_every_job(tmp_path):
+    make_job(tmp_path)
+    summary = rescore_all(tmp_path, workers=1, voc_gate="always")
+    assert summary["jobs"] == 1 and summary["rows"] == 50
+    assert summary["changed_jobs"] == []
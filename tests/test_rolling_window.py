@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from analytics import RollingWindow
+
+THRESHOLDS = (35.0, 55.0)
+
+
+def check(w, ref, n_recent=5):
+    assert len(w) == len(ref)
+    assert list(w) == ref
+    assert w.mean == pytest.approx(sum(ref) / len(ref) if ref else 0)
+    assert w.min == (min(ref) if ref else None)
+    assert w.max == (max(ref) if ref else None)
+    assert w.last == (ref[-1] if ref else None)
+    for t in THRESHOLDS + (40.0,):  # 40 is unregistered: scan fallback
+        assert w.count_at_least(t) == sum(1 for v in ref if v >= t)
+        assert w.any_above_recent(t, n_recent) == any(v > t for v in ref[-n_recent:])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_a_brute_force_window(seed):
+    rng = random.Random(seed)
+    w = RollingWindow(maxlen=12, thresholds=THRESHOLDS)
+    ref = []
+    for _ in range(300):
+        v = rng.choice([rng.uniform(0, 80), 35.0, 55.0])  # include exact edges
+        w.append(v)
+        ref = (ref + [v])[-12:]
+        check(w, ref)
+
+
+def test_threshold_edges_count_at_least_but_not_above():
+    w = RollingWindow(maxlen=5, thresholds=(35.0,))
+    w.append(35.0)
+    assert w.count_at_least(35.0) == 1   # >= for counts
+    assert not w.any_above_recent(35.0)  # > for "recent spike"
+
+
+def test_recent_check_only_looks_at_the_newest_n():
+    w = RollingWindow(maxlen=20, thresholds=(35.0,))
+    w.append(90.0)
+    for _ in range(5):
+        w.append(1.0)
+    assert not w.any_above_recent(35.0, 5)
+    assert w.any_above_recent(35.0, 6)
+
+
+def test_clear_then_reuse():
+    w = RollingWindow(maxlen=3, thresholds=THRESHOLDS)
+    for v in (60.0, 70.0, 80.0, 90.0):
+        w.append(v)
+    v0 = w.version
+    w.clear()
+    assert w.version == v0 + 1
+    check(w, [])
+    for v in (1.0, 2.0, 3.0, 4.0):
+        w.append(v)
+    check(w, [2.0, 3.0, 4.0])
+
+
+def test_version_bumps_on_every_append():
+    w = RollingWindow(maxlen=2)
+    for i in range(5):
+        w.append(float(i))
+    assert w.version == 5
+
+
+def test_from_values_sizes_to_the_input():
+    w = RollingWindow.from_values([1.0, 2.0, 3.0])
+    assert w.maxlen == 3 and list(w) == [1.0, 2.0, 3.0]
+    assert RollingWindow.from_values([]).maxlen == 1
+
+
+def test_running_sum_does_not_drift():
+    w = RollingWindow(maxlen=10)
+    for i in range(100_000):
+        w.append(0.1 if i % 2 else 1e6)
+    assert w.mean == pytest.approx((1e6 * 5 + 0.1 * 5) / 10, rel=1e-12)
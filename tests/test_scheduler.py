@@ -0,0 +1,138 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from acquisition import SampleScheduler
+
+
+def _counter(calls, name, result=None):
+    def fn():
+        calls.append(name)
+        return result
+    return fn
+
+
+def test_tasks_run_on_their_own_period(clock):
+    calls = []
+    s = SampleScheduler()
+    s.add("fast", _counter(calls, "fast"), 1.0)
+    s.add("slow", _counter(calls, "slow"), 5.0)
+
+    assert s.run_due() == ["fast", "slow"]
+    for _ in range(4):
+        clock.advance(1.0)
+        assert s.run_due() == ["fast"]
+    clock.advance(1.0)
+    assert s.run_due() == ["fast", "slow"]
+    assert calls.count("slow") == 2
+
+
+def test_nothing_due_runs_nothing(clock):
+    s = SampleScheduler()
+    s.add("a", lambda: None, 1.0)
+    s.run_due()
+    clock.advance(0.5)
+    assert s.run_due() == []
+    assert s.next_due() == clock.t + 0.5
+
+
+def test_empty_scheduler_is_never_due():
+    assert SampleScheduler().next_due() == float("inf")
+
+
+def test_not_ready_retries_then_rephases(clock):
+    ready = [False]
+    s = SampleScheduler()
+    s.add("scd41", lambda: ready[0], 5.0, retry_s=0.5)
+
+    s.run_due()
+    assert s.next_due() == clock.t + 0.5
+    assert s.stats()["scd41"]["misses"] == 1
+
+    clock.advance(0.5)
+    ready[0] = True
+    s.run_due()
+    # Re-phased to when data actually arrived, not the old schedule
+    assert s.next_due() == clock.t + 5.0
+
+
+def test_no_retry_without_retry_s(clock):
+    s = SampleScheduler()
+    s.add("a", lambda: False, 2.0)
+    s.run_due()
+    assert s.next_due() == clock.t + 2.0
+    assert s.stats()["a"]["misses"] == 0
+
+
+def test_failing_task_waits_a_full_period(clock):
+    def boom():
+        raise OSError("bus")
+
+    s = SampleScheduler()
+    s.add("a", boom, 3.0, retry_s=0.5)
+    s.run_due()
+    assert s.next_due() == clock.t + 3.0
+    assert s.stats()["a"]["errors"] == 1
+
+
+def test_falling_behind_skips_ahead_instead_of_bursting(clock):
+    calls = []
+    s = SampleScheduler()
+    s.add("a", _counter(calls, "a"), 1.0)
+    s.run_due()
+    clock.advance(10.0)
+    s.run_due()
+    assert s.run_due() == []
+    assert s.next_due() == clock.t + 1.0
+    assert len(calls) == 2
+
+
+def test_jitter_is_start_minus_scheduled(clock):
+    s = SampleScheduler()
+    s.add("a", lambda: None, 1.0)
+    s.run_due()
+    clock.advance(1.25)
+    s.run_due()
+    st = s.stats()["a"]
+    assert st["jitter_last_ms"] == 250.0
+    assert st["jitter_max_ms"] == 250.0
+
+
+def test_set_period_pulls_next_run_in(clock):
+    s = SampleScheduler()
+    s.add("a", lambda: None, 60.0)
+    s.run_due()
+    s.set_period("a", 1.0)
+    assert s.next_due() == clock.t + 1.0
+
+
+def test_due_tasks_overlap_with_an_executor():
+    # Both reads must be in flight at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=2.0)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        s = SampleScheduler(executor=pool)
+        s.add("scd41", barrier.wait, 5.0)
+        s.add("bme688", barrier.wait, 3.0)
+        assert s.run_due() == ["scd41", "bme688"]
+    assert s.stats()["scd41"]["errors"] == 0
+
+
+def test_passes_are_labelled_by_how_they_ran(clock):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        s = SampleScheduler(executor=pool)
+        s.add("pm25", lambda: None, 1.0)
+        s.add("scd41", lambda: None, 5.0)
+        s.run_due()                 # both due -> pipelined pass of 2
+        clock.advance(1.0)
+        s.run_due()                 # lone task runs inline -> serial pass of 1
+    stats = s.latency_stats()
+    assert set(stats) == {"pipelined", "serial"}
+    assert list(stats["pipelined"]) == [2]
+    assert list(stats["serial"]) == [1]
+
+
+def test_serial_scheduler_never_reports_pipelined(clock):
+    s = SampleScheduler()
+    s.add("a", lambda: None, 1.0)
+    s.add("b", lambda: None, 1.0)
+    s.run_due()
+    assert list(s.latency_stats()) == ["serial"]
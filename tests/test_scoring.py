@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+from scoring import (
+    ALERT_TABLES, CO2_SEVERITY, CO_SEVERITY, HUMIDITY_SEVERITY, PENALTY_TABLES,
+    PM25_SEVERITY, TEMP_SEVERITY, VOC_SEVERITY, ThresholdTable,
+)
+
+
+# The original main.py severity ladders (label only)
+def legacy_pm25(v):
+    return "Good" if v <= 12 else "Moderate" if v <= 35 else "Poor" if v <= 55 else "Unhealthy"
+
+def legacy_co2(v):
+    return "Good" if v <= 800 else "Elevated" if v <= 1200 else "High"
+
+def legacy_humidity(v):
+    return "Optimal" if 30 <= v <= 50 else "Low" if v < 30 else "High"
+
+def legacy_co(v):
+    return "Safe" if v <= 9 else "Elevated" if v <= 35 else "Danger"
+
+def legacy_voc(v):
+    return "Good" if v <= 100 else "Moderate" if v <= 150 else "Elevated" if v <= 250 else "High"
+
+def legacy_temp(v):
+    return "Cool" if v < 68 else "Comfortable" if v <= 78 else "Warm"
+
+
+def around(*edges):
+    """Each edge, just below and just above it."""
+    return sorted({x for e in edges for x in (math.nextafter(e, -math.inf), e, math.nextafter(e, math.inf))})
+
+
+@pytest.mark.parametrize("table, legacy, edges", [
+    (PM25_SEVERITY, legacy_pm25, (12, 35, 55)),
+    (CO2_SEVERITY, legacy_co2, (800, 1200)),
+    (HUMIDITY_SEVERITY, legacy_humidity, (30, 50)),
+    (CO_SEVERITY, legacy_co, (9, 35)),
+    (VOC_SEVERITY, legacy_voc, (100, 150, 250)),
+    (TEMP_SEVERITY, legacy_temp, (68, 78)),
+])
+def test_severity_bands_match_the_legacy_ladders(table, legacy, edges):
+    for v in around(*edges) + [-1e9, 0, 1e9]:
+        assert table.lookup(v)[0] == legacy(v), v
+
+
+# Original evaluate_readings() penalty / alert rules
+LEGACY_PENALTY = {
+    "pm25": lambda v: -25 if v > 35 else -10 if v > 12 else 0,
+    "co2": lambda v: -20 if v > 1200 else -10 if v > 800 else 0,
+    "voc": lambda v: -20 if v > 250 else -10 if v > 150 else 0,
+    "co": lambda v: -60 if v >= 35 else -20 if v >= 9 else 0,
+}
+LEGACY_ALERT = {
+    "pm25": lambda v: int(v > 35),
+    "co2": lambda v: int(v > 1200),
+    "voc": lambda v: int(v >= 150),
+    "co": lambda v: 2 if v >= 35 else 1 if v >= 9 else 0,
+}
+EDGES = {"pm25": (12, 35), "co2": (800, 1200), "voc": (150, 250), "co": (9, 35)}
+
+
+@pytest.mark.parametrize("metric", sorted(EDGES))
+def test_penalty_and_alert_tables_match_the_legacy_rules(metric):
+    for v in around(*EDGES[metric]):
+        assert PENALTY_TABLES[metric].lookup(v) == LEGACY_PENALTY[metric](v), v
+        assert ALERT_TABLES[metric].lookup(v) == LEGACY_ALERT[metric](v), v
+
+
+def test_lower_inclusive_edge_starts_the_band_above():
+    t = ThresholdTable((10, 20), ("a", "b", "c"), lower_inclusive=(20,))
+    assert [t.index(v) for v in (9, 10, 11, 19, 20, 21)] == [0, 0, 1, 1, 2, 2]
+
+
+def test_index_array_matches_scalar_and_marks_nan():
+    t = ALERT_TABLES["co"]
+    values = around(9, 35) + [math.nan]
+    assert list(t.index_array(values)) == [t.index(v) for v in values[:-1]] + [-1]
+    assert list(t.lookup_array(values, missing=7)) == [t.lookup(v) for v in values[:-1]] + [7]
+
+
+def test_band_counts_skip_nan():
+    assert PENALTY_TABLES["pm25"].band_counts([1, 12, 12.5, 35, 36, math.nan]) == [2, 2, 1]
+
+
+def test_empty_edges_is_a_single_band():
+    t = ThresholdTable((), ("only",))
+    assert t.lookup(5) == "only"
+    assert list(t.index_array([1.0, math.nan])) == [0, -1]
+
+
+def test_value_count_must_match_the_bands():
+    with pytest.raises(ValueError):
+        ThresholdTable((1, 2), ("a", "b"))
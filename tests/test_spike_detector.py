@@ -0,0 +1,85 @@
+import random
+
+from analytics import SpikeDetector
+
+
+def detector(**kw):
+    return SpikeDetector("pm25", min_rise=10.0, min_scale=1.0, **kw)
+
+
+def feed(det, values, t0=0.0, step=1.0):
+    closed = []
+    for i, v in enumerate(values):
+        ev = det.update(t0 + i * step, v)
+        if ev is not None:
+            closed.append(ev)
+    return closed
+
+
+def noisy(n, level, seed=0, amp=0.5):
+    rng = random.Random(seed)
+    return [level + rng.uniform(-amp, amp) for _ in range(n)]
+
+
+def test_flat_noise_opens_no_event():
+    det = detector()
+    assert feed(det, noisy(2000, 8.0)) == []
+    assert det.active is None
+
+
+def test_one_spike_is_one_event():
+    det = detector()
+    values = noisy(100, 8.0) + [20.0, 40.0, 60.0, 45.0, 30.0] + noisy(30, 8.0, seed=1)
+    closed = feed(det, values)
+    assert len(closed) == 1
+    ev = closed[0]
+    assert ev.peak == 60.0 and ev.peak_ts == 102.0
+    assert 7.0 < ev.baseline < 9.0
+    assert ev.magnitude > 50 and not ev.plateau
+    assert ev.start_ts <= 100.0 < ev.end_ts
+
+
+def test_rise_below_min_rise_is_ignored():
+    det = detector()
+    assert feed(det, noisy(100, 8.0) + [15.0] * 5 + noisy(30, 8.0)) == []
+
+
+def test_event_stays_open_until_hold_samples_settle():
+    det = detector(hold=3)
+    feed(det, [8.0] * 50 + [60.0, 8.0, 8.0])
+    assert det.active is not None              # two settled samples so far
+    assert det.update(53.0, 8.0) is not None
+
+
+def test_long_rise_closes_once_as_a_plateau_and_moves_the_baseline():
+    det = detector(max_event_s=60)
+    closed = feed(det, [8.0] * 50 + [40.0] * 300)
+    assert len(closed) == 1 and closed[0].plateau
+    assert det.active is None
+    assert det._base == 40.0
+    assert feed(det, [40.0] * 100, t0=350.0) == []
+
+
+def test_missing_values_are_skipped():
+    det = detector()
+    det.update(0.0, None)
+    assert det.version == 0 and det.last_ts is None
+
+
+def test_since_and_count_since_include_the_open_event():
+    det = detector()
+    feed(det, [8.0] * 50 + [60.0, 8.0, 8.0, 8.0])        # closes at t=53
+    feed(det, [8.0] * 50 + [60.0], t0=54.0)               # open from ~t=104
+    assert det.count_since(0.0) == 2
+    assert det.count_since(0.0, include_active=False) == 1
+    assert det.count_since(60.0) == 1
+    assert [ev.peak for ev in det.since(0.0)] == [60.0, 60.0]
+    assert det.since(1000.0) == []
+
+
+def test_events_are_bounded():
+    det = detector(maxlen=3)
+    for k in range(6):
+        feed(det, [8.0] * 50 + [60.0, 8.0, 8.0, 8.0], t0=k * 100.0)
+    assert len(det.events) == 3
+    assert det.events[0].start_ts >= 300.0
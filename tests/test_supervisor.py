@@ -0,0 +1,103 @@
+from acquisition import SensorSupervisor
+
+
+class Rig:
+    """Sensors that come up when their probe is allowed to succeed."""
+
+    def __init__(self, *names):
+        self.down = set(names)
+        self.ok = dict.fromkeys(names, False)
+        self.calls = []
+
+    def probe(self, name):
+        def fn():
+            self.calls.append(name)
+            if self.ok[name]:
+                self.down.discard(name)
+            return self.ok[name]
+        return fn
+
+    def supervisor(self, **kw):
+        return SensorSupervisor({n: self.probe(n) for n in self.ok}, self.down.__contains__, **kw)
+
+
+def test_down_at_start_is_probed_immediately(clock):
+    rig = Rig("scd41")
+    rig.ok["scd41"] = True
+    sup = rig.supervisor()
+    sup.check(immediate=True)
+    assert rig.calls == ["scd41"]
+    assert not rig.down
+
+
+def test_healthy_sensors_are_never_probed(clock):
+    rig = Rig("scd41")
+    rig.down.clear()
+    sup = rig.supervisor()
+    sup.check(immediate=True)
+    clock.advance(1000)
+    sup.check()
+    assert rig.calls == []
+
+
+def test_backoff_doubles_up_to_the_cap(clock):
+    rig = Rig("pm25")
+    sup = rig.supervisor(base_s=5.0, max_s=20.0)
+    sup.check(immediate=True)
+    tries = [clock.t]
+    for _ in range(200):
+        clock.advance(1.0)
+        n = len(rig.calls)
+        sup.check()
+        if len(rig.calls) > n:
+            tries.append(clock.t)
+        if len(tries) == 6:
+            break
+    gaps = [b - a for a, b in zip(tries, tries[1:])]
+    assert gaps == [5.0, 10.0, 20.0, 20.0, 20.0]
+    assert sup.stats()["pm25"]["failures"] == 6
+
+
+def test_newly_down_sensor_gets_a_grace_period(clock):
+    rig = Rig("bme688")
+    rig.down.clear()
+    sup = rig.supervisor(base_s=5.0)
+    sup.check(immediate=True)
+    rig.down.add("bme688")  # a read error flips it to ERROR
+    sup.check()
+    assert rig.calls == []
+    clock.advance(5.0)
+    sup.check()
+    assert rig.calls == ["bme688"]
+
+
+def test_backoff_resets_once_the_sensor_is_back(clock):
+    rig = Rig("sgp40")
+    sup = rig.supervisor(base_s=5.0, max_s=300.0)
+    sup.check(immediate=True)
+    clock.advance(5.0)
+    sup.check()
+    clock.advance(10.0)
+    rig.ok["sgp40"] = True
+    sup.check()
+    assert "sgp40" not in rig.down
+    st = sup.stats()["sgp40"]
+    assert st["down"] is False and st["retry_in_s"] is None
+
+    # Dropping out again starts from base_s, not the old delay
+    rig.ok["sgp40"] = False
+    rig.down.add("sgp40")
+    n = len(rig.calls)
+    sup.check()
+    clock.advance(5.0)
+    sup.check()
+    assert len(rig.calls) == n + 1
+
+
+def test_probe_exception_counts_as_failure(clock):
+    def boom():
+        raise OSError("no device")
+
+    sup = SensorSupervisor({"scd41": boom}, lambda name: True)
+    sup.check(immediate=True)
+    assert sup.stats()["scd41"]["failures"] == 1
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from acquisition import Sample
+from scoring import AlertState
+from survey_catalog import SurveyCatalog, job_stats
+from survey_log import LOG_FILE, csv_to_log
+from survey_writer import READINGS_FILE, READINGS_HEADER, encode_csv_row
+
+T0 = 1_700_000_000
+
+
+def make_job(root, customer, job_id, start, states, log=False):
+    """A job whose n-th row has co2 = 600 + n and the given state."""
+    job = root / customer / job_id
+    job.mkdir(parents=True)
+    with open(job / READINGS_FILE, "wb") as f:
+        f.write(READINGS_HEADER)
+        for i, st in enumerate(states):
+            d = Sample(ts=start + i * 60, co2=600 + i, pm25=None if i == 0 else 5.0, temp=70.0, humidity=40.0)
+            f.write(encode_csv_row(d, 80 if st == "NORMAL" else 40, st))
+    if log:
+        csv_to_log(job / READINGS_FILE, job / LOG_FILE)
+        (job / READINGS_FILE).unlink()
+    return job
+
+
+@pytest.mark.parametrize("log", (False, True))
+def test_job_stats(tmp_path, log):
+    job = make_job(tmp_path, "acme", "j1", T0, ["NORMAL", "WARNING", "WARNING", "NORMAL"], log=log)
+    st = job_stats(job)
+    assert st["source"] == (LOG_FILE if log else READINGS_FILE)
+    assert (st["customer"], st["job_id"], st["samples"]) == ("acme", "j1", 4)
+    assert (st["start_ts"], st["end_ts"]) == (T0, T0 + 180)
+    assert (st["max_state"], st["warning_count"], st["critical_count"]) == (1, 2, 0)
+    assert st["metrics"]["co2"] == (4, 600.0, 603.0, 601.5)
+    assert st["metrics"]["pm25"] == (3, 5.0, 5.0, 5.0)       # missing first value skipped
+    assert st["metrics"]["voc"] == (0, None, None, None)
+    assert st["metrics"]["score"] == (4, 40.0, 80.0, 60.0)
+
+
+def test_log_and_csv_stats_agree(tmp_path):
+    states = ["NORMAL", "CRITICAL", "WARNING"]
+    a = job_stats(make_job(tmp_path, "c", "csv", T0, states))
+    b = job_stats(make_job(tmp_path, "c", "log", T0, states, log=True))
+    for key in ("start_ts", "end_ts", "samples", "max_state", "warning_count", "critical_count", "metrics"):
+        assert a[key] == b[key], key
+
+
+def test_csv_rows_with_a_bad_state_are_dropped(tmp_path):
+    job = make_job(tmp_path, "acme", "j1", T0, ["NORMAL", "WARNING"])
+    with open(job / READINGS_FILE, "a") as f:
+        f.write(f"{T0 + 999},None,700,,,,,,BOGUS,,,,\n")
+    assert job_stats(job)["samples"] == 2
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    make_job(tmp_path, "acme", "old", T0, ["NORMAL"] * 3)
+    make_job(tmp_path, "acme", "new", T0 + 86400, ["NORMAL", "CRITICAL"], log=True)
+    make_job(tmp_path, "zeta", "mid", T0 + 3600, ["WARNING"] * 2)
+    cat = SurveyCatalog(tmp_path)
+    assert cat.rebuild() == (3, 0)
+    return cat
+
+
+def ids(rows):
+    return [r["job_id"] for r in rows]
+
+
+def test_jobs_filters(catalog):
+    assert ids(catalog.jobs()) == ["new", "mid", "old"]
+    assert ids(catalog.jobs(customer="acme")) == ["new", "old"]
+    assert ids(catalog.jobs(min_state="WARNING")) == ["new", "mid"]
+    assert ids(catalog.jobs(min_state=AlertState.CRITICAL)) == ["new"]
+    assert ids(catalog.jobs(limit=1)) == ["new"]
+
+
+def test_time_filters_select_overlapping_jobs(catalog):
+    assert ids(catalog.jobs(since=T0 + 120)) == ["new", "mid", "old"]      # old ends at T0 + 120
+    assert ids(catalog.jobs(since=T0 + 121)) == ["new", "mid"]
+    assert ids(catalog.jobs(until=T0 + 3600)) == ["mid", "old"]            # mid starts at T0 + 3600
+    assert ids(catalog.jobs(since=T0 + 3000, until=T0 + 4000)) == ["mid"]
+
+
+def test_customers_and_metrics(catalog):
+    assert catalog.customers() == [("acme", 2, T0 + 86400), ("zeta", 1, T0 + 3600)]
+    m = catalog.metrics("acme", "old")
+    assert m["co2"] == {"count": 3, "min": 600.0, "max": 602.0, "mean": 601.0}
+    assert "voc" not in m                                                  # no values, no row
+
+
+def test_rebuild_skips_fresh_jobs_and_drops_deleted_ones(catalog, tmp_path):
+    assert catalog.rebuild() == (0, 0)
+    job = tmp_path / "zeta" / "mid" / READINGS_FILE
+    future = job.stat().st_mtime + 3600
+    os.utime(job, (future, future))
+    (tmp_path / "acme" / "old" / READINGS_FILE).unlink()
+    assert catalog.rebuild() == (1, 1)
+    assert ids(catalog.jobs()) == ["new", "mid"]
+    assert catalog.rebuild(stale_only=False) == (2, 0)
+
+
+def test_index_job_replaces_the_entry(catalog, tmp_path):
+    job = tmp_path / "zeta" / "mid"
+    with open(job / READINGS_FILE, "ab") as f:
+        f.write(encode_csv_row(Sample(ts=T0 + 7200, co2=900), 20, "CRITICAL"))
+    catalog.index_job(job)
+    (row,) = catalog.jobs(customer="zeta")
+    assert (row["samples"], row["max_state"], row["critical_count"]) == (3, 2, 1)
+    assert catalog.metrics("zeta", "mid")["co2"]["max"] == 900.0
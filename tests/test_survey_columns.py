@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from acquisition import Sample
+from survey_columns import COLUMN_NAMES, COLUMNS_DIR, META_FILE, _col_path, open_job, sync_columns
+from survey_log import FILE_HEADER, LOG_FILE, csv_to_log, encode_record, frame_block, log_to_csv, read_columns
+
+T0 = 1_700_000_000
+
+
+def append(job, start, n):
+    """Append one block of n records (ts = T0 + start ...) to the job's log."""
+    path = job / LOG_FILE
+    if not path.exists():
+        path.write_bytes(FILE_HEADER)
+    recs = [
+        encode_record(Sample(ts=T0 + i, co2=500 + i, pm25=i * 0.5, temp=70.0, humidity=40.0), 90, "NORMAL")
+        for i in range(start, start + n)
+    ]
+    with open(path, "ab") as f:
+        f.write(frame_block(recs))
+
+
+def column(store, name):
+    return [float(v) for v in store.column(name)]
+
+
+def test_columns_match_the_log(tmp_path):
+    append(tmp_path, 0, 5)
+    append(tmp_path, 5, 3)
+    assert sync_columns(tmp_path) == 8
+    expected = read_columns(tmp_path / LOG_FILE)
+    with open_job(tmp_path, sync=False) as store:
+        assert len(store) == 8 and (store.t0, store.t1) == (T0, T0 + 7)
+        for name in ("timestamp", "co2", "pm25", "score", "state"):
+            assert column(store, name) == [float(v) for v in expected[name]]
+
+
+def test_resync_only_reads_new_blocks(tmp_path):
+    append(tmp_path, 0, 5)
+    assert sync_columns(tmp_path) == 5
+    assert sync_columns(tmp_path) == 0
+    append(tmp_path, 5, 4)
+    assert sync_columns(tmp_path) == 4
+    with open_job(tmp_path) as store:
+        assert column(store, "co2") == [500.0 + i for i in range(9)]
+
+
+def test_torn_block_is_picked_up_once_complete(tmp_path):
+    append(tmp_path, 0, 3)
+    log = tmp_path / LOG_FILE
+    whole = log.read_bytes()
+    append(tmp_path, 3, 2)
+    full = log.read_bytes()
+    log.write_bytes(full[:len(whole) + 10])  # writer mid-block
+    assert sync_columns(tmp_path) == 3
+    log.write_bytes(full)
+    assert sync_columns(tmp_path) == 2
+
+
+def test_partial_previous_sync_is_dropped(tmp_path):
+    append(tmp_path, 0, 4)
+    sync_columns(tmp_path)
+    cdir = tmp_path / COLUMNS_DIR
+    with open(_col_path(cdir, "co2"), "ab") as f:
+        f.write(b"\0" * 8)                      # written, but meta.json never replaced
+    append(tmp_path, 4, 1)
+    sync_columns(tmp_path)
+    with open_job(tmp_path, sync=False) as store:
+        assert column(store, "co2") == [500.0 + i for i in range(5)]
+    assert _col_path(cdir, "co2").stat().st_size == 5 * 4
+
+
+def test_replaced_log_is_rebuilt_from_scratch(tmp_path):
+    append(tmp_path, 0, 6)
+    sync_columns(tmp_path)
+    # rebuild the log from CSV: same size or larger, different file
+    csv = tmp_path / "readings.csv"
+    log_to_csv(tmp_path / LOG_FILE, csv)
+    lines = csv.read_text().splitlines()
+    csv.write_text("\n".join(lines[:1] + lines[3:]) + "\n")  # first two rows gone
+    csv_to_log(csv, tmp_path / LOG_FILE)
+    append(tmp_path, 6, 4)
+    assert sync_columns(tmp_path) == 8
+    with open_job(tmp_path, sync=False) as store:
+        assert column(store, "co2")[0] == 502.0 and len(store) == 8
+
+
+def test_range_and_slice_bisect_timestamps(tmp_path):
+    append(tmp_path, 0, 10)
+    with open_job(tmp_path) as store:
+        assert store.range(T0 + 2, T0 + 4) == (2, 5)
+        assert store.range() == (0, 10)
+        assert store.range(T0 + 2.5, None) == (3, 10)
+        ts, vals = store.slice("co2", T0 + 8)
+        assert list(ts) == [T0 + 8, T0 + 9] and list(vals) == [508.0, 509.0]
+
+
+def test_job_without_a_log_has_no_store(tmp_path):
+    assert sync_columns(tmp_path) == 0
+    with pytest.raises(FileNotFoundError):
+        open_job(tmp_path)
+
+
+def test_empty_log_gives_an_empty_store(tmp_path):
+    (tmp_path / LOG_FILE).write_bytes(FILE_HEADER)
+    with open_job(tmp_path) as store:
+        assert len(store) == 0 and list(store.column("co2")) == []
+    meta = json.loads((tmp_path / COLUMNS_DIR / META_FILE).read_text())
+    assert set(meta["columns"]) == set(COLUMN_NAMES)
@@ -0,0 +1,122 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from acquisition import Sample
+from derived import derived_values
+from survey_export import (
+    convert_units, export, iter_csv_dicts, iter_job, iter_log_rows, resample, time_range,
+    with_derived, with_time,
+)
+from survey_log import LOG_FILE, csv_to_log
+from survey_writer import READINGS_FILE, READINGS_HEADER, encode_csv_row
+
+T0 = 1_700_000_000 - 1_700_000_000 % 60
+
+
+def make_job(root, customer="acme", job_id="j1", n=6, log=False):
+    job = root / customer / job_id
+    job.mkdir(parents=True)
+    with open(job / READINGS_FILE, "wb") as f:
+        f.write(READINGS_HEADER)
+        for i in range(n):
+            d = Sample(ts=T0 + i * 20, co=0.0, co2=600 + i * 10, pm25=None if i == 1 else 4.5,
+                       temp=68.0, humidity=40.0, mold_risk=i % 2)
+            f.write(encode_csv_row(d, 90, "NORMAL"))
+    if log:
+        csv_to_log(job / READINGS_FILE, job / LOG_FILE)
+        (job / READINGS_FILE).unlink()
+    return job
+
+
+def test_log_and_csv_sources_yield_the_same_rows(tmp_path):
+    a = list(iter_job(make_job(tmp_path, job_id="csv")))
+    b = list(iter_job(make_job(tmp_path, job_id="log", log=True)))
+    assert a == b
+    assert a[1]["pm25"] is None and a[0]["co2"] == 600.0 and a[0]["state"] == "NORMAL"
+    assert a[0]["dew_point"] is None and a[1]["mold_risk"] == 1
+
+
+def test_log_values_come_back_as_written(tmp_path):
+    job = make_job(tmp_path, log=True)
+    row = next(iter_log_rows(job / LOG_FILE))
+    assert (row["pm25"], row["temp"], row["humidity"]) == (4.5, 68.0, 40.0)
+
+
+def test_csv_source_skips_bad_timestamps_and_a_torn_line(tmp_path):
+    job = make_job(tmp_path, n=2)
+    with open(job / READINGS_FILE, "a") as f:
+        f.write("oops,0.0,600,4.5,,68.0,40.0,90,NORMAL,,,,\n")
+        f.write(f"{T0 + 99},0.0,6")
+    assert len(list(iter_csv_dicts(job / READINGS_FILE))) == 2
+
+
+def test_time_range_stops_after_the_end():
+    def rows():
+        for i in range(10):
+            yield {"timestamp": i}
+        raise AssertionError("read past t1")
+
+    assert [r["timestamp"] for r in time_range(rows(), 3, 5)] == [3, 4, 5]
+
+
+def test_resample_averages_and_keeps_the_worst_state():
+    rows = [
+        {"timestamp": T0 + 0, "co2": 600.0, "pm25": None, "state": "NORMAL", "mold_risk": 0, "customer": "acme"},
+        {"timestamp": T0 + 20, "co2": 700.0, "pm25": 5.0, "state": "CRITICAL", "mold_risk": 2, "customer": "acme"},
+        {"timestamp": T0 + 40, "co2": 800.0, "pm25": None, "state": "WARNING", "mold_risk": None, "customer": "acme"},
+        {"timestamp": T0 + 60, "co2": 900.0, "pm25": None, "state": None, "mold_risk": None, "customer": "acme"},
+    ]
+    a, b = resample(iter(rows), 60)
+    assert a == {"timestamp": T0, "co2": 700.0, "pm25": 5.0, "state": "CRITICAL",
+                 "mold_risk": 2, "customer": "acme", "samples": 3}
+    assert b == {"timestamp": T0 + 60, "co2": 900.0, "pm25": None, "state": None,
+                 "mold_risk": None, "customer": "acme", "samples": 1}
+
+
+def test_with_derived_fills_only_missing_values():
+    legacy = {"timestamp": T0, "temp": 77.0, "humidity": 50.0}
+    stored = {"timestamp": T0, "temp": 77.0, "humidity": 50.0, "dew_point": 1.0}
+    a, b = with_derived(iter([legacy, stored]))
+    assert {k: a[k] for k in derived_values(77.0, 50.0)} == derived_values(77.0, 50.0)
+    assert b["dew_point"] == 1.0 and b["heat_index"] is None
+
+
+def test_convert_units_and_iso_time():
+    (row,) = convert_units(iter([{"timestamp": 0, "temp": 212.0, "dew_point": None, "co2": 600.0}]), "C")
+    assert row["temp"] == 100.0 and row["dew_point"] is None and row["co2"] == 600.0
+    (row,) = with_time(iter([{"timestamp": 0}]), utc=True)
+    assert list(row) == ["time", "timestamp"] and row["time"] == "1970-01-01T00:00:00Z"
+
+
+def test_export_csv_of_one_job(tmp_path):
+    job = make_job(tmp_path, log=True)
+    out = tmp_path / "out.csv"
+    assert export([job], out, resample_s=60)["rows"] == 2
+    rows = list(csv.DictReader(io.StringIO(out.read_text())))
+    assert "customer" not in rows[0]
+    assert rows[0]["samples"] == "3" and rows[0]["co2"] == "610.0"
+    assert rows[0]["pm25"] == "4.5"
+    assert not (tmp_path / "out.csv.tmp").exists()
+
+
+def test_export_of_several_jobs_labels_rows_and_compresses(tmp_path):
+    jobs = [make_job(tmp_path, job_id="a", n=2), make_job(tmp_path, "zeta", "b", n=3, log=True)]
+    out = tmp_path / "out.jsonl.gz"
+    seen = []
+    summary = export(jobs, out, fmt="jsonl", progress=lambda *a: seen.append(a), t1=T0 + 20)
+    assert (summary["jobs"], summary["rows"]) == (2, 4)
+    rows = [json.loads(line) for line in gzip.decompress(out.read_bytes()).splitlines()]
+    assert [(r["customer"], r["job_id"]) for r in rows] == [("acme", "a")] * 2 + [("zeta", "b")] * 2
+    assert seen == [(0, 2, 0), (1, 2, 2), (2, 2, 4)]
+
+
+def test_failed_export_leaves_no_partial_file(tmp_path):
+    job = make_job(tmp_path)
+    out = tmp_path / "out.csv"
+    with pytest.raises(ZeroDivisionError):
+        export([job], out, progress=lambda i, n, rows: 1 / (n - i))  # fails after the last job
+    assert not out.exists() and not (tmp_path / "out.csv.tmp").exists()
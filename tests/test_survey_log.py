@@ -0,0 +1,159 @@
+import math
+
+import pytest
+
+from acquisition import Sample
+from survey_log import (
+    BLOCK_HEADER_FMT, FILE_HEADER, FILE_HEADER_FMT, LOG_FILE, RECORD_SIZE,
+    csv_to_log, encode_record, frame_block, iter_records, load_csv_columns, log_to_csv,
+    make_writer, read_columns, read_records, recover, scan_blocks,
+)
+from survey_writer import READINGS_FILE, READINGS_HEADER, encode_csv_row
+
+HDR = FILE_HEADER_FMT.size
+BLOCK = BLOCK_HEADER_FMT.size
+
+
+def samples(n, t0=1_700_000_000):
+    for i in range(n):
+        yield Sample(
+            ts=t0 + i, co=0.0 if i % 5 else None, co2=600 + i, pm25=round(3.1 + i * 0.1, 1),
+            voc=None if i % 3 else 100 + i, temp=70.2, humidity=41.5,
+            dew_point=45.3 if i % 2 else None, abs_humidity=7.81, heat_index=69.4, mold_risk=i % 3,
+        )
+
+
+def write_log(path, blocks):
+    """A log image with one frame_block() per list of samples."""
+    data = FILE_HEADER + b"".join(
+        frame_block([encode_record(d, 90, "NORMAL") for d in block]) for block in blocks
+    )
+    path.write_bytes(data)
+    return data
+
+
+def tuples(recs):
+    return [tuple(r) for r in (recs.tolist() if hasattr(recs, "tolist") else recs)]
+
+
+def test_scan_finds_every_block(tmp_path):
+    data = write_log(tmp_path / LOG_FILE, [list(samples(3)), list(samples(2))])
+    blocks, end = scan_blocks(data)
+    assert blocks == [(HDR + BLOCK, 3), (HDR + 2 * BLOCK + 3 * RECORD_SIZE, 2)]
+    assert end == len(data)
+    assert scan_blocks(data, start=blocks[1][0] - BLOCK) == ([blocks[1]], end)
+
+
+@pytest.mark.parametrize("cut", [1, BLOCK - 1, BLOCK, BLOCK + RECORD_SIZE, -1])
+def test_recover_truncates_a_torn_last_block(tmp_path, cut):
+    path = tmp_path / LOG_FILE
+    data = write_log(path, [list(samples(3)), list(samples(4))])
+    good = HDR + BLOCK + 3 * RECORD_SIZE
+    torn = data[:good + cut] if cut > 0 else data[:cut]
+    path.write_bytes(torn)
+
+    assert recover(path) == {"records": 3, "truncated_bytes": len(torn) - good}
+    assert path.read_bytes() == data[:good]
+    assert recover(path) == {"records": 3, "truncated_bytes": 0}
+
+
+def test_recover_stops_at_a_corrupt_block(tmp_path):
+    path = tmp_path / LOG_FILE
+    data = bytearray(write_log(path, [list(samples(3)), list(samples(4)), list(samples(1))]))
+    data[HDR + 2 * BLOCK + 3 * RECORD_SIZE + 5] ^= 0xFF  # flip a byte in block 2's payload
+    path.write_bytes(bytes(data))
+    assert recover(path)["records"] == 3
+    assert len(tuples(read_records(path))) == 3
+
+
+def test_recover_resets_a_torn_file_header(tmp_path):
+    path = tmp_path / LOG_FILE
+    path.write_bytes(FILE_HEADER[:5])
+    assert recover(path) == {"records": 0, "truncated_bytes": 5}
+    assert path.read_bytes() == b""
+    assert recover(tmp_path / "missing.hxl") == {"records": 0, "truncated_bytes": 0}
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / LOG_FILE
+    path.write_bytes(b"timestamp,co,co2\n" * 4)
+    with pytest.raises(ValueError):
+        read_records(path)
+
+
+def test_readers_ignore_a_torn_tail(tmp_path):
+    path = tmp_path / LOG_FILE
+    data = write_log(path, [list(samples(3)), list(samples(2))])
+    path.write_bytes(data[:-7])
+    assert len(tuples(read_records(path))) == 3
+    assert len(list(iter_records(path))) == 3
+    assert len(read_columns(path)["co2"]) == 3
+
+
+def test_missing_values_round_trip_as_nan_and_sentinels(tmp_path):
+    path = tmp_path / LOG_FILE
+    write_log(path, [list(samples(2))])
+    cols = read_columns(path)
+    assert math.isnan(cols["co"][0]) and cols["co"][1] == 0.0
+    assert math.isnan(cols["dew_point"][0])
+    assert cols["mold_risk"] == [0.0, 1.0]
+    assert cols["score"] == [90.0, 90.0] and cols["state"] == [0, 0]
+
+
+def write_csv(path, n):
+    with open(path, "wb") as f:
+        f.write(READINGS_HEADER)
+        for d in samples(n):
+            f.write(encode_csv_row(d, 90, "NORMAL"))
+
+
+def test_csv_log_csv_round_trip_is_byte_identical(tmp_path):
+    src, log, back = tmp_path / READINGS_FILE, tmp_path / LOG_FILE, tmp_path / "back.csv"
+    write_csv(src, 600)
+    assert csv_to_log(src, log, block_rows=256) == (600, 0)
+    assert len(scan_blocks(log.read_bytes())[0]) == 3
+    assert log_to_csv(log, back) == 600
+    assert back.read_bytes() == src.read_bytes()
+
+
+def test_csv_to_log_skips_bad_rows_and_drops_a_torn_line(tmp_path):
+    src, log = tmp_path / READINGS_FILE, tmp_path / LOG_FILE
+    write_csv(src, 3)
+    with open(src, "a") as f:
+        f.write("garbage,0.0,600,3.5,,70.2,41.0,90,NORMAL,,,,\n")    # bad timestamp
+        f.write("1700000009,0.0,600,3.5,,70.2,41.0,90,BOGUS,,,,\n")  # bad state
+        f.write("1700000010,0.0,6")                                  # torn last line
+    assert csv_to_log(src, log) == (3, 2)
+
+
+def test_old_nine_column_csv_converts(tmp_path):
+    src, log = tmp_path / READINGS_FILE, tmp_path / LOG_FILE
+    src.write_text("timestamp,co,co2,pm25,voc,temp,humidity,score,state\n"
+                   "1700000000,None,640,4.2,,70.0,40.0,80,WARNING\n")
+    assert csv_to_log(src, log) == (1, 0)
+    header, rows, cols = load_csv_columns(src)
+    (r,) = tuples(read_records(log))
+    assert r[2] == 640.0 and math.isnan(r[1]) and r[8] == 1
+    assert rows == [["1700000000", "None", "640", "4.2", "", "70.0", "40.0", "80", "WARNING"]]
+    assert math.isnan(cols["co"][0]) and cols["co2"] == [640.0]
+
+
+def test_survey_writer_appends_blocks_and_recovers_on_open(tmp_path):
+    job = tmp_path / "job"
+    job.mkdir()
+    path = job / LOG_FILE
+    data = write_log(path, [list(samples(2))])
+    path.write_bytes(data + b"HXB1\x05")     # torn block header from a crash
+
+    w = make_writer(flush_rows=4, fsync_interval_s=None)
+    w.start()
+    try:
+        w.open(job)
+        for d in samples(6, t0=1_700_000_100):
+            w.write(d, 90, "NORMAL")
+        w.close()
+    finally:
+        w.stop()
+    assert w.stats()["recovered"] == {"records": 2, "truncated_bytes": 5}
+    blocks, end = scan_blocks(path.read_bytes())
+    assert [n for _, n in blocks] == [2, 4, 2] and end == path.stat().st_size
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from acquisition import Sample
+from survey_writer import READINGS_FILE, READINGS_HEADER, SurveyWriter, encode_csv_row
+
+
+@pytest.fixture
+def writer():
+    made = []
+
+    def make(**kw):
+        w = SurveyWriter(**kw)
+        w.start()
+        made.append(w)
+        return w
+
+    yield make
+    for w in made:
+        w.stop()
+
+
+def sample(i, **kw):
+    return Sample(ts=1_700_000_000.9 + i, co=0.0, co2=600 + i, pm25=3.5, temp=70.2, humidity=41.0, **kw)
+
+
+def test_encode_csv_row_layout():
+    row = encode_csv_row(sample(0, voc=None, dew_point=45.1, mold_risk=0), 95, "NORMAL")
+    assert row == b"1700000000,0.0,600,3.5,,70.2,41.0,95,NORMAL,45.1,,,0\n"
+    assert len(row.decode().split(",")) == len(READINGS_HEADER.decode().split(","))
+
+
+def test_rows_are_batched_and_closed_with_fsync(writer, tmp_path):
+    w = writer(flush_rows=4, flush_interval_s=60.0, fsync_interval_s=None)
+    w.open(tmp_path / "job")
+    for i in range(10):
+        w.write(sample(i), 90, "NORMAL")
+    w.close()
+    lines = (tmp_path / "job" / READINGS_FILE).read_bytes().splitlines(keepends=True)
+    assert lines[0] == READINGS_HEADER
+    assert [l.split(b",")[2] for l in lines[1:]] == [str(600 + i).encode() for i in range(10)]
+    st = w.stats()
+    assert (st["rows_written"], st["batches"], st["max_batch"], st["fsyncs"]) == (10, 3, 4, 1)
+
+
+def test_partial_batch_flushes_after_the_interval(writer, tmp_path):
+    w = writer(flush_rows=100, flush_interval_s=0.05, fsync_interval_s=None)
+    w.open(tmp_path / "job")
+    w.write(sample(0), 90, "NORMAL")
+    deadline = time.monotonic() + 2.0
+    while not w.stats()["rows_written"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert w.stats()["rows_written"] == 1
+    assert w.stats()["fsyncs"] == 0
+
+
+def test_reopen_appends_without_a_second_header(writer, tmp_path):
+    w = writer()
+    for _ in range(2):
+        w.open(tmp_path / "job")
+        w.write(sample(0), 90, "NORMAL")
+        w.close()
+    assert (tmp_path / "job" / READINGS_FILE).read_bytes().count(b"timestamp") == 1
+
+
+def test_rows_without_an_open_file_and_a_full_queue_are_dropped(tmp_path):
+    w = SurveyWriter(max_queue=2)              # not started: nothing drains the queue
+    for i in range(3):
+        w.write(sample(i), 90, "NORMAL")
+    assert w.stats()["dropped"] == 1
+    assert not w.call(lambda: None)
+    assert w.stats()["dropped"] == 2
+
+
+def test_row_before_open_is_dropped(writer):
+    w = writer()
+    w.write(sample(0), 90, "NORMAL")
+    w.close()
+    assert w.stats()["dropped"] == 1 and w.stats()["rows_written"] == 0
+
+
+def test_encode_errors_are_counted_not_fatal(writer, tmp_path):
+    w = writer()
+    w.open(tmp_path / "job")
+    w.write(None, 90, "NORMAL")                # encode_csv_row(None) raises
+    w.write(sample(0), 90, "NORMAL")
+    w.close()
+    st = w.stats()
+    assert (st["errors"], st["rows_written"]) == (1, 1)
+
+
+def test_hooks_run_on_the_writer_thread(writer, tmp_path):
+    seen = {}
+    w = writer(
+        filename="rows.bin", header=b"HDR", encode=lambda d, s, st: bytes([s]),
+        frame=lambda rows: b"[" + b"".join(rows) + b"]",
+        recover=lambda path: {"existed": path.exists()},
+        on_close=lambda path: seen.setdefault("closed", path),
+    )
+    w.open(tmp_path / "job")
+    w.call(lambda: seen.setdefault("thread", threading.current_thread().name))
+    w.write(sample(0), 1, "NORMAL")
+    w.write(sample(1), 2, "NORMAL")
+    w.close()
+    path = tmp_path / "job" / "rows.bin"
+    assert path.read_bytes() == b"HDR[\x01\x02]"
+    assert seen == {"thread": "survey-writer", "closed": path}
+    assert w.stats()["recovered"] == {"existed": False}
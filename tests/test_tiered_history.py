@@ -0,0 +1,105 @@
+import pytest
+
+from tiered_history import DEFAULT_TIERS, MetricHistory, TieredHistory
+
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % 3600  # hour-aligned
+
+
+def fill(h, values, t0=T0, step=1.0):
+    for i, v in enumerate(values):
+        h.add(t0 + i * step, v)
+
+
+def test_memory_budget_is_48_bytes_per_bucket():
+    buckets = sum(n for _, n in DEFAULT_TIERS)
+    assert MetricHistory().memory_bytes() == 48 * buckets == 135_936
+
+
+def test_view_picks_the_finest_tier_that_spans_the_window():
+    h = MetricHistory()
+    fill(h, [1.0])
+    assert h.view(30 * 60).width_s == 60
+    assert h.view(3 * 24 * 3600).width_s == 15 * 60
+    assert h.view(90 * 24 * 3600).width_s == 3600  # longer than any tier: coarsest
+
+
+def test_aggregates_skip_empty_buckets():
+    h = MetricHistory()
+    fill(h, [10.0] * 60)                   # minute 0
+    fill(h, [30.0] * 60, t0=T0 + 10 * 60)  # minute 10, gap between
+    v = h.view(30 * 60)
+    assert len(v) == 2
+    assert v.mean == 20.0
+    assert (v.min, v.max, v.count) == (10.0, 30.0, 120)
+    assert [b.mean for b in v.buckets()] == [10.0, 30.0]
+
+
+def test_fraction_at_least_is_sample_weighted():
+    h = MetricHistory()
+    fill(h, [50.0] * 30)                    # minute 0: 30 samples, mean 50
+    fill(h, [5.0] * 90, t0=T0 + 60)         # minute 1: 60 samples, minute 2: 30
+    assert h.view(30 * 60).fraction_at_least(35.0) == pytest.approx(30 / 120)
+
+
+def test_one_plateau_is_one_run():
+    h = MetricHistory()
+    fill(h, [80.0] * 5 * 60)                # 5 consecutive 1-min buckets above
+    assert h.view(30 * 60).runs_reaching(35.0) == 1
+
+
+def test_runs_are_split_by_low_or_empty_buckets():
+    h = MetricHistory()
+    fill(h, [80.0] * 60)                    # run 1
+    fill(h, [5.0] * 60, t0=T0 + 60)         # low bucket
+    fill(h, [80.0] * 60, t0=T0 + 120)       # run 2
+    fill(h, [80.0] * 60, t0=T0 + 300)       # after empty minutes: run 3
+    v = h.view(30 * 60)
+    assert v.runs_reaching(35.0) == 3
+    assert v.runs_reaching(100.0) == 0
+
+
+def test_coverage_starts_at_the_first_sample():
+    h = MetricHistory()
+    fill(h, [1.0] * 5 * 60, t0=T0 + 30)
+    assert h.view(30 * 60).span_s == pytest.approx(5 * 60 - 1)
+
+
+def test_wall_clock_jump_does_not_claim_missing_time():
+    h = MetricHistory()
+    fill(h, [1.0] * 120, t0=1000.0)         # pre-NTP clock near the epoch
+    jumped = T0
+    fill(h, [1.0] * 120, t0=jumped)         # NTP sync: clock jumps years ahead
+    v = h.view(30 * 60)
+    assert v.span_s == pytest.approx(119)
+    assert v.count == 120
+
+
+def test_tiny_timestamps_do_not_match_empty_slots():
+    h = MetricHistory()
+    h.add(5.0, 1.0)
+    v = h.view(30 * 60)
+    assert v.count == 1
+
+
+def test_old_values_outside_the_ring_are_dropped():
+    h = MetricHistory(tiers=((60, 10),))
+    h.add(T0 + 20 * 60, 1.0)
+    h.add(T0, 99.0)                          # 20 min older than a 10-min ring
+    assert h.view(600).max == 1.0
+
+
+def test_none_and_nan_are_not_stored():
+    h = MetricHistory()
+    h.add(T0, None)
+    h.add(T0, float("nan"))
+    assert h.version == 0 and h.last_ts is None
+    assert not h.view(60)
+
+
+def test_tiered_history_routes_by_metric():
+    long = TieredHistory(("pm25", "co2"))
+    long.add_sample(T0, {"pm25": 8.0, "co2": 640, "voc": 3})
+    assert "voc" not in long
+    assert long.view("pm25", 60).mean == 8.0
+    assert long["co2"].version == 1
+    assert long.memory_bytes() == 2 * MetricHistory().memory_bytes()
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("serial")
+pytest.importorskip("sensirion_gas_index_algorithm")
+
+import main  # noqa: E402
+
+
+class FakeAlgo:
+    def __init__(self, states=(1.5, 2.5)):
+        self.states = states
+        self.restored = None
+
+    def get_states(self):
+        return self.states
+
+    def set_states(self, s0, s1):
+        self.restored = (s0, s1)
+
+
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture
+def voc(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "VOC_STATE_FILE", tmp_path / "voc_state.json")
+    monkeypatch.setattr(main, "_voc_algo", FakeAlgo())
+    monkeypatch.setattr(main, "_voc_learn_start", T0)
+    monkeypatch.setattr(main, "_voc_state_saved", 0.0)
+    return main.VOC_STATE_FILE
+
+
+def test_no_checkpoint_before_three_hours_of_learning(voc):
+    assert main.VOC_STATE_MIN_LEARN_S == 3 * 3600
+    assert not main.save_voc_state(T0 + 3 * 3600 - 1)
+    assert not voc.exists()
+
+
+def test_checkpoint_round_trips_into_a_fresh_algorithm(voc):
+    saved_at = T0 + 4 * 3600
+    assert main.save_voc_state(saved_at)
+    algo = FakeAlgo()
+    assert main.restore_voc_state(algo, saved_at + 60) == 4 * 3600
+    assert algo.restored == (1.5, 2.5)
+
+
+def test_checkpoint_older_than_ten_minutes_is_ignored(voc):
+    saved_at = T0 + 4 * 3600
+    main.save_voc_state(saved_at)
+    algo = FakeAlgo()
+    assert main.restore_voc_state(algo, saved_at + main.VOC_STATE_MAX_AGE_S + 1) is None
+    assert algo.restored is None
+
+
+def test_checkpoint_from_the_future_is_ignored(voc):
+    saved_at = T0 + 4 * 3600
+    main.save_voc_state(saved_at)
+    assert main.restore_voc_state(FakeAlgo(), saved_at - 5) is None
+
+
+def test_missing_or_corrupt_checkpoint_restores_nothing(voc):
+    assert main.restore_voc_state(FakeAlgo(), T0) is None
+    voc.write_text("{not json")
+    assert main.restore_voc_state(FakeAlgo(), T0) is None
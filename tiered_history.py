@@ -0,0 +1,254 @@
+import math
+from array import array
+from typing import NamedTuple
+
+
+# =========================================================
+# Resolution tiers: (bucket width s, bucket count)
+# =========================================================
+# Raw samples stay in the per-metric RollingWindow (~1 min); these tiers
+# hold the long tail at fixed memory: 6 arrays x 8 B = 48 B per bucket
+# (id, first ts, sum, min, max, count), 2832 buckets = ~136 KB per metric:
+#   1 min  x 1440 = 24 h
+#   15 min x  672 = 7 days
+#   1 h    x  720 = 30 days
+DEFAULT_TIERS = (
+    (60, 24 * 60),
+    (15 * 60, 7 * 24 * 4),
+    (3600, 30 * 24),
+)
+
+
+class Bucket(NamedTuple):
+    start: float   # wall clock of the bucket start
+    mean: float
+    min: float
+    max: float
+    count: int
+
+
+class _Tier:
+    """
+    Ring of fixed-width time buckets in flat arrays.
+    The slot for bucket id b is b % capacity; ids[] says which bucket a slot
+    currently holds, so stale slots are reset lazily on the next write.
+    """
+
+    __slots__ = ("width_s", "capacity", "ids", "firsts", "sums", "mins", "maxs", "counts")
+
+    def __init__(self, width_s, capacity):
+        self.width_s = width_s
+        self.capacity = capacity
+        self.ids = array("q", [-1]) * capacity
+        self.firsts = array("d", [0.0]) * capacity  # ts of each bucket's first sample
+        self.sums = array("d", [0.0]) * capacity
+        self.mins = array("d", [0.0]) * capacity
+        self.maxs = array("d", [0.0]) * capacity
+        self.counts = array("l", [0]) * capacity
+
+    @property
+    def span_s(self):
+        return self.width_s * self.capacity
+
+    def add(self, ts, v):
+        b = int(ts // self.width_s)
+        i = b % self.capacity
+        held = self.ids[i]
+        if held != b:
+            if held > b:
+                return  # older than anything the ring still covers
+            self.ids[i] = b
+            self.firsts[i] = ts
+            self.sums[i] = v
+            self.mins[i] = v
+            self.maxs[i] = v
+            self.counts[i] = 1
+            return
+        self.sums[i] += v
+        if v < self.mins[i]:
+            self.mins[i] = v
+        if v > self.maxs[i]:
+            self.maxs[i] = v
+        self.counts[i] += 1
+
+    def memory_bytes(self):
+        return sum(a.itemsize * len(a) for a in (self.ids, self.firsts, self.sums, self.mins, self.maxs, self.counts))
+
+
+# =========================================================
+# Window view (no copies; walks the ring in place)
+# =========================================================
+class HistoryView:
+    """
+    Buckets of one tier between two bucket ids (inclusive).
+    Aggregates are computed over populated buckets only, so gaps
+    (sensor offline, device off) don't dilute the numbers.
+    """
+
+    __slots__ = ("tier", "lo", "hi", "span_s")
+
+    def __init__(self, tier, lo, hi, span_s):
+        self.tier = tier
+        self.lo = lo
+        self.hi = hi
+        self.span_s = span_s  # seconds of data the view actually covers
+
+    @property
+    def width_s(self):
+        return self.tier.width_s
+
+    def _slots(self):
+        t = self.tier
+        for b in range(self.lo, self.hi + 1):
+            i = b % t.capacity
+            if t.ids[i] == b:
+                yield i
+
+    def buckets(self):
+        t = self.tier
+        for i in self._slots():
+            n = t.counts[i]
+            yield Bucket(t.ids[i] * t.width_s, t.sums[i] / n, t.mins[i], t.maxs[i], n)
+
+    def __len__(self):
+        return sum(1 for _ in self._slots())
+
+    def __bool__(self):
+        return any(True for _ in self._slots())
+
+    @property
+    def count(self):
+        t = self.tier
+        return sum(t.counts[i] for i in self._slots())
+
+    @property
+    def mean(self):
+        t = self.tier
+        total = n = 0
+        for i in self._slots():
+            total += t.sums[i]
+            n += t.counts[i]
+        return total / n if n else 0
+
+    @property
+    def min(self):
+        t = self.tier
+        return min((t.mins[i] for i in self._slots()), default=None)
+
+    @property
+    def max(self):
+        t = self.tier
+        return max((t.maxs[i] for i in self._slots()), default=None)
+
+    def fraction_at_least(self, threshold):
+        """Sample-weighted share of buckets whose mean is >= threshold."""
+        t = self.tier
+        hit = n = 0
+        for i in self._slots():
+            c = t.counts[i]
+            n += c
+            if t.sums[i] / c >= threshold:
+                hit += c
+        return hit / n if n else 0.0
+
+    def runs_reaching(self, threshold):
+        """
+        Number of separate runs of buckets whose max is >= threshold, so a
+        plateau spanning several buckets counts once. A bucket below the
+        threshold, or one with no data, ends a run.
+        """
+        t = self.tier
+        runs, prev = 0, None
+        for b in range(self.lo, self.hi + 1):
+            i = b % t.capacity
+            hit = t.ids[i] == b and t.maxs[i] >= threshold
+            if hit and not prev:
+                runs += 1
+            prev = hit
+        return runs
+
+
+# =========================================================
+# Per-metric and multi-metric stores
+# =========================================================
+class MetricHistory:
+    """One metric across every tier; add() is O(number of tiers)."""
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [_Tier(w, n) for w, n in tiers]
+        self.first_ts = None
+        self.last_ts = None
+        self.version = 0  # bumped on every stored value (cache key)
+
+    def add(self, ts, value):
+        if value is None:
+            return
+        v = float(value)
+        if math.isnan(v):
+            return
+        for tier in self.tiers:
+            tier.add(ts, v)
+        if self.first_ts is None:
+            self.first_ts = ts
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+        self.version += 1
+
+    def view(self, seconds, now=None):
+        """
+        Window over the last `seconds`, from the finest tier that spans it.
+        now defaults to the newest sample's timestamp (replays stay exact).
+        """
+        tier = next((t for t in self.tiers if t.span_s >= seconds), self.tiers[-1])
+        if now is None:
+            now = self.last_ts
+        if now is None:
+            return HistoryView(tier, 0, -1, 0.0)
+
+        hi = int(now // tier.width_s)
+        lo = int((now - seconds) // tier.width_s) + 1
+        lo = max(lo, hi - tier.capacity + 1, 0)  # ids[] uses -1 for empty slots
+        # Coverage starts at the oldest bucket the window actually holds, so a
+        # wall-clock jump (NTP sync after boot) can't claim time with no data
+        oldest = next((b for b in range(lo, hi + 1) if tier.ids[b % tier.capacity] == b), None)
+        if oldest is None:
+            return HistoryView(tier, lo, hi, 0.0)
+        start = tier.firsts[oldest % tier.capacity]
+        return HistoryView(tier, lo, hi, max(0.0, min(seconds, now - start)))
+
+    def memory_bytes(self):
+        return sum(t.memory_bytes() for t in self.tiers)
+
+
+class TieredHistory:
+    """
+    Long-horizon history for a fixed set of metrics.
+
+        long = TieredHistory(("pm25", "co2", "score"))
+        long.add_sample(ts, {"pm25": 8.0, "co2": 640, "score": 92})
+        long.view("pm25", 30 * 60).fraction_at_least(35)
+    """
+
+    def __init__(self, metrics, tiers=DEFAULT_TIERS):
+        self.metrics = {m: MetricHistory(tiers) for m in metrics}
+
+    def __getitem__(self, metric):
+        return self.metrics[metric]
+
+    def __contains__(self, metric):
+        return metric in self.metrics
+
+    def add(self, metric, ts, value):
+        self.metrics[metric].add(ts, value)
+
+    def add_sample(self, ts, values):
+        for m, v in values.items():
+            h = self.metrics.get(m)
+            if h is not None:
+                h.add(ts, v)
+
+    def view(self, metric, seconds, now=None):
+        return self.metrics[metric].view(seconds, now)
+
+    def memory_bytes(self):
+        return sum(h.memory_bytes() for h in self.metrics.values())